@@ -0,0 +1,106 @@
+"""Database tasks and the production server launcher.
+
+Migrations and seeding run once per deploy rather than on every worker start:
+
+    python -m app.cli migrate            # apply pending migrations
+    python -m app.cli seed               # add missing sample menu items
+    python -m app.cli setup              # both, for a fresh database
+    python -m app.cli backfill-analytics # rebuild the sales rollups from orders
+    python -m app.cli serve --workers 4  # production server
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from .config import settings
+from .database import engine
+from .init_data import init_menu_data
+from .utils.analytics import rebuild_rollups
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def alembic_config():
+    return Config(str(ROOT / "alembic.ini"))
+
+def migrate(revision: str = "head"):
+    """Upgrade the database to revision"""
+    command.upgrade(alembic_config(), revision)
+    print(f"✅ Database migrated to {revision}")
+
+def seed():
+    """Add sample menu data that is not in the database yet"""
+    async def run():
+        try:
+            await init_menu_data()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+def backfill_analytics():
+    """Rebuild the analytics rollup tables from every order"""
+    async def run():
+        try:
+            rollup = await rebuild_rollups()
+        finally:
+            await engine.dispose()
+        print(f"✅ Rebuilt sales rollups: {len(rollup.hours)} hours, {len(rollup.items)} item-days")
+
+    asyncio.run(run())
+
+def installed(module: str):
+    return importlib.util.find_spec(module) is not None
+
+def serve(host: str, port: int, workers: int):
+    """Run the API with uvicorn's process manager, one event loop per worker"""
+    import uvicorn
+
+    workers = workers or os.cpu_count() or 1
+    loop = "uvloop" if installed("uvloop") else "asyncio"
+    http = "httptools" if installed("httptools") else "h11"
+    print(f"🚀 Serving on {host}:{port} with {workers} worker(s), {loop} loop, {http} parser")
+    if workers > 1 and not settings.event_broker_url:
+        print("⚠️  EVENT_BROKER_URL is not set: order events and the kitchen queue won't be shared between workers")
+
+    uvicorn.run(
+        "app.main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        proxy_headers=True,
+        access_log=False
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = commands.add_parser("migrate", help="Apply database migrations")
+    migrate_parser.add_argument("revision", nargs="?", default="head")
+    commands.add_parser("seed", help="Add missing sample menu items")
+    commands.add_parser("setup", help="Migrate to head, then seed")
+    commands.add_parser("backfill-analytics", help="Rebuild the sales rollups from orders (run while the API is idle)")
+    serve_parser = commands.add_parser("serve", help="Run the production server")
+    serve_parser.add_argument("--host", default=settings.host)
+    serve_parser.add_argument("--port", type=int, default=settings.port)
+    serve_parser.add_argument("--workers", type=int, default=settings.workers, help="0 for one per CPU")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        migrate(args.revision)
+    elif args.command == "seed":
+        seed()
+    elif args.command == "setup":
+        migrate()
+        seed()
+    elif args.command == "backfill-analytics":
+        backfill_analytics()
+    elif args.command == "serve":
+        serve(args.host, args.port, args.workers)
+
+if __name__ == "__main__":
+    main()
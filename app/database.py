@@ -1,25 +1,196 @@
-from sqlalchemy import create_engine
+import asyncio
+import itertools
+import time
+from sqlalchemy import Select, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+from starlette.responses import Response
 from .config import settings
+from .utils.metrics import instrument_engine
 
-# Create database engine
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    pool_recycle=300
-)
+# Async drivers used for each supported database backend
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+def get_async_database_url(database_url: str):
+    """Rewrite a database URL to use the async driver for its backend"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver and url.get_driver_name() != driver:
+        url = url.set(drivername=f"{backend}+{driver}")
+    return url
+
+def is_memory_database(url):
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+def engine_options(url):
+    """Pool and driver options for the configured backend"""
+    options = {"pool_pre_ping": True, "pool_recycle": settings.db_pool_recycle}
+    # An in-memory SQLite database lives in a single connection, so pool sizing doesn't apply
+    if not is_memory_database(url):
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout
+        )
+    if url.get_backend_name() == "postgresql" and settings.db_statement_timeout:
+        options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.db_statement_timeout)}}
+    return options
+
+def configure_sqlite(engine):
+    """Let several workers share a SQLite file: readers don't block the writer in
+    WAL mode, and a locked database is retried for busy_timeout ms instead of failing"""
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout)}")
+        cursor.close()
+
+def create_engine_for(raw_url: str):
+    """Async engine for a configured database URL, with pooling, pragmas and metrics"""
+    url = get_async_database_url(raw_url)
+    new_engine = create_async_engine(url, **engine_options(url))
+    if url.get_backend_name() == "sqlite" and not is_memory_database(url):
+        configure_sqlite(new_engine.sync_engine)
+    # Count and time every statement for the /metrics endpoint
+    instrument_engine(new_engine.sync_engine)
+    return new_engine
+
+async def ping(target_engine):
+    async with target_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+# Create async database engines: the primary takes every write
+database_url = get_async_database_url(settings.database_url)
+engine = create_engine_for(settings.database_url)
+
+class ReplicaSet:
+    """Read replicas used round-robin, skipping any that failed their last health check"""
+
+    def __init__(self, engines):
+        self.engines = engines
+        self.healthy = list(engines)
+        self._turn = itertools.count()
+        self._task = None
+
+    def pick(self):
+        """The next healthy replica, or None to read from the primary"""
+        healthy = self.healthy
+        if not healthy:
+            return None
+        return healthy[next(self._turn) % len(healthy)]
+
+    async def check(self):
+        """Ping every replica and keep only those that answered in time"""
+        results = await asyncio.gather(
+            *(asyncio.wait_for(ping(replica), settings.health_check_timeout) for replica in self.engines),
+            return_exceptions=True
+        )
+        healthy = [replica for replica, result in zip(self.engines, results) if result is None]
+        for replica, result in zip(self.engines, results):
+            was_healthy = replica in self.healthy
+            if result is None and not was_healthy:
+                print(f"✅ Read replica {replica.url.render_as_string()} is back")
+            elif result is not None and was_healthy:
+                print(f"❌ Read replica {replica.url.render_as_string()} failed its health check: {result!r}")
+        self.healthy = healthy
+
+    async def _run(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(settings.replica_health_check_interval)
+
+    def start(self):
+        """Health-check the replicas in the background"""
+        if self.engines and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.engines:
+            await replica.dispose()
+
+replicas = ReplicaSet([create_engine_for(url) for url in settings.database_replica_urls])
+
+class RoutingSession(Session):
+    """Sends SELECTs to the replica chosen for the session and everything else to the primary.
+
+    Flushes, INSERT/UPDATE/DELETE and raw SQL always use the primary, so a
+    read session that writes by mistake still writes to the right place.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("replica")
+        if replica is not None and not self._flushing and isinstance(clause, Select):
+            return replica.sync_engine
+        return engine.sync_engine
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Session factory for read-only work that replicas may serve
+ReadSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+def read_session(use_replica: bool = True):
+    """A session whose reads go to a healthy replica, or to the primary if none is up"""
+    db = ReadSessionLocal()
+    if use_replica:
+        db.info["replica"] = replicas.pick()
+    return db
 
 # Create base class for models
 Base = declarative_base()
 
-def get_db():
+async def get_db():
     """Dependency to get database session"""
-    db = SessionLocal()
+    async with SessionLocal() as db:
+        yield db
+
+# Cookie holding the time until which a client's reads stay on the primary
+READ_YOUR_WRITES_COOKIE = "hk_primary_until"
+
+def mark_recent_write(response: Response):
+    """Send this client's reads to the primary until the replicas have caught up with its write"""
+    until = time.time() + settings.read_your_writes_seconds
+    response.set_cookie(
+        READ_YOUR_WRITES_COOKIE,
+        f"{until:.0f}",
+        max_age=settings.read_your_writes_seconds,
+        httponly=True,
+        samesite="lax"
+    )
+
+def wrote_recently(request: Request):
     try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+async def get_read_db(request: Request):
+    """Dependency for read-only routes: reads go to a replica unless this client just wrote"""
+    async with read_session(use_replica=not wrote_recently(request)) as db:
         yield db
-    finally:
-        db.close()
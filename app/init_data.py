@@ -1,19 +1,17 @@
-from sqlalchemy.orm import Session
+import asyncio
+from sqlalchemy import select
 from .database import SessionLocal
 from .models import MenuItem
 from decimal import Decimal
 
-def init_menu_data():
-    """Initialize the database with sample menu data"""
+async def init_menu_data():
+    """Add any sample menu items that are missing, matched by name.
+
+    Safe to run repeatedly: items that already exist are left untouched.
+    """
     db = SessionLocal()
     
     try:
-        # Check if menu items already exist
-        existing_items = db.query(MenuItem).count()
-        if existing_items > 0:
-            print("Menu data already exists, skipping initialization")
-            return
-        
         # Sample menu items
         menu_items = [
             # Starters & Snacks
@@ -23,6 +21,7 @@ def init_menu_data():
                 price=Decimal("8.99"),
                 category="Starters & Snacks",
                 image_url="🍛",
+                prep_time=10,
                 is_available=True
             ),
             MenuItem(
@@ -31,6 +30,7 @@ def init_menu_data():
                 price=Decimal("12.99"),
                 category="Starters & Snacks",
                 image_url="🍗",
+                prep_time=15,
                 is_available=True
             ),
             MenuItem(
@@ -39,6 +39,7 @@ def init_menu_data():
                 price=Decimal("10.99"),
                 category="Starters & Snacks",
                 image_url="🧀",
+                prep_time=12,
                 is_available=True
             ),
             
@@ -49,6 +50,7 @@ def init_menu_data():
                 price=Decimal("18.99"),
                 category="Main Dishes",
                 image_url="🍗",
+                prep_time=25,
                 is_available=True
             ),
             MenuItem(
@@ -57,6 +59,7 @@ def init_menu_data():
                 price=Decimal("22.99"),
                 category="Main Dishes",
                 image_url="🍚",
+                prep_time=30,
                 is_available=True
             ),
             MenuItem(
@@ -65,6 +68,7 @@ def init_menu_data():
                 price=Decimal("24.99"),
                 category="Main Dishes",
                 image_url="🍖",
+                prep_time=30,
                 is_available=True
             ),
             MenuItem(
@@ -73,6 +77,7 @@ def init_menu_data():
                 price=Decimal("16.99"),
                 category="Main Dishes",
                 image_url="🥘",
+                prep_time=20,
                 is_available=True
             ),
             
@@ -83,6 +88,7 @@ def init_menu_data():
                 price=Decimal("3.99"),
                 category="Breads",
                 image_url="🫓",
+                prep_time=8,
                 is_available=True
             ),
             MenuItem(
@@ -91,6 +97,7 @@ def init_menu_data():
                 price=Decimal("2.99"),
                 category="Breads",
                 image_url="🫓",
+                prep_time=6,
                 is_available=True
             ),
             MenuItem(
@@ -99,6 +106,7 @@ def init_menu_data():
                 price=Decimal("4.99"),
                 category="Breads",
                 image_url="🫓",
+                prep_time=8,
                 is_available=True
             ),
             
@@ -109,6 +117,7 @@ def init_menu_data():
                 price=Decimal("4.99"),
                 category="Sides",
                 image_url="🍚",
+                prep_time=15,
                 is_available=True
             ),
             MenuItem(
@@ -117,6 +126,7 @@ def init_menu_data():
                 price=Decimal("5.99"),
                 category="Sides",
                 image_url="🍚",
+                prep_time=15,
                 is_available=True
             ),
             MenuItem(
@@ -125,22 +135,30 @@ def init_menu_data():
                 price=Decimal("6.99"),
                 category="Sides",
                 image_url="🥔",
+                prep_time=20,
                 is_available=True
             )
         ]
         
-        # Add all menu items
-        for item in menu_items:
-            db.add(item)
+        # Only add the items that aren't on the menu yet
+        existing_names = set((await db.scalars(select(MenuItem.name))).all())
+        missing_items = [item for item in menu_items if item.name not in existing_names]
+        if not missing_items:
+            print("Menu data already exists, skipping initialization")
+            return 0
+        
+        db.add_all(missing_items)
         
-        db.commit()
-        print(f"✅ Successfully initialized {len(menu_items)} menu items")
+        await db.commit()
+        print(f"✅ Successfully initialized {len(missing_items)} menu items")
+        return len(missing_items)
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"❌ Error initializing menu data: {e}")
+        raise
     finally:
-        db.close()
+        await db.close()
 
 if __name__ == "__main__":
-    init_menu_data()
+    asyncio.run(init_menu_data())
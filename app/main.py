@@ -1,54 +1,107 @@
 from fastapi import FastAPI, HTTPException, Depends, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import PlainTextResponse
 import uvicorn
+import asyncio
 from contextlib import asynccontextmanager
 import os
 from pathlib import Path
 
-from .database import engine, get_db
-from .models import Base
-from .routers import menu, orders, careers, contact, newsletter
+from .database import engine, get_db, ping, replicas
+from .routers import menu, orders, careers, contact, newsletter, exports, kitchen, analytics
 from .config import settings
 from .utils.email_service import EmailService
-from .init_data import init_menu_data
+from .utils.mail_queue import mail_queue
+from .utils.campaigns import campaign_sender
+from .utils.idempotency import idempotency_store
+from .utils.events import broker
+from .utils.kitchen import kitchen as kitchen_queue
+from .utils.forecast import forecaster
+from .utils.uploads import RequestSizeLimitMiddleware, UploadFiles
+from .utils.compression import CompressionMiddleware
+from .utils.rate_limit import RateLimitMiddleware, rate_limiter
+from .utils.metrics import MetricsMiddleware, registry
+from .utils.responses import ORJSONResponse
 
 # Create uploads directory if it doesn't exist
-uploads_dir = Path("uploads")
+uploads_dir = Path(settings.upload_dir)
 uploads_dir.mkdir(exist_ok=True)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    Base.metadata.create_all(bind=engine)
+    # Startup; the schema and seed data are managed out-of-band by app.cli
     print("🚀 Home' Kitchen FastAPI server starting up...")
     
-    # Initialize sample data
-    init_menu_data()
+    # Start delivering queued emails in the background
+    if mail_queue.email_service.is_configured:
+        mail_queue.start()
+        campaign_sender.start()
+    
+    # Purge expired idempotency keys periodically
+    idempotency_store.start()
+    
+    # Health-check the read replicas, if any
+    replicas.start()
+    
+    # Connect the order event broker
+    await broker.start()
+    
+    # Rebuild the kitchen queue from open orders
+    await kitchen_queue.start()
+    
+    # Load order history for the demand forecast in the background
+    forecaster.start()
     
     yield
     # Shutdown
+    await forecaster.stop()
+    await kitchen_queue.stop()
+    await broker.stop()
+    await idempotency_store.stop()
+    await campaign_sender.stop()
+    await mail_queue.stop()
+    await rate_limiter.store.close()
+    await replicas.stop()
+    await engine.dispose()
     print("🛑 Home' Kitchen FastAPI server shutting down...");
 
 app = FastAPI(
     title="Home' Kitchen API",
     description="FastAPI backend for Home' Kitchen restaurant",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
+
+# Cut off oversized uploads before they are parsed
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    max_body_size=settings.max_file_size + settings.max_form_overhead
 )
 
-# CORS middleware
+# Throttle the public write endpoints per client IP
+app.add_middleware(RateLimitMiddleware)
+
+# Compress text and JSON responses, reusing cached bytes for repeated ETags
+app.add_middleware(CompressionMiddleware)
+
+# Record per-route latency and DB usage for everything below CORS
+app.add_middleware(MetricsMiddleware)
+
+# CORS middleware; added last so it is outermost and the 413s and 429s
+# sent by the middleware above still carry CORS headers the client can read
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:5000"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the client read how long to back off after a 429
+    expose_headers=["Retry-After"],
 )
 
-# Mount static files for uploads
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Mount static files for uploads, with conditional, range and cache headers
+app.mount("/uploads", UploadFiles(directory=settings.upload_dir), name="uploads")
 
 # Include routers
 app.include_router(menu.router, prefix="/api", tags=["menu"])
@@ -56,6 +109,9 @@ app.include_router(orders.router, prefix="/api", tags=["orders"])
 app.include_router(careers.router, prefix="/api", tags=["careers"])
 app.include_router(contact.router, prefix="/api", tags=["contact"])
 app.include_router(newsletter.router, prefix="/api", tags=["newsletter"])
+app.include_router(exports.router, prefix="/api", tags=["exports"])
+app.include_router(kitchen.router, prefix="/api", tags=["kitchen"])
+app.include_router(analytics.router, prefix="/api", tags=["analytics"])
 
 @app.get("/api/health")
 async def health_check():
@@ -66,6 +122,29 @@ async def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/api/health/live")
+async def liveness_check():
+    """Liveness probe: the worker is up and serving requests"""
+    return {"status": "alive"}
+
+@app.get("/api/health/ready")
+async def readiness_check():
+    """Readiness probe: the worker can get a primary database connection"""
+    try:
+        await asyncio.wait_for(ping(engine), settings.health_check_timeout)
+    except Exception as e:
+        return ORJSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "detail": str(e) or type(e).__name__}
+        )
+    # Replicas are optional: reads fall back to the primary while they are down
+    return {"status": "ready", "replicas": f"{len(replicas.healthy)}/{len(replicas.engines)} healthy"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for this worker"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Numeric, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Numeric, Boolean, Date, DateTime, ForeignKey, Index, UniqueConstraint, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .database import Base
@@ -13,6 +13,7 @@ class MenuItem(Base):
     category = Column(String(50), nullable=False)
     image_url = Column(String(255))
     video_url = Column(String(255))
+    prep_time = Column(Integer, default=15, server_default=text("15"), nullable=False)  # minutes of station time
     is_available = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -26,17 +27,24 @@ class Order(Base):
     customer_address = Column(Text, nullable=False)
     total_amount = Column(Numeric(10, 2), nullable=False)
     status = Column(String(20), default="pending")
+    priority = Column(Integer, default=0, server_default=text("0"), nullable=False)  # higher is cooked sooner
     payment_method = Column(String(20), default="cash")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationship
     items = relationship("OrderItem", back_populates="order")
+    
+    __table_args__ = (
+        Index("ix_orders_created_id", "created_at", "id"),
+        Index("ix_orders_status_created_id", "status", "created_at", "id"),
+    )
 
 class OrderItem(Base):
     __tablename__ = "order_items"
     
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"))
+    menu_item_id = Column(Integer, ForeignKey("menu_items.id"), index=True)
     item_name = Column(String(100), nullable=False)
     quantity = Column(Integer, nullable=False)
     price = Column(Numeric(10, 2), nullable=False)
@@ -44,6 +52,29 @@ class OrderItem(Base):
     # Relationship
     order = relationship("Order", back_populates="items")
 
+# Sales rollups, kept current by the order routes and rebuilt by `python -m app.cli backfill-analytics`
+class SalesHourly(Base):
+    __tablename__ = "sales_hourly"
+    
+    bucket = Column(DateTime(timezone=True), primary_key=True)  # start of the UTC hour
+    orders = Column(Integer, default=0, nullable=False)
+    revenue = Column(Numeric(12, 2), default=0, nullable=False)
+    items_sold = Column(Integer, default=0, nullable=False)
+
+class ItemSalesDaily(Base):
+    __tablename__ = "item_sales_daily"
+    
+    day = Column(Date, primary_key=True)  # UTC
+    item_name = Column(String(100), primary_key=True)
+    quantity = Column(Integer, default=0, nullable=False)
+    revenue = Column(Numeric(12, 2), default=0, nullable=False)
+
+class OrderStatusCount(Base):
+    __tablename__ = "order_status_counts"
+    
+    status = Column(String(20), primary_key=True)
+    orders = Column(Integer, default=0, nullable=False)
+
 class CareerApplication(Base):
     __tablename__ = "career_applications"
     
@@ -55,8 +86,14 @@ class CareerApplication(Base):
     experience = Column(String(50))
     message = Column(Text)
     resume_path = Column(String(255))
+    resume_sha256 = Column(String(64), index=True)
     status = Column(String(20), default="pending")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_career_applications_created_id", "created_at", "id"),
+        Index("ix_career_applications_status_created_id", "status", "created_at", "id"),
+    )
 
 class ContactMessage(Base):
     __tablename__ = "contact_messages"
@@ -67,6 +104,10 @@ class ContactMessage(Base):
     subject = Column(String(200))
     message = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_contact_messages_created_id", "created_at", "id"),
+    )
 
 class NewsletterSubscriber(Base):
     __tablename__ = "newsletter_subscribers"
@@ -74,3 +115,66 @@ class NewsletterSubscriber(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(100), unique=True, nullable=False)
     subscribed_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_newsletter_subscribers_subscribed_id", "subscribed_at", "id"),
+    )
+
+class NewsletterCampaign(Base):
+    __tablename__ = "newsletter_campaigns"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    subject = Column(String(200), nullable=False)
+    template = Column(Text, nullable=False)  # Jinja source as submitted
+    html_content = Column(Text, nullable=False)  # rendered once at creation
+    status = Column(String(20), default="draft")  # draft, sending, sent, cancelled
+    last_subscriber_id = Column(Integer, default=0, nullable=False)  # subscribers queued so far
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    completed_at = Column(DateTime(timezone=True))
+
+class CampaignDelivery(Base):
+    __tablename__ = "campaign_deliveries"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    campaign_id = Column(Integer, ForeignKey("newsletter_campaigns.id"), nullable=False)
+    subscriber_id = Column(Integer, nullable=False)
+    email = Column(String(100), nullable=False)
+    status = Column(String(20), default="pending")  # pending, sending, sent, failed, skipped
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        UniqueConstraint("campaign_id", "subscriber_id", name="uq_campaign_deliveries_campaign_subscriber"),
+        Index("ix_campaign_deliveries_status_next_attempt", "status", "next_attempt_at"),
+        Index("ix_campaign_deliveries_campaign_status", "campaign_id", "status"),
+    )
+
+class OutboundEmail(Base):
+    __tablename__ = "outbound_emails"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String(100), nullable=False)
+    subject = Column(String(200), nullable=False)
+    html_content = Column(Text, nullable=False)
+    status = Column(String(20), default="pending")
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        Index("ix_outbound_emails_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    response_body = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
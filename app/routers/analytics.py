@@ -0,0 +1,181 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from typing import List, Optional
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..database import get_read_db
+from ..models import ItemSalesDaily, OrderStatusCount, SalesHourly
+from ..schemas import Forecast, RevenueBucket, SalesSummary, StatusCount, TopItem
+from ..utils.analytics import as_utc, hour_bucket
+from ..utils.forecast import forecaster
+from ..utils.kitchen import OPEN_STATUSES, utcnow
+from ..utils.pricing import to_cents
+
+router = APIRouter()
+
+class Interval(str, Enum):
+    hour = "hour"
+    day = "day"
+
+class TopItemsBy(str, Enum):
+    quantity = "quantity"
+    revenue = "revenue"
+
+def report_range(start: Optional[datetime], end: Optional[datetime]):
+    """UTC [start, end) for a report, the last few days unless given"""
+    end = as_utc(end) if end else utcnow()
+    start = as_utc(start) if start else end - timedelta(days=settings.analytics_default_days)
+    if start >= end:
+        raise ValueError("start must be before end")
+    if end - start > timedelta(days=settings.analytics_max_days):
+        raise ValueError(f"A report may cover at most {settings.analytics_max_days} days")
+    return start, end
+
+def average_order_value(revenue: Decimal, orders: int):
+    return to_cents(revenue / orders) if orders else None
+
+def hourly_in_range(start: datetime, end: datetime):
+    return (SalesHourly.bucket >= hour_bucket(start), SalesHourly.bucket < end)
+
+@router.get("/analytics/revenue", response_model=List[RevenueBucket])
+async def get_revenue(
+    interval: Interval = Interval.day,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Orders, revenue and average order value per UTC hour or day (admin only)"""
+    try:
+        start, end = report_range(start, end)
+        rows = (await db.execute(
+            select(SalesHourly.bucket, SalesHourly.orders, SalesHourly.revenue, SalesHourly.items_sold)
+            .where(*hourly_in_range(start, end))
+            .order_by(SalesHourly.bucket)
+        )).all()
+
+        # Hours are summed into days here; a range holds at most a few thousand of them
+        buckets = {}
+        for row in rows:
+            bucket = as_utc(row.bucket)
+            if interval == Interval.day:
+                bucket = bucket.replace(hour=0)
+            totals = buckets.setdefault(bucket, [0, Decimal("0"), 0])
+            totals[0] += row.orders
+            totals[1] += row.revenue
+            totals[2] += row.items_sold
+
+        return [
+            RevenueBucket(
+                bucket=bucket,
+                orders=orders,
+                revenue=revenue,
+                items_sold=items_sold,
+                average_order_value=average_order_value(revenue, orders)
+            )
+            for bucket, (orders, revenue, items_sold) in buckets.items()
+        ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching revenue: {str(e)}")
+
+@router.get("/analytics/summary", response_model=SalesSummary)
+async def get_sales_summary(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Order count, revenue and average order value over a range (admin only)"""
+    try:
+        start, end = report_range(start, end)
+        orders, revenue, items_sold = (await db.execute(
+            select(
+                func.coalesce(func.sum(SalesHourly.orders), 0),
+                func.coalesce(func.sum(SalesHourly.revenue), 0),
+                func.coalesce(func.sum(SalesHourly.items_sold), 0)
+            ).where(*hourly_in_range(start, end))
+        )).one()
+        revenue = to_cents(Decimal(str(revenue)))
+
+        return SalesSummary(
+            start=start,
+            end=end,
+            orders=orders,
+            revenue=revenue,
+            items_sold=items_sold,
+            average_order_value=average_order_value(revenue, orders)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching sales summary: {str(e)}")
+
+@router.get("/analytics/top-items", response_model=List[TopItem])
+async def get_top_items(
+    by: TopItemsBy = TopItemsBy.quantity,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Best-selling items by quantity or revenue over the UTC days in a range (admin only)"""
+    try:
+        start, end = report_range(start, end)
+        quantity = func.sum(ItemSalesDaily.quantity).label("quantity")
+        revenue = func.sum(ItemSalesDaily.revenue).label("revenue")
+        rows = (await db.execute(
+            select(ItemSalesDaily.item_name, quantity, revenue)
+            .where(ItemSalesDaily.day >= start.date(), ItemSalesDaily.day <= (end - timedelta(microseconds=1)).date())
+            .group_by(ItemSalesDaily.item_name)
+            .order_by((quantity if by == TopItemsBy.quantity else revenue).desc(), ItemSalesDaily.item_name)
+            .limit(limit)
+        )).all()
+
+        return [
+            TopItem(item_name=row.item_name, quantity=row.quantity, revenue=to_cents(Decimal(str(row.revenue))))
+            for row in rows
+        ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching top items: {str(e)}")
+
+@router.get("/analytics/funnel", response_model=List[StatusCount])
+async def get_status_funnel(db: AsyncSession = Depends(get_read_db)):
+    """How many orders are in each status, open statuses first (admin only)"""
+    try:
+        rows = (await db.execute(
+            select(OrderStatusCount.status, OrderStatusCount.orders).where(OrderStatusCount.orders > 0)
+        )).all()
+        total = sum(row.orders for row in rows)
+
+        def position(row):
+            return (OPEN_STATUSES.index(row.status) if row.status in OPEN_STATUSES else len(OPEN_STATUSES), -row.orders, row.status)
+
+        return [
+            StatusCount(status=row.status, orders=row.orders, share=round(row.orders / total, 4))
+            for row in sorted(rows, key=position)
+        ]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching order funnel: {str(e)}")
+
+@router.get("/analytics/forecast", response_model=Forecast)
+async def get_demand_forecast(day: Optional[date] = None):
+    """Expected demand and prep quantities per menu item for a coming UTC day, tomorrow by default (admin only)"""
+    today = utcnow().date()
+    day = day or today + timedelta(days=1)
+    if not today <= day <= today + timedelta(days=settings.forecast_horizon_days):
+        raise HTTPException(
+            status_code=400,
+            detail=f"day must be between today and {settings.forecast_horizon_days} days ahead"
+        )
+
+    try:
+        return await forecaster.forecast(day)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error forecasting demand: {str(e)}")
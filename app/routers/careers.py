@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-import os
+from datetime import datetime
 from pathlib import Path
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models import CareerApplication
-from ..schemas import CareerApplicationCreate, SuccessResponse
+from ..schemas import CareerApplication as CareerApplicationSchema, CareerApplicationCreate, Page, SuccessResponse
 from ..utils.email_service import EmailService
 from ..config import settings
+from ..utils.pagination import paginate, date_range, schema_columns
+from ..utils.responses import ORJSONResponse
+from ..utils.rate_limit import rate_limiter
+from ..utils.storage import storage
+from ..utils.uploads import UploadError, receive_upload
 
 router = APIRouter()
 email_service = EmailService()
@@ -21,35 +27,20 @@ async def submit_career_application(
     experience: Optional[str] = Form(None),
     message: Optional[str] = Form(None),
     resume: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Submit a career application"""
+    await rate_limiter.enforce_email("/api/careers", email)
+    
     try:
         resume_path = None
+        resume_sha256 = None
         
-        # Handle resume upload if provided
-        if resume:
-            # Validate file type
-            allowed_types = ["application/pdf", "application/msword", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
-            if resume.content_type not in allowed_types:
-                raise HTTPException(status_code=400, detail="Only PDF, DOC, and DOCX files are allowed")
-            
-            # Validate file size (5MB limit)
-            if resume.size > settings.max_file_size:
-                raise HTTPException(status_code=400, detail="File size must be less than 5MB")
-            
-            # Save file
-            upload_dir = Path(settings.upload_dir)
-            upload_dir.mkdir(exist_ok=True)
-            
-            filename = f"{int(os.urandom(8).hex(), 16)}-{resume.filename}"
-            file_path = upload_dir / filename
-            
-            with open(file_path, "wb") as buffer:
-                content = await resume.read()
-                buffer.write(content)
-            
-            resume_path = str(file_path)
+        # Stream resume upload to a temporary file, then store it by content hash
+        if resume and resume.filename:
+            received = await receive_upload(resume, Path(settings.upload_dir) / "tmp", settings.max_file_size)
+            resume_path, _ = await storage.put(received.path, received.sha256, received.content_type)
+            resume_sha256 = received.sha256
         
         # Create career application
         db_application = CareerApplication(
@@ -60,16 +51,16 @@ async def submit_career_application(
             experience=experience,
             message=message,
             resume_path=resume_path,
+            resume_sha256=resume_sha256,
             status="pending"
         )
         
         db.add(db_application)
-        db.commit()
         
-        # Send confirmation email to applicant
-        email_service.send_career_confirmation(email, position)
+        # Queue confirmation email to applicant
+        email_service.queue_career_confirmation(db, email, position)
         
-        # Send notification email to admin
+        # Queue notification email to admin
         admin_subject = "New Career Application - Home' Kitchen"
         admin_html = f"""
         <h2>New Job Application Received</h2>
@@ -81,25 +72,43 @@ async def submit_career_application(
         <p><strong>Message:</strong> {message or 'No message'}</p>
         <p><strong>Resume:</strong> {resume_path or 'Not provided'}</p>
         """
-        email_service.send_admin_notification(admin_subject, admin_html)
+        email_service.queue_admin_notification(db, admin_subject, admin_html)
+        
+        await db.commit()
         
         return SuccessResponse(
             success=True,
             message="Application submitted successfully"
         )
         
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error submitting application: {str(e)}")
 
-@router.get("/careers/applications")
-async def get_career_applications(db: Session = Depends(get_db)):
-    """Get all career applications (admin only)"""
+@router.get("/careers/applications", response_model=Page[CareerApplicationSchema])
+async def get_career_applications(
+    status: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.admin_page_size, ge=1, le=settings.admin_page_max_size),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get career applications, newest first, one page at a time (admin only)"""
     try:
-        applications = db.query(CareerApplication).order_by(CareerApplication.created_at.desc()).all()
-        return applications
+        stmt = select(*schema_columns(CareerApplication, CareerApplicationSchema)).where(
+            *date_range(db, CareerApplication.created_at, created_after, created_before)
+        )
+        if status:
+            stmt = stmt.where(CareerApplication.status == status)
+        
+        return ORJSONResponse(await paginate(db, stmt, CareerApplication.created_at, CareerApplication.id, cursor, limit))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching applications: {str(e)}")
 
@@ -107,22 +116,22 @@ async def get_career_applications(db: Session = Depends(get_db)):
 async def update_application_status(
     application_id: int,
     status: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update application status (admin only)"""
     try:
-        application = db.query(CareerApplication).filter(CareerApplication.id == application_id).first()
+        application = await db.scalar(select(CareerApplication).where(CareerApplication.id == application_id))
         
         if not application:
             raise HTTPException(status_code=404, detail="Application not found")
             
         application.status = status
-        db.commit()
+        await db.commit()
         
         return {"success": True, "message": f"Application status updated to {status}"}
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error updating application status: {str(e)}")
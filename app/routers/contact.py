@@ -1,16 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from typing import Optional
+from datetime import datetime
+from ..config import settings
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db, get_read_db
 from ..models import ContactMessage
-from ..schemas import ContactMessageCreate, SuccessResponse
+from ..schemas import ContactMessage as ContactMessageSchema, ContactMessageCreate, Page, SuccessResponse
 from ..utils.email_service import EmailService
+from ..utils.pagination import paginate, date_range, schema_columns
+from ..utils.rate_limit import rate_limiter
+from ..utils.responses import ORJSONResponse
 
 router = APIRouter()
 email_service = EmailService()
 
 @router.post("/contact", response_model=SuccessResponse)
-async def submit_contact_message(message_data: ContactMessageCreate, db: Session = Depends(get_db)):
+async def submit_contact_message(message_data: ContactMessageCreate, db: AsyncSession = Depends(get_db)):
     """Submit a contact message"""
+    await rate_limiter.enforce_email("/api/contact", message_data.email)
+    
     try:
         # Create contact message
         db_message = ContactMessage(
@@ -21,9 +30,8 @@ async def submit_contact_message(message_data: ContactMessageCreate, db: Session
         )
         
         db.add(db_message)
-        db.commit()
         
-        # Send notification email to admin
+        # Queue notification email to admin
         admin_subject = "New Contact Message - Home' Kitchen"
         admin_html = f"""
         <h2>New Contact Message</h2>
@@ -33,16 +41,18 @@ async def submit_contact_message(message_data: ContactMessageCreate, db: Session
         <p><strong>Message:</strong></p>
         <p>{message_data.message}</p>
         """
-        email_service.send_admin_notification(admin_subject, admin_html)
+        email_service.queue_admin_notification(db, admin_subject, admin_html)
         
-        # Send confirmation email to customer
+        # Queue confirmation email to customer
         customer_subject = "Message Received - Home' Kitchen"
         customer_html = f"""
         <h2>Thank you for your message!</h2>
         <p>We have received your message and will get back to you within 24 hours.</p>
         <p>If you need immediate assistance, please call us at +1 (555) 123-4567</p>
         """
-        email_service.send_email(message_data.email, customer_subject, customer_html)
+        email_service.queue_email(db, message_data.email, customer_subject, customer_html)
+        
+        await db.commit()
         
         return SuccessResponse(
             success=True,
@@ -50,14 +60,25 @@ async def submit_contact_message(message_data: ContactMessageCreate, db: Session
         )
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error sending message: {str(e)}")
 
-@router.get("/contact/messages")
-async def get_contact_messages(db: Session = Depends(get_db)):
-    """Get all contact messages (admin only)"""
+@router.get("/contact/messages", response_model=Page[ContactMessageSchema])
+async def get_contact_messages(
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.admin_page_size, ge=1, le=settings.admin_page_max_size),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get contact messages, newest first, one page at a time (admin only)"""
     try:
-        messages = db.query(ContactMessage).order_by(ContactMessage.created_at.desc()).all()
-        return messages
+        stmt = select(*schema_columns(ContactMessage, ContactMessageSchema)).where(
+            *date_range(db, ContactMessage.created_at, created_after, created_before)
+        )
+        
+        return ORJSONResponse(await paginate(db, stmt, ContactMessage.created_at, ContactMessage.id, cursor, limit))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching messages: {str(e)}")
@@ -0,0 +1,120 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from typing import Optional
+from datetime import datetime, date
+from decimal import Decimal
+from enum import Enum
+import csv
+import io
+import json
+from ..config import settings
+from ..database import read_session
+from ..models import Order, OrderItem, CareerApplication, ContactMessage, NewsletterSubscriber
+from ..utils.pagination import date_range
+
+router = APIRouter()
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv",
+    ExportFormat.ndjson: "application/x-ndjson",
+}
+
+# Each export is a plain column select (no ORM hydration) and the timestamp it filters on
+EXPORTS = {
+    "orders": (
+        # One row per order line, with the order's columns repeated on each line
+        select(
+            Order.id.label("order_id"),
+            Order.created_at,
+            Order.status,
+            Order.customer_name,
+            Order.customer_email,
+            Order.customer_phone,
+            Order.customer_address,
+            Order.payment_method,
+            Order.total_amount,
+            OrderItem.id.label("order_item_id"),
+            OrderItem.menu_item_id,
+            OrderItem.item_name,
+            OrderItem.quantity,
+            OrderItem.price
+        ).outerjoin(OrderItem, OrderItem.order_id == Order.id).order_by(Order.id, OrderItem.id),
+        Order.created_at
+    ),
+    "applications": (
+        select(*CareerApplication.__table__.c).order_by(CareerApplication.id),
+        CareerApplication.created_at
+    ),
+    "messages": (
+        select(*ContactMessage.__table__.c).order_by(ContactMessage.id),
+        ContactMessage.created_at
+    ),
+    "subscribers": (
+        select(*NewsletterSubscriber.__table__.c).order_by(NewsletterSubscriber.id),
+        NewsletterSubscriber.subscribed_at
+    ),
+}
+
+def to_text(value):
+    """Render a column value for CSV/NDJSON output"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def format_csv(rows, header=None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows(["" if value is None else to_text(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+def format_ndjson(columns, rows):
+    return "".join(json.dumps(dict(zip(columns, row)), default=to_text) + "\n" for row in rows)
+
+async def stream_export(dataset: str, export_format: ExportFormat,
+                        created_after: Optional[datetime], created_before: Optional[datetime]):
+    """Yield an export chunk by chunk from a server-side cursor"""
+    stmt, created_col = EXPORTS[dataset]
+    # The session lives inside the generator so it stays open while the response streams
+    async with read_session() as db:
+        stmt = stmt.where(*date_range(db, created_col, created_after, created_before))
+        result = await db.stream(stmt.execution_options(yield_per=settings.export_chunk_size))
+        columns = list(result.keys())
+
+        if export_format == ExportFormat.csv:
+            yield format_csv([], header=columns)
+
+        async for rows in result.partitions():
+            if export_format == ExportFormat.csv:
+                yield format_csv(rows)
+            else:
+                yield format_ndjson(columns, rows)
+
+@router.get("/exports/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: ExportFormat = ExportFormat.csv,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None
+):
+    """Stream orders, applications, messages or subscribers as CSV or NDJSON (admin only)"""
+    if dataset not in EXPORTS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown export: {dataset}. Choose from {', '.join(EXPORTS)}"
+        )
+
+    filename = f"{dataset}.{format.value}"
+    return StreamingResponse(
+        stream_export(dataset, format, created_after, created_before),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
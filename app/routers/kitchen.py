@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from datetime import timedelta
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db
+from ..models import Order
+from ..schemas import KitchenTicket, KitchenTicketItem
+from ..utils.analytics import SalesRollup
+from ..utils.events import broker, order_topic, status_event
+from ..utils.kitchen import kitchen
+
+router = APIRouter()
+
+def ticket_response(ticket, ready_at=None):
+    if ready_at is None and ticket.started_at is not None:
+        ready_at = ticket.started_at + timedelta(minutes=ticket.prep_minutes)
+    return KitchenTicket(
+        order_id=ticket.order_id,
+        status=ticket.status,
+        priority=ticket.priority,
+        prep_minutes=ticket.prep_minutes,
+        items=[KitchenTicketItem(item_name=name, quantity=quantity) for name, quantity in ticket.items],
+        created_at=ticket.created_at,
+        started_at=ticket.started_at,
+        ready_at=ready_at
+    )
+
+@router.get("/kitchen/queue", response_model=List[KitchenTicket])
+async def get_kitchen_queue():
+    """Open orders in cooking order with their estimated ready times (kitchen display)"""
+    return [ticket_response(ticket, ready_at) for ticket, ready_at in kitchen.schedule()]
+
+@router.post("/kitchen/next", response_model=List[KitchenTicket])
+async def start_next_orders(
+    limit: Optional[int] = Query(None, ge=1, le=50),
+    db: AsyncSession = Depends(get_db)
+):
+    """Start preparing the next pending orders, one per free station unless limit is given"""
+    candidates = kitchen.peek(limit or kitchen.free_stations)
+    if not candidates:
+        return []
+
+    try:
+        # Only orders still pending are started, so two displays can't start the same order
+        result = await db.execute(
+            update(Order)
+            .where(Order.id.in_([ticket.order_id for ticket in candidates]), Order.status == "pending")
+            .values(status="preparing")
+            .returning(Order.id)
+        )
+        started = set(result.scalars().all())
+        rollup = SalesRollup()
+        rollup.move_status("pending", "preparing", len(started))
+        await rollup.save(db)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error starting orders: {str(e)}")
+
+    for order_id in started:
+        await kitchen.status_changed(order_id, "preparing")
+        await broker.publish(order_topic(order_id), status_event(order_id, "preparing"))
+
+    return [ticket_response(ticket) for ticket in candidates if ticket.order_id in started]
+
+@router.put("/kitchen/orders/{order_id}/priority")
+async def update_order_priority(
+    order_id: int,
+    priority: int = Query(..., ge=-10, le=10),
+    db: AsyncSession = Depends(get_db)
+):
+    """Move an order up (higher) or down (lower) the kitchen queue"""
+    try:
+        order = await db.scalar(select(Order).where(Order.id == order_id))
+
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
+
+        order.priority = priority
+        await db.commit()
+
+        await kitchen.priority_changed(order_id, priority)
+
+        return {"success": True, "message": f"Order priority set to {priority}"}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error updating order priority: {str(e)}")
@@ -1,47 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
-from ..models import MenuItem
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import List, Optional
+from decimal import Decimal
 from ..schemas import MenuItem as MenuItemSchema
+from ..utils.menu_cache import menu_cache, menu_adapter, cached_response
 
 router = APIRouter()
 
 @router.get("/menu", response_model=List[MenuItemSchema])
-async def get_menu(db: Session = Depends(get_db)):
+async def get_menu(request: Request):
     """Get all menu items"""
     try:
-        menu_items = db.query(MenuItem).filter(MenuItem.is_available == True).order_by(MenuItem.category, MenuItem.name).all()
-        return menu_items
+        snapshot = await menu_cache.get()
+        return cached_response(request, snapshot.full)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching menu: {str(e)}")
 
+@router.get("/menu/categories", response_model=List[str])
+async def get_categories(request: Request):
+    """Get all available menu categories"""
+    try:
+        snapshot = await menu_cache.get()
+        return cached_response(request, snapshot.category_list)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching categories: {str(e)}")
+
+@router.get("/menu/search", response_model=List[MenuItemSchema])
+async def search_menu(
+    q: Optional[str] = Query(None, max_length=100),
+    category: Optional[str] = None,
+    min_price: Optional[Decimal] = Query(None, ge=0),
+    max_price: Optional[Decimal] = Query(None, ge=0),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Search menu items by name, description and category, tolerating typos"""
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(status_code=400, detail="min_price cannot be greater than max_price")
+
+    try:
+        snapshot = await menu_cache.get()
+        results = snapshot.index.search(q, category, min_price, max_price, limit)
+        return Response(content=menu_adapter.dump_json(results), media_type="application/json")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching menu: {str(e)}")
+
 @router.get("/menu/{category}", response_model=List[MenuItemSchema])
-async def get_menu_by_category(category: str, db: Session = Depends(get_db)):
+async def get_menu_by_category(category: str, request: Request):
     """Get menu items by category"""
     try:
-        menu_items = db.query(MenuItem).filter(
-            MenuItem.category == category,
-            MenuItem.is_available == True
-        ).order_by(MenuItem.name).all()
-        
-        if not menu_items:
+        snapshot = await menu_cache.get()
+        payload = snapshot.categories.get(category)
+
+        if payload is None:
             raise HTTPException(status_code=404, detail=f"No items found for category: {category}")
-            
-        return menu_items
+
+        return cached_response(request, payload)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching menu by category: {str(e)}")
-
-@router.get("/menu/categories")
-async def get_categories(db: Session = Depends(get_db)):
-    """Get all available menu categories"""
-    try:
-        categories = db.query(MenuItem.category).filter(
-            MenuItem.is_available == True
-        ).distinct().all()
-        
-        return [category[0] for category in categories]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching categories: {str(e)}")
@@ -1,19 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import get_db
-from ..models import NewsletterSubscriber
-from ..schemas import NewsletterSubscriptionCreate, SuccessResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select, update
+from typing import Optional
+from datetime import datetime
+from ..config import settings
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db, get_read_db
+from ..models import CampaignDelivery, NewsletterCampaign, NewsletterSubscriber
+from ..schemas import Campaign, CampaignCreate, NewsletterSubscription, NewsletterSubscriptionCreate, Page, SuccessResponse
+from ..utils.campaigns import campaign_sender, render_campaign, utcnow
+from ..utils.pagination import paginate, date_range, schema_columns
+from ..utils.rate_limit import rate_limiter
+from ..utils.responses import ORJSONResponse
 
 router = APIRouter()
 
 @router.post("/newsletter", response_model=SuccessResponse)
-async def subscribe_to_newsletter(subscription_data: NewsletterSubscriptionCreate, db: Session = Depends(get_db)):
+async def subscribe_to_newsletter(subscription_data: NewsletterSubscriptionCreate, db: AsyncSession = Depends(get_db)):
     """Subscribe to newsletter"""
+    await rate_limiter.enforce_email("/api/newsletter", subscription_data.email)
+    
     try:
         # Check if already subscribed
-        existing_subscriber = db.query(NewsletterSubscriber).filter(
-            NewsletterSubscriber.email == subscription_data.email
-        ).first()
+        existing_subscriber = await db.scalar(
+            select(NewsletterSubscriber).where(
+                NewsletterSubscriber.email == subscription_data.email
+            )
+        )
         
         if existing_subscriber:
             raise HTTPException(status_code=400, detail="Email already subscribed")
@@ -24,7 +36,7 @@ async def subscribe_to_newsletter(subscription_data: NewsletterSubscriptionCreat
         )
         
         db.add(db_subscription)
-        db.commit()
+        await db.commit()
         
         return SuccessResponse(
             success=True,
@@ -34,22 +46,30 @@ async def subscribe_to_newsletter(subscription_data: NewsletterSubscriptionCreat
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error subscribing to newsletter: {str(e)}")
 
 @router.delete("/newsletter/{email}")
-async def unsubscribe_from_newsletter(email: str, db: Session = Depends(get_db)):
+async def unsubscribe_from_newsletter(email: str, db: AsyncSession = Depends(get_db)):
     """Unsubscribe from newsletter"""
     try:
-        subscriber = db.query(NewsletterSubscriber).filter(
-            NewsletterSubscriber.email == email
-        ).first()
+        subscriber = await db.scalar(
+            select(NewsletterSubscriber).where(
+                NewsletterSubscriber.email == email
+            )
+        )
         
         if not subscriber:
             raise HTTPException(status_code=404, detail="Email not found in subscribers")
         
-        db.delete(subscriber)
-        db.commit()
+        # Campaigns still in progress don't mail an address that has left
+        await db.execute(
+            update(CampaignDelivery)
+            .where(CampaignDelivery.subscriber_id == subscriber.id, CampaignDelivery.status == "pending")
+            .values(status="skipped")
+        )
+        await db.delete(subscriber)
+        await db.commit()
         
         return SuccessResponse(
             success=True,
@@ -59,14 +79,117 @@ async def unsubscribe_from_newsletter(email: str, db: Session = Depends(get_db))
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error unsubscribing from newsletter: {str(e)}")
 
-@router.get("/newsletter/subscribers")
-async def get_newsletter_subscribers(db: Session = Depends(get_db)):
-    """Get all newsletter subscribers (admin only)"""
+@router.get("/newsletter/subscribers", response_model=Page[NewsletterSubscription])
+async def get_newsletter_subscribers(
+    subscribed_after: Optional[datetime] = None,
+    subscribed_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.admin_page_size, ge=1, le=settings.admin_page_max_size),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get newsletter subscribers, newest first, one page at a time (admin only)"""
     try:
-        subscribers = db.query(NewsletterSubscriber).order_by(NewsletterSubscriber.subscribed_at.desc()).all()
-        return subscribers
+        stmt = select(*schema_columns(NewsletterSubscriber, NewsletterSubscription)).where(
+            *date_range(db, NewsletterSubscriber.subscribed_at, subscribed_after, subscribed_before)
+        )
+        
+        return ORJSONResponse(await paginate(db, stmt, NewsletterSubscriber.subscribed_at, NewsletterSubscriber.id, cursor, limit))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching subscribers: {str(e)}")
+
+async def campaign_response(db: AsyncSession, campaign: NewsletterCampaign):
+    counts = await db.execute(
+        select(CampaignDelivery.status, func.count())
+        .where(CampaignDelivery.campaign_id == campaign.id)
+        .group_by(CampaignDelivery.status)
+    )
+    response = Campaign.model_validate(campaign)
+    response.deliveries = dict(counts.all())
+    return response
+
+@router.post("/newsletter/campaigns", response_model=Campaign)
+async def create_campaign(campaign_data: CampaignCreate, db: AsyncSession = Depends(get_db)):
+    """Create a draft campaign, rendering its template once for every recipient (admin only)"""
+    try:
+        html_content = render_campaign(campaign_sender.email_service, campaign_data.subject, campaign_data.template)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid campaign template: {str(e)}")
+
+    try:
+        campaign = NewsletterCampaign(
+            subject=campaign_data.subject,
+            template=campaign_data.template,
+            html_content=html_content,
+            status="draft"
+        )
+        db.add(campaign)
+        await db.commit()
+        await db.refresh(campaign)
+        return await campaign_response(db, campaign)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error creating campaign: {str(e)}")
+
+@router.get("/newsletter/campaigns/{campaign_id}", response_model=Campaign)
+async def get_campaign(campaign_id: int, db: AsyncSession = Depends(get_read_db)):
+    """Get a campaign and its delivery progress (admin only)"""
+    try:
+        campaign = await db.scalar(select(NewsletterCampaign).where(NewsletterCampaign.id == campaign_id))
+        if not campaign:
+            raise HTTPException(status_code=404, detail="Campaign not found")
+        return await campaign_response(db, campaign)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching campaign: {str(e)}")
+
+async def transition_campaign(db: AsyncSession, campaign_id: int, from_statuses, values: dict):
+    """Move a campaign between statuses, or 404/409 if it doesn't exist or can't move"""
+    result = await db.execute(
+        update(NewsletterCampaign)
+        .where(NewsletterCampaign.id == campaign_id, NewsletterCampaign.status.in_(from_statuses))
+        .values(**values)
+    )
+    if result.rowcount != 1:
+        await db.rollback()
+        status = await db.scalar(select(NewsletterCampaign.status).where(NewsletterCampaign.id == campaign_id))
+        if status is None:
+            raise HTTPException(status_code=404, detail="Campaign not found")
+        raise HTTPException(status_code=409, detail=f"Campaign is {status}")
+    await db.commit()
+
+@router.post("/newsletter/campaigns/{campaign_id}/send", response_model=SuccessResponse)
+async def send_campaign(campaign_id: int, db: AsyncSession = Depends(get_db)):
+    """Start sending a draft campaign, or resume a cancelled one (admin only)"""
+    if not campaign_sender.email_service.is_configured:
+        raise HTTPException(status_code=503, detail="Email delivery is not configured")
+
+    try:
+        await transition_campaign(db, campaign_id, ("draft", "cancelled"), {
+            "status": "sending",
+            "started_at": func.coalesce(NewsletterCampaign.started_at, utcnow())
+        })
+        campaign_sender.notify()
+        return SuccessResponse(success=True, message="Campaign is sending")
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error sending campaign: {str(e)}")
+
+@router.post("/newsletter/campaigns/{campaign_id}/cancel", response_model=SuccessResponse)
+async def cancel_campaign(campaign_id: int, db: AsyncSession = Depends(get_db)):
+    """Stop a sending campaign; messages already handed to SMTP still arrive (admin only)"""
+    try:
+        await transition_campaign(db, campaign_id, ("sending",), {"status": "cancelled"})
+        return SuccessResponse(success=True, message="Campaign cancelled")
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error cancelling campaign: {str(e)}")
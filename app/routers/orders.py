@@ -1,68 +1,297 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import List, Optional, Union
+from datetime import datetime
+import asyncio
+import json
+from sqlalchemy import bindparam, select, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..database import SessionLocal, get_db, get_read_db, mark_recent_write
 from ..models import Order, OrderItem
-from ..schemas import OrderCreate, OrderResponse
+from ..schemas import CustomerInfo, Order as OrderSchema, OrderCreate, OrderResponse, OrderBatchCreate, OrderBatchResponse, OrderBatchResult, OrderSummary, Page
+from ..utils.analytics import SalesRollup
 from ..utils.email_service import EmailService
-from decimal import Decimal
+from ..utils.events import broker, order_topic, status_event
+from ..utils.idempotency import IdempotencyKeyMismatch, hash_request, idempotency_store
+from ..utils.kitchen import kitchen, ticket_for_order
+from ..utils.pagination import paginate, date_range, schema_columns
+from ..utils.pricing import PricingError, load_menu_items, price_items, price_order, check_client_total
+from ..utils.rate_limit import rate_limiter
+from ..utils.responses import ORJSONResponse
 
 router = APIRouter()
 email_service = EmailService()
 
+# Order detail statements are built once and run with bound parameters, so every
+# call reuses SQLAlchemy's compiled form. selectinload fetches the items of all
+# matched orders in one extra IN query: two queries however many orders.
+ORDER_DETAIL = (
+    select(Order)
+    .options(selectinload(Order.items))
+    .where(Order.id == bindparam("order_id"))
+)
+ORDERS_BY_ID = (
+    select(Order)
+    .options(selectinload(Order.items))
+    .where(Order.id.in_(bindparam("order_ids", expanding=True)))
+)
+
+def parse_order_ids(ids: str):
+    """Order IDs from a comma-separated list, in order and without repeats"""
+    try:
+        order_ids = list(dict.fromkeys(int(order_id) for order_id in ids.split(",") if order_id.strip()))
+    except ValueError:
+        raise ValueError("ids must be a comma-separated list of order IDs")
+    if not order_ids:
+        raise ValueError("ids must name at least one order")
+    if len(order_ids) > settings.admin_page_max_size:
+        raise ValueError(f"At most {settings.admin_page_max_size} orders can be fetched at once")
+    return order_ids
+
+def order_values(customer_info: CustomerInfo, priced):
+    """Column values for a new Order row"""
+    return {
+        "customer_name": customer_info.name,
+        "customer_email": customer_info.email,
+        "customer_phone": customer_info.phone,
+        "customer_address": customer_info.address,
+        "total_amount": priced.total,
+        "status": "pending"
+    }
+
+def order_item_values(order_id: int, priced):
+    """Column values for the OrderItem rows of a priced order"""
+    return [
+        {
+            "order_id": order_id,
+            "menu_item_id": line.menu_item_id,
+            "item_name": line.item_name,
+            "quantity": line.quantity,
+            "price": line.unit_price
+        }
+        for line in priced.lines
+    ]
+
 @router.post("/orders", response_model=OrderResponse)
-async def place_order(order_data: OrderCreate, db: Session = Depends(get_db)):
-    """Place a new order"""
+async def place_order(
+    order_data: OrderCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    db: AsyncSession = Depends(get_db)
+):
+    """Place a new order.
+
+    Retries that send the same Idempotency-Key get the original response
+    back without creating another order or sending another email.
+    """
+    request_hash = hash_request(order_data.model_dump_json().encode())
     try:
+        if idempotency_key:
+            stored = await idempotency_store.lookup(db, idempotency_key, request_hash)
+            if stored is not None:
+                response.headers["Idempotent-Replayed"] = "true"
+                return OrderResponse.model_validate_json(stored)
+            await idempotency_store.reserve(db, idempotency_key, request_hash)
+        
         # Extract customer info
         customer_info = order_data.customerInfo
         
-        # Create order
-        db_order = Order(
-            customer_name=customer_info["name"],
-            customer_email=customer_info["email"],
-            customer_phone=customer_info["phone"],
-            customer_address=customer_info["address"],
-            total_amount=order_data.totalAmount,
-            status="pending"
-        )
+        # Replays above are free; new orders count against the customer's email
+        await rate_limiter.enforce_email("/api/orders", customer_info.email)
         
-        db.add(db_order)
-        db.flush()  # Get the order ID
+        # Price every line against the menu in one lookup
+        priced = await price_order(db, order_data.items)
+        check_client_total(priced, order_data.totalAmount)
         
-        # Create order items
-        for item in order_data.items:
-            db_order_item = OrderItem(
-                order_id=db_order.id,
-                item_name=item.item_name,
-                quantity=item.quantity,
-                price=item.price
-            )
-            db.add(db_order_item)
+        # Create order, getting its ID and timestamp back from the same statement
+        order_id, created_at = (await db.execute(
+            insert(Order).values(**order_values(customer_info, priced)).returning(Order.id, Order.created_at)
+        )).one()
+        
+        # Create order items in a single executemany
+        await db.execute(insert(OrderItem), order_item_values(order_id, priced))
         
-        db.commit()
+        # Count the sale in the analytics rollups as part of the same transaction
+        rollup = SalesRollup()
+        rollup.add_priced(created_at, priced)
+        await rollup.save(db)
         
-        # Send confirmation email
-        email_service.send_order_confirmation(
-            customer_info["email"],
-            db_order.id,
-            float(order_data.totalAmount)
+        # Estimate delivery from the kitchen's current queue
+        ticket = ticket_for_order(order_id, priced)
+        estimated_minutes = kitchen.estimate_minutes([ticket])[order_id]
+        
+        # Queue confirmation email with the order so it is sent after commit
+        email_service.queue_order_confirmation(
+            db,
+            customer_info.email,
+            order_id,
+            float(priced.total),
+            estimated_minutes
         )
         
-        return OrderResponse(
+        order_response = OrderResponse(
             success=True,
-            orderId=db_order.id,
-            message="Order placed successfully"
+            orderId=order_id,
+            message="Order placed successfully",
+            estimatedMinutes=estimated_minutes
         )
+        if idempotency_key:
+            await idempotency_store.complete(db, idempotency_key, order_response.model_dump_json())
+        
+        await db.commit()
+        mark_recent_write(response)
         
+        await kitchen.placed([ticket])
+        
+        return order_response
+        
+    except HTTPException:
+        await db.rollback()
+        raise
+    except IdempotencyKeyMismatch as e:
+        await db.rollback()
+        raise HTTPException(status_code=422, detail=str(e))
+    except IntegrityError as e:
+        await db.rollback()
+        # A concurrent request with the same key committed first; replay its response
+        if idempotency_key:
+            stored = await idempotency_store.lookup(db, idempotency_key, request_hash)
+            if stored is not None:
+                response.headers["Idempotent-Replayed"] = "true"
+                return OrderResponse.model_validate_json(stored)
+        raise HTTPException(status_code=500, detail=f"Error placing order: {str(e)}")
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error placing order: {str(e)}")
 
-@router.get("/orders/{order_id}")
-async def get_order_status(order_id: int, db: Session = Depends(get_db)):
-    """Get order status by order ID"""
+@router.post("/orders/batch", response_model=OrderBatchResponse)
+async def place_order_batch(batch: OrderBatchCreate, response: Response, db: AsyncSession = Depends(get_db)):
+    """Import many orders in one transaction, reporting errors per order"""
+    if len(batch.orders) > settings.order_batch_max_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch may contain at most {settings.order_batch_max_size} orders"
+        )
+
     try:
-        order = db.query(Order).filter(Order.id == order_id).first()
+        results = [OrderBatchResult(index=index, success=False) for index in range(len(batch.orders))]
+
+        # Validate each order on its own so one bad order doesn't reject the batch
+        parsed = []
+        for index, raw_order in enumerate(batch.orders):
+            try:
+                parsed.append((index, OrderCreate.model_validate(raw_order)))
+            except ValidationError as e:
+                results[index].error = "; ".join(
+                    f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()
+                )
+
+        # Resolve the menu items of every order with a single lookup
+        lookup = await load_menu_items(db, [line for _, order in parsed for line in order.items])
+
+        accepted = []
+        for index, order in parsed:
+            try:
+                priced = price_items(order.items, lookup)
+                check_client_total(priced, order.totalAmount)
+                accepted.append((index, order, priced, order_values(order.customerInfo, priced)))
+            except ValueError as e:
+                results[index].error = str(e)
+
+        if accepted:
+            # One multi-row INSERT ... RETURNING for the orders, one executemany for their items
+            created = (await db.execute(
+                insert(Order).returning(Order.id, Order.created_at, sort_by_parameter_order=True),
+                [values for _, _, _, values in accepted]
+            )).all()
+            order_ids = [row.id for row in created]
+
+            tickets = [ticket_for_order(order_id, priced) for (_, _, priced, _), order_id in zip(accepted, order_ids)]
+            estimates = kitchen.estimate_minutes(tickets)
+
+            item_rows = []
+            rollup = SalesRollup()
+            for (index, order, priced, _), (order_id, created_at) in zip(accepted, created):
+                item_rows.extend(order_item_values(order_id, priced))
+                rollup.add_priced(created_at, priced)
+                email_service.queue_order_confirmation(
+                    db, order.customerInfo.email, order_id, float(priced.total), estimates[order_id]
+                )
+                results[index].success = True
+                results[index].orderId = order_id
+            await db.execute(insert(OrderItem), item_rows)
+            await rollup.save(db)
+
+            await db.commit()
+            mark_recent_write(response)
+
+            await kitchen.placed(tickets)
+
+        return OrderBatchResponse(
+            success=len(accepted) == len(results),
+            created=len(accepted),
+            failed=len(results) - len(accepted),
+            results=results
+        )
+
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error importing orders: {str(e)}")
+
+@router.get("/orders", response_model=Union[Page[OrderSummary], List[OrderSchema]])
+async def get_orders(
+    ids: Optional[str] = Query(None, description="Comma-separated order IDs to fetch with their items"),
+    status: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.admin_page_size, ge=1, le=settings.admin_page_max_size),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get orders, newest first, one page at a time (admin only).
+
+    With ?ids=1,2,3 returns those orders with their items instead, in the
+    order given; unknown IDs are left out (kitchen display).
+    """
+    if ids is not None:
+        try:
+            order_ids = parse_order_ids(ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        try:
+            orders = {order.id: order for order in (await db.scalars(ORDERS_BY_ID, {"order_ids": order_ids})).all()}
+            return ORJSONResponse([
+                OrderSchema.model_validate(orders[order_id]).model_dump()
+                for order_id in order_ids
+                if order_id in orders
+            ])
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching orders: {str(e)}")
+    
+    try:
+        stmt = select(*schema_columns(Order, OrderSummary)).where(*date_range(db, Order.created_at, created_after, created_before))
+        if status:
+            stmt = stmt.where(Order.status == status)
+        
+        return ORJSONResponse(await paginate(db, stmt, Order.created_at, Order.id, cursor, limit))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching orders: {str(e)}")
+
+@router.get("/orders/{order_id}", response_model=OrderSchema)
+async def get_order_status(order_id: int, db: AsyncSession = Depends(get_read_db)):
+    """Get an order with its items by order ID"""
+    try:
+        order = await db.scalar(ORDER_DETAIL, {"order_id": order_id})
         
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
@@ -75,21 +304,113 @@ async def get_order_status(order_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error fetching order: {str(e)}")
 
 @router.put("/orders/{order_id}/status")
-async def update_order_status(order_id: int, status: str, db: Session = Depends(get_db)):
+async def update_order_status(order_id: int, status: str, db: AsyncSession = Depends(get_db)):
     """Update order status (admin only)"""
     try:
-        order = db.query(Order).filter(Order.id == order_id).first()
-        
-        if not order:
-            raise HTTPException(status_code=404, detail="Order not found")
+        # Compare-and-set: the update only applies if the status is still the one
+        # read, so concurrent updates each move the rollup counts from the status
+        # they actually replaced. A lost race re-reads and tries again.
+        while True:
+            old_status = (await db.execute(select(Order.status).where(Order.id == order_id))).first()
+            if old_status is None:
+                raise HTTPException(status_code=404, detail="Order not found")
             
-        order.status = status
-        db.commit()
+            old_status = old_status.status
+            result = await db.execute(
+                update(Order)
+                .where(Order.id == order_id, Order.status.is_not_distinct_from(old_status))
+                .values(status=status)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 1:
+                break
+        
+        rollup = SalesRollup()
+        rollup.move_status(old_status, status)
+        await rollup.save(db)
+        await db.commit()
+        
+        # Push the change to the kitchen queue and to clients following this order
+        await kitchen.status_changed(order_id, status)
+        await broker.publish(order_topic(order_id), status_event(order_id, status))
         
         return {"success": True, "message": f"Order status updated to {status}"}
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error updating order status: {str(e)}")
+
+async def fetch_order_status(order_id: int):
+    """Current status of an order, or None if it doesn't exist.
+
+    Uses its own short-lived session so long-lived event streams don't hold
+    a pooled connection open.
+    """
+    async with SessionLocal() as db:
+        return await db.scalar(select(Order.status).where(Order.id == order_id))
+
+async def sse_stream(subscription, initial_event: dict):
+    try:
+        yield f"event: status\ndata: {json.dumps(initial_event)}\n\n"
+        while True:
+            event = await subscription.get(timeout=settings.sse_heartbeat_interval)
+            if event is None:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: status\ndata: {json.dumps(event)}\n\n"
+    finally:
+        subscription.close()
+
+@router.get("/orders/{order_id}/events")
+async def stream_order_status(order_id: int):
+    """Stream order status changes as Server-Sent Events"""
+    # Subscribe before reading the current status so no change slips in between
+    subscription = broker.subscribe(order_topic(order_id))
+    try:
+        status = await fetch_order_status(order_id)
+    except Exception as e:
+        subscription.close()
+        raise HTTPException(status_code=500, detail=f"Error fetching order: {str(e)}")
+
+    if status is None:
+        subscription.close()
+        raise HTTPException(status_code=404, detail="Order not found")
+
+    return StreamingResponse(
+        sse_stream(subscription, status_event(order_id, status)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/orders/{order_id}/ws")
+async def order_status_websocket(websocket: WebSocket, order_id: int):
+    """Push order status changes over a WebSocket"""
+    subscription = broker.subscribe(order_topic(order_id))
+    try:
+        status = await fetch_order_status(order_id)
+        if status is None:
+            await websocket.close(code=4404, reason="Order not found")
+            return
+
+        await websocket.accept()
+        await websocket.send_json(status_event(order_id, status))
+
+        # Clients only listen; a receive completing means they went away
+        disconnected = asyncio.ensure_future(websocket.receive())
+        try:
+            while True:
+                next_event = asyncio.ensure_future(subscription.get())
+                done, _ = await asyncio.wait({next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                if disconnected in done:
+                    next_event.cancel()
+                    break
+                await websocket.send_json(next_event.result())
+        finally:
+            disconnected.cancel()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscription.close()
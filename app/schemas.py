@@ -1,7 +1,7 @@
-from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from typing import Any, Dict, Generic, List, Optional, TypeVar
 from decimal import Decimal
-from datetime import datetime
+from datetime import date, datetime
 
 # Menu Item Schemas
 class MenuItemBase(BaseModel):
@@ -11,6 +11,7 @@ class MenuItemBase(BaseModel):
     category: str
     image_url: Optional[str] = None
     video_url: Optional[str] = None
+    prep_time: int = 15
     is_available: bool = True
 
 class MenuItemCreate(MenuItemBase):
@@ -29,12 +30,23 @@ class OrderItemBase(BaseModel):
     quantity: int
     price: Decimal
 
-class OrderItemCreate(OrderItemBase):
-    pass
+class OrderItemCreate(BaseModel):
+    # Lines are priced server-side; any client-sent price is ignored
+    menu_item_id: Optional[int] = None
+    item_name: Optional[str] = None
+    quantity: int = Field(gt=0)
+    price: Optional[Decimal] = None
+
+    @model_validator(mode="after")
+    def check_item_reference(self):
+        if self.menu_item_id is None and not self.item_name:
+            raise ValueError("Either menu_item_id or item_name is required")
+        return self
 
 class OrderItem(OrderItemBase):
     id: int
     order_id: int
+    menu_item_id: Optional[int] = None
     
     class Config:
         from_attributes = True
@@ -47,20 +59,36 @@ class OrderBase(BaseModel):
     total_amount: Decimal
     payment_method: str = "cash"
 
+class CustomerInfo(BaseModel):
+    name: str
+    email: EmailStr
+    phone: str
+    address: str
+
 class OrderCreate(BaseModel):
-    customerInfo: dict
+    customerInfo: CustomerInfo
     items: List[OrderItemCreate]
-    totalAmount: Decimal
+    # Optional client-side total, checked against the server-side price
+    totalAmount: Optional[Decimal] = None
 
 class Order(OrderBase):
     id: int
     status: str
+    priority: int = 0
     created_at: datetime
     items: List[OrderItem]
     
     class Config:
         from_attributes = True
 
+class OrderSummary(OrderBase):
+    id: int
+    status: str
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
 # Career Application Schemas
 class CareerApplicationBase(BaseModel):
     name: str
@@ -76,6 +104,7 @@ class CareerApplicationCreate(CareerApplicationBase):
 class CareerApplication(CareerApplicationBase):
     id: int
     resume_path: Optional[str] = None
+    resume_sha256: Optional[str] = None
     status: str
     created_at: datetime
     
@@ -113,7 +142,85 @@ class NewsletterSubscription(NewsletterSubscriptionBase):
     class Config:
         from_attributes = True
 
+# Newsletter Campaign Schemas
+class CampaignCreate(BaseModel):
+    subject: str = Field(min_length=1, max_length=200)
+    template: str = Field(min_length=1)  # Jinja; {{ subject }} and {{ email }} are available
+
+class Campaign(BaseModel):
+    id: int
+    subject: str
+    status: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    deliveries: Dict[str, int] = {}  # recipients per delivery status
+    
+    class Config:
+        from_attributes = True
+
+# Analytics Schemas
+class RevenueBucket(BaseModel):
+    bucket: datetime  # start of the UTC hour or day
+    orders: int
+    revenue: Decimal
+    items_sold: int
+    average_order_value: Optional[Decimal] = None
+
+class TopItem(BaseModel):
+    item_name: str
+    quantity: int
+    revenue: Decimal  # before tax
+
+class SalesSummary(BaseModel):
+    start: datetime
+    end: datetime
+    orders: int
+    revenue: Decimal
+    items_sold: int
+    average_order_value: Optional[Decimal] = None
+
+class StatusCount(BaseModel):
+    status: str
+    orders: int
+    share: float  # of all orders
+
+class ForecastItem(BaseModel):
+    menu_item_id: int
+    item_name: str
+    category: str
+    expected: float
+    prep_quantity: int  # expected, rounded up
+    by_hour: Dict[int, float] = {}  # UTC hour -> expected quantity
+
+class Forecast(BaseModel):
+    day: date
+    generated_at: datetime
+    history_days: int
+    items: List[ForecastItem]
+
+# Kitchen Schemas
+class KitchenTicketItem(BaseModel):
+    item_name: str
+    quantity: int
+
+class KitchenTicket(BaseModel):
+    order_id: int
+    status: str
+    priority: int
+    prep_minutes: int
+    items: List[KitchenTicketItem]
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    ready_at: Optional[datetime] = None
+
 # Response Schemas
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
 class SuccessResponse(BaseModel):
     success: bool
     message: str
@@ -122,3 +229,21 @@ class OrderResponse(BaseModel):
     success: bool
     orderId: int
     message: str
+    # Minutes until delivery, from the kitchen schedule at the time of ordering
+    estimatedMinutes: Optional[int] = None
+
+class OrderBatchCreate(BaseModel):
+    # Orders are validated one by one so errors can be reported per order
+    orders: List[Dict[str, Any]]
+
+class OrderBatchResult(BaseModel):
+    index: int
+    success: bool
+    orderId: Optional[int] = None
+    error: Optional[str] = None
+
+class OrderBatchResponse(BaseModel):
+    success: bool
+    created: int
+    failed: int
+    results: List[OrderBatchResult]
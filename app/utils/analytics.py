@@ -0,0 +1,130 @@
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..database import SessionLocal
+from ..models import ItemSalesDaily, Order, OrderItem, OrderStatusCount, SalesHourly
+
+# INSERT constructs that support ON CONFLICT DO UPDATE, per backend
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+# Rows per upsert statement, well under SQLite's bound parameter limit
+UPSERT_CHUNK_SIZE = 500
+
+def as_utc(value: datetime):
+    # SQLite hands back naive timestamps; they are stored in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def hour_bucket(value: datetime):
+    """Start of the UTC hour containing value"""
+    return as_utc(value).replace(minute=0, second=0, microsecond=0)
+
+async def increment(db: AsyncSession, model, rows, keys):
+    """Insert rows, adding their values onto existing rows with the same keys"""
+    if not rows:
+        return
+    dialect = db.bind.dialect.name
+    upsert = UPSERT_INSERTS.get(dialect)
+    if upsert is None:
+        raise ValueError(f"Sales rollups are not supported on {dialect}")
+
+    counters = [column for column in rows[0] if column not in keys]
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        stmt = upsert(model).values(rows[start:start + UPSERT_CHUNK_SIZE])
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={column: getattr(model, column) + stmt.excluded[column] for column in counters}
+        ))
+
+class SalesRollup:
+    """Order figures summed per rollup row, then added to the tables in a few statements.
+
+    Placing or updating orders adds its changes to the rollup tables in the
+    same transaction, so the analytics endpoints read a handful of buckets
+    rather than scanning orders. Hourly sales roll up into days when read;
+    item sales are kept per UTC day.
+    """
+
+    def __init__(self):
+        self.hours = defaultdict(lambda: [0, Decimal("0"), 0])  # bucket -> [orders, revenue, items sold]
+        self.items = defaultdict(lambda: [0, Decimal("0")])  # (day, item name) -> [quantity, revenue]
+        self.statuses = Counter()
+
+    def add_order(self, created_at: datetime, total: Decimal, status: str = "pending"):
+        hour = self.hours[hour_bucket(created_at)]
+        hour[0] += 1
+        hour[1] += total
+        self.statuses[status or "pending"] += 1
+
+    def add_item(self, created_at: datetime, item_name: str, quantity: int, unit_price: Decimal):
+        self.hours[hour_bucket(created_at)][2] += quantity
+        item = self.items[(as_utc(created_at).date(), item_name)]
+        item[0] += quantity
+        item[1] += unit_price * quantity
+
+    def add_priced(self, created_at: datetime, priced):
+        """Record a newly placed order from its priced lines"""
+        self.add_order(created_at, priced.total)
+        for line in priced.lines:
+            self.add_item(created_at, line.item_name, line.quantity, line.unit_price)
+
+    def move_status(self, old_status: str, new_status: str, count: int = 1):
+        """Record orders moving from one status to another"""
+        if old_status != new_status:
+            self.statuses[old_status or "pending"] -= count
+            self.statuses[new_status] += count
+
+    async def save(self, db: AsyncSession):
+        """Add the collected figures to the rollup tables in db's current transaction"""
+        await increment(db, SalesHourly, [
+            {"bucket": bucket, "orders": orders, "revenue": revenue, "items_sold": items_sold}
+            for bucket, (orders, revenue, items_sold) in sorted(self.hours.items())
+        ], ["bucket"])
+        await increment(db, ItemSalesDaily, [
+            {"day": day, "item_name": item_name, "quantity": quantity, "revenue": revenue}
+            for (day, item_name), (quantity, revenue) in sorted(self.items.items())
+        ], ["day", "item_name"])
+        await increment(db, OrderStatusCount, [
+            {"status": status, "orders": orders}
+            for status, orders in sorted(self.statuses.items())
+            if orders
+        ], ["status"])
+
+async def rebuild_rollups():
+    """Recompute every rollup table from Order and OrderItem.
+
+    Orders and lines are streamed from server-side cursors in
+    settings.analytics_chunk_size batches, so memory grows with the number
+    of buckets rather than orders. Orders placed while it runs may be
+    missed, so run it with the API stopped or idle.
+    """
+    rollup = SalesRollup()
+    options = {"yield_per": settings.analytics_chunk_size}
+    async with SessionLocal() as db:
+        orders = await db.stream(
+            select(Order.created_at, Order.total_amount, Order.status).execution_options(**options)
+        )
+        async for rows in orders.partitions():
+            for row in rows:
+                rollup.add_order(row.created_at, row.total_amount, row.status)
+
+        lines = await db.stream(
+            select(Order.created_at, OrderItem.item_name, OrderItem.quantity, OrderItem.price)
+            .join(Order, Order.id == OrderItem.order_id)
+            .execution_options(**options)
+        )
+        async for rows in lines.partitions():
+            for row in rows:
+                rollup.add_item(row.created_at, row.item_name, row.quantity, row.price)
+
+        for model in (SalesHourly, ItemSalesDaily, OrderStatusCount):
+            await db.execute(delete(model))
+        await rollup.save(db)
+        await db.commit()
+    return rollup
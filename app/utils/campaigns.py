@@ -0,0 +1,254 @@
+import asyncio
+import html
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import exists, func, insert, select, update
+from ..config import settings
+from ..database import SessionLocal
+from ..models import CampaignDelivery, NewsletterCampaign, NewsletterSubscriber
+from .email_service import EmailService
+from .metrics import email_send_duration
+from .rate_limit import rate_limiter
+
+# How long a claimed batch stays reserved before another worker may retry it
+CLAIM_LEASE = timedelta(minutes=5)
+
+OPEN_DELIVERY_STATUSES = ("pending", "sending")
+
+# Rate limit store bucket that paces campaign sends across workers
+THROTTLE_KEY = "campaign:send"
+
+# Stands in for {{ email }} when a campaign is rendered, then replaced per recipient
+RECIPIENT_PLACEHOLDER = "%%recipient_email%%"
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+def render_campaign(email_service: EmailService, subject: str, template: str):
+    """Render a campaign's Jinja template once for every recipient"""
+    return email_service.render_template(template, subject=subject, email=RECIPIENT_PLACEHOLDER)
+
+def personalize(html_content: str, email: str):
+    """Fill the recipient's address into a rendered campaign"""
+    return html_content.replace(RECIPIENT_PLACEHOLDER, html.escape(email))
+
+class CampaignSender:
+    """Background task that delivers sending campaigns to every subscriber.
+
+    Subscribers are read in id order a chunk at a time into CampaignDelivery
+    rows, and the campaign records the last id queued, so after a crash or
+    restart the sender carries on where it stopped. Deliveries are claimed in
+    leased batches with UPDATE ... RETURNING like the mail queue, sent
+    concurrently over pooled SMTP connections and paced by a token bucket in
+    the rate limit store. A send that went out but wasn't recorded before a
+    crash is repeated once its lease expires.
+    """
+
+    def __init__(self, email_service: EmailService):
+        self.email_service = email_service
+        self.pool = None
+        self._task = None
+        self._wakeup = None
+        self._content = {}  # campaign id -> (subject, html); fixed once sending
+
+    def start(self):
+        """Start the sender task on the running event loop"""
+        if self._task is None:
+            self.pool = self.email_service.create_pool()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the sender task and close pooled SMTP connections"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await self.pool.close()
+
+    def notify(self):
+        """Wake the sender so a campaign that was just started goes out immediately"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                processed = await self.process()
+            except Exception as e:
+                print(f"❌ Campaign sender error: {e}")
+                processed = 0
+
+            if processed < settings.campaign_batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.campaign_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def process(self):
+        """Queue recipients for every sending campaign, then send one batch"""
+        async with SessionLocal() as db:
+            campaign_ids = (await db.scalars(
+                select(NewsletterCampaign.id).where(NewsletterCampaign.status == "sending")
+            )).all()
+            for campaign_id in campaign_ids:
+                await self.enqueue_recipients(db, campaign_id)
+            return await self.send_batch(db)
+
+    async def enqueue_recipients(self, db, campaign_id: int):
+        """Queue the campaign's next chunk of subscribers once its backlog runs low, or mark it sent"""
+        open_deliveries = (
+            CampaignDelivery.campaign_id == campaign_id,
+            CampaignDelivery.status.in_(OPEN_DELIVERY_STATUSES)
+        )
+        backlog = await db.scalar(select(func.count()).select_from(CampaignDelivery).where(*open_deliveries))
+        if backlog >= settings.campaign_batch_size:
+            return 0
+
+        cursor = await db.scalar(select(NewsletterCampaign.last_subscriber_id).where(NewsletterCampaign.id == campaign_id))
+        subscribers = (await db.execute(
+            select(NewsletterSubscriber.id, NewsletterSubscriber.email)
+            .where(NewsletterSubscriber.id > cursor)
+            .order_by(NewsletterSubscriber.id)
+            .limit(settings.campaign_chunk_size)
+        )).all()
+
+        # Both updates only apply if the cursor hasn't moved since it was read,
+        # so workers racing on the same campaign can't queue a chunk twice
+        unchanged = (
+            NewsletterCampaign.id == campaign_id,
+            NewsletterCampaign.status == "sending",
+            NewsletterCampaign.last_subscriber_id == cursor
+        )
+        if not subscribers:
+            if backlog:
+                return 0
+            result = await db.execute(
+                update(NewsletterCampaign)
+                .where(*unchanged, ~exists().where(*open_deliveries))
+                .values(status="sent", completed_at=utcnow())
+            )
+            await db.commit()
+            if result.rowcount:
+                self._content.pop(campaign_id, None)
+                print(f"📰 Campaign {campaign_id} sent")
+            return 0
+
+        result = await db.execute(
+            update(NewsletterCampaign)
+            .where(*unchanged)
+            .values(last_subscriber_id=subscribers[-1].id)
+        )
+        if result.rowcount != 1:
+            await db.rollback()
+            return 0
+
+        await db.execute(insert(CampaignDelivery), [
+            {"campaign_id": campaign_id, "subscriber_id": subscriber.id, "email": subscriber.email, "status": "pending"}
+            for subscriber in subscribers
+        ])
+        await db.commit()
+        return len(subscribers)
+
+    async def claim_batch(self, db):
+        """Reserve the next batch of due deliveries of sending campaigns for this worker"""
+        now = utcnow()
+        due = (
+            CampaignDelivery.status.in_(OPEN_DELIVERY_STATUSES),
+            CampaignDelivery.next_attempt_at <= now,
+            CampaignDelivery.campaign_id.in_(
+                select(NewsletterCampaign.id).where(NewsletterCampaign.status == "sending")
+            )
+        )
+        candidates = select(CampaignDelivery.id).where(*due).order_by(CampaignDelivery.id).limit(settings.campaign_batch_size)
+        result = await db.execute(
+            update(CampaignDelivery)
+            .where(CampaignDelivery.id.in_(candidates), *due)
+            .values(
+                status="sending",
+                attempts=CampaignDelivery.attempts + 1,
+                next_attempt_at=now + CLAIM_LEASE
+            )
+            .returning(
+                CampaignDelivery.id,
+                CampaignDelivery.campaign_id,
+                CampaignDelivery.email,
+                CampaignDelivery.attempts
+            )
+            .execution_options(synchronize_session=False)
+        )
+        batch = result.all()
+        await db.commit()
+        return batch
+
+    async def _load_content(self, db, campaign_ids):
+        missing = set(campaign_ids) - self._content.keys()
+        if missing:
+            rows = await db.execute(
+                select(NewsletterCampaign.id, NewsletterCampaign.subject, NewsletterCampaign.html_content)
+                .where(NewsletterCampaign.id.in_(missing))
+            )
+            for row in rows:
+                self._content[row.id] = (row.subject, row.html_content)
+
+    async def _throttle(self):
+        """Wait for a send slot under settings.campaign_send_rate"""
+        rate = settings.campaign_send_rate
+        burst = max(1, math.ceil(rate))
+        while True:
+            retry_after = await rate_limiter.store.hit(THROTTLE_KEY, rate, burst)
+            if not retry_after:
+                return
+            await asyncio.sleep(retry_after)
+
+    async def _deliver(self, row):
+        subject, html_content = self._content[row.campaign_id]
+        await self._throttle()
+        message = self.email_service.build_message(row.email, subject, personalize(html_content, row.email))
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            await self.pool.send(self.email_service.from_email, row.email, message)
+            outcome = "sent"
+        finally:
+            email_send_duration.observe(time.perf_counter() - start, outcome=outcome)
+
+    async def send_batch(self, db):
+        """Send one claimed batch and record the outcome for every recipient"""
+        batch = await self.claim_batch(db)
+        if not batch:
+            return 0
+
+        await self._load_content(db, {row.campaign_id for row in batch})
+        results = await asyncio.gather(*(self._deliver(row) for row in batch), return_exceptions=True)
+
+        now = utcnow()
+        updates = []
+        failed = 0
+        for row, error in zip(batch, results):
+            if error is None:
+                updates.append({"id": row.id, "status": "sent", "sent_at": now, "last_error": None})
+            elif row.attempts >= settings.email_max_attempts:
+                failed += 1
+                updates.append({"id": row.id, "status": "failed", "last_error": str(error)})
+                print(f"Failed to send campaign {row.campaign_id} to {row.email}: {error}")
+            else:
+                backoff = settings.email_retry_backoff * 2 ** (row.attempts - 1)
+                updates.append({
+                    "id": row.id,
+                    "status": "pending",
+                    "last_error": str(error),
+                    "next_attempt_at": now + timedelta(seconds=backoff)
+                })
+
+        await db.execute(update(CampaignDelivery), updates)
+        await db.commit()
+        print(f"📰 Campaign batch: {sum(error is None for error in results)} sent, {failed} failed")
+        return len(batch)
+
+campaign_sender = CampaignSender(EmailService())
@@ -0,0 +1,236 @@
+import asyncio
+import gzip
+import zlib
+from collections import OrderedDict
+from starlette.datastructures import Headers, MutableHeaders
+from ..config import settings
+from .metrics import compressed_responses
+
+# Content types worth compressing; PDFs, images and Office documents are compressed already
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# Sent one event at a time, so holding it back to compress would delay delivery
+STREAMED_TYPES = ("text/event-stream",)
+
+# Bodies at least this large are compressed in a worker thread so the event loop stays free
+THREAD_MIN_SIZE = 256 * 1024
+
+def load_brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+brotli = load_brotli()
+
+# Encodings in order of preference; brotli is offered only when installed (pip install brotli)
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+def choose_encoding(accept_encoding: str):
+    """Preferred encoding the client accepts, or None to send the body as is"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding, params = coding.strip().lower(), params.strip().lower()
+        quality = 1.0
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding] = quality
+
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+def compress_body(encoding: str, body: bytes):
+    """Compress a whole body in one go"""
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.compression_brotli_quality)
+    return gzip.compress(body, compresslevel=settings.compression_gzip_level, mtime=0)
+
+class GzipStream:
+    """gzip for a body sent in several messages; each chunk is flushed so it reaches the client"""
+
+    def __init__(self):
+        self.compressor = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes):
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+class BrotliStream:
+    """brotli for a body sent in several messages; each chunk is flushed so it reaches the client"""
+
+    def __init__(self):
+        self.compressor = brotli.Compressor(quality=settings.compression_brotli_quality)
+
+    def compress(self, data: bytes):
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+STREAMS = {"br": BrotliStream, "gzip": GzipStream}
+
+class CompressedCache:
+    """Compressed bodies by path, ETag and encoding, least recently used dropped beyond max_bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()  # (path, etag, encoding) -> compressed body
+
+    def get(self, key):
+        body = self.entries.get(key)
+        if body is not None:
+            self.entries.move_to_end(key)
+        return body
+
+    def put(self, key, body: bytes):
+        if len(body) > self.max_bytes or key in self.entries:
+            return
+        self.entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, dropped = self.entries.popitem(last=False)
+            self.size -= len(dropped)
+
+compressed_cache = CompressedCache(settings.compression_cache_size)
+
+def is_compressible(headers: Headers):
+    """Whether a 200 response with these headers may be compressed"""
+    content_type = headers.get("content-type", "").lower()
+    if "content-encoding" in headers or "no-transform" in headers.get("cache-control", "").lower():
+        return False
+    if not content_type.startswith(COMPRESSIBLE_TYPES) or content_type.startswith(STREAMED_TYPES):
+        return False
+    content_length = headers.get("content-length")
+    return not (content_length and content_length.isdigit() and int(content_length) < settings.compression_min_size)
+
+def cache_key(path: str, headers: Headers, encoding: str):
+    """Key for the compressed cache, or None if the response may not be reused.
+
+    A strong ETag promises the same bytes every time, so the compressed form
+    can be kept and sent again instead of compressing the same body per request.
+    """
+    etag = headers.get("etag")
+    cache_control = headers.get("cache-control", "").lower()
+    if not etag or etag.startswith("W/") or "no-store" in cache_control or "private" in cache_control:
+        return None
+    return (path, etag, encoding)
+
+def mark_encoded(headers: MutableHeaders, encoding: str):
+    headers["Content-Encoding"] = encoding
+    headers.add_vary_header("Accept-Encoding")
+    # Byte ranges describe the uncompressed body. The ETag is left as is, so
+    # a compressed 200 and the 304 for it carry the same validator; the
+    # compressed bytes are fixed per ETag and Vary keeps caches from mixing them.
+    if "accept-ranges" in headers:
+        del headers["Accept-Ranges"]
+
+class CompressionMiddleware:
+    """gzip, or brotli when installed, for text and JSON responses of settings.compression_min_size bytes or more.
+
+    Bodies sent in one message are compressed whole, and the result is kept
+    in compressed_cache when the response has a strong ETag, so the hot menu
+    payloads are compressed once per version rather than once per request.
+    Streamed bodies such as exports are compressed chunk by chunk. Partial
+    content, event streams and already compressed types like PDFs pass
+    through untouched.
+    """
+
+    def __init__(self, app, cache: CompressedCache = compressed_cache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None  # held back until the first body message shows how the body is sent
+        stream = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, stream, passthrough
+            if message["type"] == "http.response.start":
+                if message["status"] == 200 and is_compressible(Headers(raw=message["headers"])):
+                    start = message
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                if start is not None:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if stream is None:
+                if not more_body:
+                    await self._send_whole(scope, send, start, body, encoding)
+                    return
+                stream = STREAMS[encoding]()
+                headers = MutableHeaders(scope=start)
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                mark_encoded(headers, encoding)
+                await send(start)
+                compressed_responses.inc(encoding=encoding, cache="stream")
+
+            chunk = stream.compress(body) if body else b""
+            if not more_body:
+                chunk += stream.finish()
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_whole(self, scope, send, start, body: bytes, encoding: str):
+        headers = MutableHeaders(scope=start)
+        if len(body) < settings.compression_min_size:
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        key = cache_key(scope["path"], headers, encoding)
+        compressed = self.cache.get(key) if key else None
+        if compressed is not None:
+            compressed_responses.inc(encoding=encoding, cache="hit")
+        else:
+            if len(body) >= THREAD_MIN_SIZE:
+                compressed = await asyncio.to_thread(compress_body, encoding, body)
+            else:
+                compressed = compress_body(encoding, body)
+            if key:
+                self.cache.put(key, compressed)
+            compressed_responses.inc(encoding=encoding, cache="miss" if key else "none")
+
+        headers["Content-Length"] = str(len(compressed))
+        mark_encoded(headers, encoding)
+        await send(start)
+        await send({"type": "http.response.body", "body": compressed})
@@ -1,66 +1,159 @@
+import asyncio
+import smtplib
+import time
 import emails
+from typing import Optional
 from emails.template import JinjaTemplate
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..config import settings
-import os
-from pathlib import Path
+from ..models import OutboundEmail
+
+class SMTPConnectionPool:
+    """Pool of authenticated SMTP connections reused across sends"""
+
+    def __init__(self, host: str, port: int, username=None, password=None,
+                 use_tls: bool = True, size: int = 2, max_idle: float = 60.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.max_idle = max_idle
+        self._slots = asyncio.Semaphore(size)
+        self._idle = []
+
+    def _connect(self):
+        """Open a new SMTP session, upgrading to TLS and logging in as configured"""
+        smtp = smtplib.SMTP(self.host, self.port, timeout=30)
+        if self.use_tls:
+            smtp.starttls()
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        return smtp
+
+    def _is_alive(self, smtp, last_used: float):
+        """Check a pooled connection, probing it with NOOP once it has idled a while"""
+        if time.monotonic() - last_used < self.max_idle:
+            return True
+        try:
+            return smtp.noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+
+    def _send(self, smtp, last_used: float, from_email: str, to_email: str, message: str):
+        """Send one message in a worker thread, reconnecting if the session went stale"""
+        if smtp is not None and not self._is_alive(smtp, last_used):
+            self._close(smtp)
+            smtp = None
+        for attempt in range(2):
+            if smtp is None:
+                smtp = self._connect()
+            try:
+                smtp.sendmail(from_email, [to_email], message)
+                return smtp
+            except smtplib.SMTPServerDisconnected:
+                self._close(smtp)
+                smtp = None
+                if attempt:
+                    raise
+            except Exception:
+                self._close(smtp)
+                raise
+
+    @staticmethod
+    def _close(smtp):
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    async def send(self, from_email: str, to_email: str, message: str):
+        """Send a message over a pooled connection without blocking the event loop"""
+        async with self._slots:
+            smtp, last_used = self._idle.pop() if self._idle else (None, 0.0)
+            smtp = await asyncio.to_thread(self._send, smtp, last_used, from_email, to_email, message)
+            self._idle.append((smtp, time.monotonic()))
+
+    async def close(self):
+        """Close every idle connection"""
+        idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            await asyncio.to_thread(self._close, smtp)
 
 class EmailService:
     def __init__(self):
-        self.smtp_host = "smtp.gmail.com"
-        self.smtp_port = 587
+        self.smtp_host = settings.smtp_host
+        self.smtp_port = settings.smtp_port
         self.username = settings.email_user
         self.password = settings.email_pass
         self.from_email = settings.email_user or "noreply@homekitchen.com"
-        
-    def send_email(self, to_email: str, subject: str, html_content: str):
-        """Send an email using SMTP"""
-        if not self.username or not self.password:
+
+    @property
+    def is_configured(self):
+        """Whether outbound email can be delivered with the current settings"""
+        return not settings.smtp_require_auth or bool(self.username and self.password)
+
+    def create_pool(self):
+        """Create an SMTP connection pool for this service's server and credentials"""
+        return SMTPConnectionPool(
+            self.smtp_host,
+            self.smtp_port,
+            username=self.username,
+            password=self.password,
+            use_tls=settings.smtp_use_tls,
+            size=settings.smtp_pool_size
+        )
+
+    def build_message(self, to_email: str, subject: str, html_content: str):
+        """Render a message to the wire format expected by SMTP sendmail"""
+        message = emails.Message(
+            subject=subject,
+            html=html_content,
+            mail_from=self.from_email,
+            mail_to=to_email
+        )
+        return message.as_string()
+
+    def render_template(self, template_text: str, **context):
+        """Render Jinja template source, e.g. a campaign body shared by every recipient"""
+        return JinjaTemplate(template_text).render(**context)
+
+    def queue_email(self, db: AsyncSession, to_email: str, subject: str, html_content: str):
+        """Queue an email for the background mail worker.
+
+        The message is added to the caller's session, so it is only sent
+        once the surrounding transaction commits.
+        """
+        if not self.is_configured:
             print("Email credentials not configured. Skipping email send.")
             return False
-            
-        try:
-            message = emails.Message(
-                subject=subject,
-                html=html_content,
-                mail_from=self.from_email
-            )
-            
-            response = message.send(
-                to=to_email,
-                smtp={
-                    "host": self.smtp_host,
-                    "port": self.smtp_port,
-                    "user": self.username,
-                    "password": self.password,
-                    "tls": True
-                }
-            )
-            
-            if response.status_code == 250:
-                print(f"Email sent successfully to {to_email}")
-                return True
-            else:
-                print(f"Failed to send email to {to_email}. Status: {response.status_code}")
-                return False
-                
-        except Exception as e:
-            print(f"Error sending email: {e}")
-            return False
-    
-    def send_order_confirmation(self, customer_email: str, order_id: int, total_amount: float):
-        """Send order confirmation email"""
+
+        db.add(OutboundEmail(
+            to_email=to_email,
+            subject=subject,
+            html_content=html_content,
+            status="pending"
+        ))
+        db.info["mail_queued"] = True
+        return True
+
+    def queue_order_confirmation(self, db: AsyncSession, customer_email: str, order_id: int, total_amount: float, estimated_minutes: Optional[int] = None):
+        """Queue order confirmation email"""
         subject = "Order Confirmation - Home' Kitchen"
+        estimate = f"about {estimated_minutes} minutes" if estimated_minutes else "30-45 minutes"
         html_content = f"""
         <h2>Thank you for your order!</h2>
         <p>Order ID: {order_id}</p>
         <p>Total Amount: ${total_amount}</p>
-        <p>We'll start preparing your order right away. Estimated delivery time: 30-45 minutes.</p>
+        <p>We'll start preparing your order right away. Estimated delivery time: {estimate}.</p>
         <p>If you have any questions, please call us at +1 (555) 123-4567</p>
         """
-        return self.send_email(customer_email, subject, html_content)
-    
-    def send_career_confirmation(self, applicant_email: str, position: str):
-        """Send career application confirmation email"""
+        return self.queue_email(db, customer_email, subject, html_content)
+
+    def queue_career_confirmation(self, db: AsyncSession, applicant_email: str, position: str):
+        """Queue career application confirmation email"""
         subject = "Application Received - Home' Kitchen"
         html_content = f"""
         <h2>Thank you for your application!</h2>
@@ -68,10 +161,10 @@ class EmailService:
         <p>Our team will review your application and get back to you within 5-7 business days.</p>
         <p>If you have any questions, please email us at careers@homekitchen.com</p>
         """
-        return self.send_email(applicant_email, subject, html_content)
-    
-    def send_admin_notification(self, subject: str, html_content: str):
-        """Send notification email to admin"""
+        return self.queue_email(db, applicant_email, subject, html_content)
+
+    def queue_admin_notification(self, db: AsyncSession, subject: str, html_content: str):
+        """Queue notification email to admin"""
         if settings.admin_email:
-            return self.send_email(settings.admin_email, subject, html_content)
+            return self.queue_email(db, settings.admin_email, subject, html_content)
         return False
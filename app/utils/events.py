@@ -0,0 +1,160 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from ..config import settings
+
+class Subscription:
+    """A subscriber's bounded queue of messages for one topic"""
+
+    def __init__(self, broker, topic: str, maxsize: int):
+        self.broker = broker
+        self.topic = topic
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, message: dict):
+        # Slow consumers lose the oldest message rather than holding up publishers
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout=None):
+        """Wait for the next message; returns None if timeout elapses first"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+class Listener:
+    """Calls back for every message on a topic, without queueing or dropping"""
+
+    def __init__(self, broker, topic: str, callback):
+        self.broker = broker
+        self.topic = topic
+        self.callback = callback
+
+    def deliver(self, message: dict):
+        self.callback(message)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+class InMemoryBroker:
+    """In-process pub/sub that fans messages out to local subscribers.
+
+    Each subscriber costs one small queue and no polling, so a worker can
+    hold thousands of idle connections. Messages only reach subscribers in
+    the same process; use RedisBroker to share events between workers.
+    """
+
+    def __init__(self):
+        self.topics = {}
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def subscribe(self, topic: str):
+        subscription = Subscription(self, topic, settings.event_subscriber_queue_size)
+        self.topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def listen(self, topic: str, callback):
+        """Register an in-process callback for topic; for state that must see every message"""
+        listener = Listener(self, topic, callback)
+        self.topics.setdefault(topic, set()).add(listener)
+        return listener
+
+    def unsubscribe(self, subscription):
+        subscribers = self.topics.get(subscription.topic)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.topics[subscription.topic]
+
+    def deliver(self, topic: str, message: dict):
+        """Hand a message to every local subscriber of topic"""
+        for subscription in self.topics.get(topic, ()):
+            subscription.deliver(message)
+
+    async def publish(self, topic: str, message: dict):
+        self.deliver(topic, message)
+
+class RedisBroker(InMemoryBroker):
+    """Shares events between workers through Redis pub/sub.
+
+    Publishes go to Redis; one pattern subscription per worker receives every
+    event and fans it out to that worker's local subscribers.
+    """
+
+    channel_prefix = "homekitchen:"
+
+    def __init__(self, url: str):
+        super().__init__()
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("The redis event broker requires redis (pip install redis)")
+        self.client = redis.from_url(url)
+        self.pubsub = None
+        self._reader = None
+
+    async def start(self):
+        self.pubsub = self.client.pubsub()
+        await self.pubsub.psubscribe(f"{self.channel_prefix}*")
+        self._reader = asyncio.create_task(self._read())
+
+    async def stop(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        if self.pubsub is not None:
+            await self.pubsub.aclose()
+        await self.client.aclose()
+
+    async def _read(self):
+        while True:
+            try:
+                async for message in self.pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    topic = message["channel"].decode()[len(self.channel_prefix):]
+                    self.deliver(topic, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Event broker connection error: {e}")
+                await asyncio.sleep(1)
+
+    async def publish(self, topic: str, message: dict):
+        await self.client.publish(f"{self.channel_prefix}{topic}", json.dumps(message))
+
+def create_broker():
+    """Build the broker selected by settings.event_broker_url"""
+    url = settings.event_broker_url
+    if not url or url.startswith("memory://"):
+        return InMemoryBroker()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBroker(url)
+    raise ValueError(f"Unsupported event broker URL: {url}")
+
+broker = create_broker()
+
+def order_topic(order_id: int):
+    return f"order:{order_id}"
+
+def status_event(order_id: int, status: str):
+    """Message published to an order's topic when its status changes"""
+    return {
+        "orderId": order_id,
+        "status": status,
+        "updatedAt": datetime.now(timezone.utc).isoformat()
+    }
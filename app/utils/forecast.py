@@ -0,0 +1,246 @@
+import asyncio
+from datetime import date, datetime, timezone
+from sqlalchemy import String, func, select, type_coerce
+from ..config import settings
+from ..database import read_session
+from ..models import MenuItem, Order, OrderItem
+
+# Rows of the per-item arrays are grown in steps of this many days
+DAY_CAPACITY_STEP = 366
+
+def load_numpy():
+    try:
+        import numpy
+        import pandas
+    except ImportError:
+        raise RuntimeError("The demand forecast requires numpy and pandas (pip install numpy pandas)")
+    return numpy, pandas
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+class DemandForecaster:
+    """Next-day demand per menu item from the order history.
+
+    Order lines are read in chunks from a server-side cursor into two NumPy
+    arrays per menu item: quantity per UTC day and quantity per hour of the
+    week. Later refreshes only read recent lines, so the history is scanned
+    once per process. A forecast is each item's exponentially
+    smoothed daily demand, adjusted for the day of the week and split across
+    the hours of that day, computed for every item at once. The result is
+    cached until a new order line is read.
+    """
+
+    def __init__(self):
+        self.last_line_id = 0
+        self.recent_line_ids = set()  # ids already read within settings.forecast_reread_lines of last_line_id
+        self.version = 0  # bumped whenever lines are added
+        self.first_day = None  # numpy datetime64 day of column 0
+        self.rows = {}  # menu item id -> array row
+        self.daily = None  # items x days
+        self.weekly_hours = None  # items x 7 x 24, Monday first
+        self._cached = None  # ((version, today, day), forecast)
+        self._lock = None
+        self._task = None
+
+    def _ensure_capacity(self, np, items: int, days: int):
+        if self.daily is None:
+            self.daily = np.zeros((0, 0))
+            self.weekly_hours = np.zeros((0, 7, 24))
+        grow_items = max(0, items - self.daily.shape[0])
+        grow_days = max(0, days - self.daily.shape[1])
+        if grow_days:
+            grow_days = -(-grow_days // DAY_CAPACITY_STEP) * DAY_CAPACITY_STEP
+        if grow_items or grow_days:
+            self.daily = np.pad(self.daily, ((0, grow_items), (0, grow_days)))
+            self.weekly_hours = np.pad(self.weekly_hours, ((0, grow_items), (0, 0), (0, 0)))
+
+    def _add_lines(self, created_at, menu_item_ids, quantities):
+        """Add order lines, given as column arrays, to the per-item arrays"""
+        np, pd = load_numpy()
+        linked = ~np.isnan(menu_item_ids)
+        if not linked.any():
+            return
+        menu_item_ids, quantities = menu_item_ids[linked].astype(int), quantities[linked]
+
+        # SQLite hands back naive text timestamps; they are stored in UTC
+        timestamps = pd.DatetimeIndex(pd.to_datetime(created_at[linked], utc=True, format="mixed"))
+        days = timestamps.tz_localize(None).to_numpy().astype("datetime64[D]")
+        if self.first_day is None:
+            self.first_day = days.min()
+        elif days.min() < self.first_day:
+            # Only back-dated imports land before the first day; shift the columns to make room
+            self.daily = np.pad(self.daily, ((0, 0), (int((self.first_day - days.min()).astype(int)), 0)))
+            self.first_day = days.min()
+
+        for menu_item_id in np.unique(menu_item_ids):
+            self.rows.setdefault(int(menu_item_id), len(self.rows))
+        item_rows = pd.Series(menu_item_ids).map(self.rows).to_numpy()
+        day_columns = (days - self.first_day).astype(int)
+        self._ensure_capacity(np, len(self.rows), int(day_columns.max()) + 1)
+
+        np.add.at(self.daily, (item_rows, day_columns), quantities)
+        np.add.at(self.weekly_hours, (item_rows, timestamps.dayofweek.to_numpy(), timestamps.hour.to_numpy()), quantities)
+
+    def _reread_floor(self):
+        return max(0, self.last_line_id - settings.forecast_reread_lines)
+
+    async def refresh(self, db):
+        """Read order lines committed since the last refresh; returns whether any were added"""
+        np, _ = load_numpy()
+        # Ids are handed out when a transaction inserts, not when it commits, so a
+        # line can become visible below ids already read. The last few ids are
+        # read again on every refresh, skipping lines already counted.
+        floor = self._reread_floor()
+        latest, recent = (await db.execute(
+            select(func.max(OrderItem.id), func.count(OrderItem.id).filter(OrderItem.id > floor))
+        )).one()
+        latest = latest or 0
+        if latest <= self.last_line_id and recent == len(self.recent_line_ids):
+            return False
+
+        # The timestamp is fetched as stored (text on SQLite) and parsed for the whole refresh at once
+        result = await db.stream(
+            select(OrderItem.id, type_coerce(Order.created_at, String), OrderItem.menu_item_id, OrderItem.quantity)
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(OrderItem.id > floor, OrderItem.id <= latest)
+            .order_by(OrderItem.id)
+            .execution_options(yield_per=settings.analytics_chunk_size)
+        )
+        chunks = []
+        async for rows in result.partitions():
+            line_ids, created_at, menu_item_ids, quantities = zip(*rows)
+            chunks.append((
+                np.array(line_ids, dtype=np.int64),
+                np.array(created_at, dtype=object),
+                np.array(menu_item_ids, dtype=float),  # NaN for lines whose menu item is unknown
+                np.array(quantities, dtype=float)
+            ))
+        if not chunks:
+            return False
+
+        line_ids, created_at, menu_item_ids, quantities = (np.concatenate(column) for column in zip(*chunks))
+        new = ~np.isin(line_ids, np.fromiter(self.recent_line_ids, dtype=np.int64, count=len(self.recent_line_ids)))
+        if new.any():
+            self._add_lines(created_at[new], menu_item_ids[new], quantities[new])
+            self.version += 1
+
+        self.last_line_id = max(self.last_line_id, int(line_ids.max()))
+        floor = self._reread_floor()
+        self.recent_line_ids = {line_id for line_id in self.recent_line_ids if line_id > floor}
+        self.recent_line_ids.update(int(line_id) for line_id in line_ids[line_ids > floor])
+        return bool(new.any())
+
+    def predict(self, day: date, menu_item_ids):
+        """Expected quantity and its split by hour for each item on day, from complete days before today"""
+        np, _ = load_numpy()
+        items = len(menu_item_ids)
+        expected = np.zeros(items)
+        by_hour = np.zeros((items, 24))
+        if self.first_day is None:
+            return expected, by_hour, 0
+
+        today = np.datetime64(utcnow().date(), "D")
+        history = int((today - self.first_day).astype(int))
+        if history <= 0:
+            return expected, by_hour, 0
+
+        rows = np.array([self.rows.get(menu_item_id, -1) for menu_item_id in menu_item_ids], dtype=int)
+        known = rows >= 0
+        daily = self.daily[rows[known], :history]
+        if daily.shape[1] < history:
+            # No orders at all since the last stored day
+            daily = np.pad(daily, ((0, 0), (0, history - daily.shape[1])))
+        weekday = (self.first_day.astype("datetime64[D]").astype(int) + 3 + np.arange(history)) % 7  # 1970-01-01 was a Thursday
+
+        # Day-of-week index over the recent weeks: mean on that weekday / mean overall
+        window = min(history, settings.forecast_season_weeks * 7)
+        recent, recent_weekday = daily[:, -window:], weekday[-window:]
+        one_hot = np.eye(7)[recent_weekday]
+        weekday_mean = (recent @ one_hot) / np.maximum(one_hot.sum(axis=0), 1)
+        overall_mean = recent.mean(axis=1, keepdims=True)
+        seasonal = np.where(overall_mean > 0, weekday_mean / np.where(overall_mean > 0, overall_mean, 1), 1.0)
+        seasonal[:, one_hot.sum(axis=0) == 0] = 1.0
+
+        # Simple exponential smoothing of the deseasonalized series, as one weighted sum per item
+        alpha = settings.forecast_smoothing
+        deseasonalized = daily / np.maximum(seasonal[:, weekday], 0.1)
+        weights = alpha * (1 - alpha) ** np.arange(history - 1, -1, -1)
+        weights[0] += (1 - alpha) ** history
+        level = deseasonalized @ weights
+
+        target_weekday = day.weekday()
+        expected[known] = level * seasonal[:, target_weekday]
+
+        # Split the day by the item's hourly pattern on that weekday, or on any day if it has none
+        hours = self.weekly_hours[rows[known]]
+        profile = hours[:, target_weekday, :]
+        fallback = hours.sum(axis=1)
+        profile = np.where(profile.sum(axis=1, keepdims=True) > 0, profile, fallback)
+        totals = profile.sum(axis=1, keepdims=True)
+        by_hour[known] = expected[known, None] * np.divide(profile, totals, out=np.zeros_like(profile), where=totals > 0)
+        return expected, by_hour, history
+
+    def start(self):
+        """Read the order history in the background so the first forecast is quick"""
+        self._lock = asyncio.Lock()
+        if settings.forecast_preload and self._task is None:
+            self._task = asyncio.create_task(self._preload())
+
+    async def _preload(self):
+        try:
+            async with self._lock:
+                async with read_session() as db:
+                    await self.refresh(db)
+            print(f"📈 Demand forecast history loaded up to order line {self.last_line_id}")
+        except Exception as e:
+            print(f"❌ Demand forecast preload error: {e}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def forecast(self, day: date):
+        """Forecast for every menu item on day, cached until new order lines arrive"""
+        np, _ = load_numpy()
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            async with read_session() as db:
+                await self.refresh(db)
+                key = (self.version, utcnow().date(), day)
+                if self._cached is not None and self._cached[0] == key:
+                    return self._cached[1]
+
+                menu = (await db.execute(
+                    select(MenuItem.id, MenuItem.name, MenuItem.category).order_by(MenuItem.category, MenuItem.name)
+                )).all()
+
+            expected, by_hour, history = self.predict(day, [item.id for item in menu])
+            expected = expected.round(2)
+            prep_quantities = np.ceil(expected).astype(int)
+            forecast = {
+                "day": day,
+                "generated_at": utcnow(),
+                "history_days": history,
+                "items": [
+                    {
+                        "menu_item_id": item.id,
+                        "item_name": item.name,
+                        "category": item.category,
+                        "expected": float(expected[position]),
+                        "prep_quantity": int(prep_quantities[position]),
+                        "by_hour": {hour: round(float(quantity), 2) for hour, quantity in enumerate(by_hour[position]) if quantity >= 0.01}
+                    }
+                    for position, item in enumerate(menu)
+                ]
+            }
+            self._cached = (key, forecast)
+            return forecast
+
+forecaster = DemandForecaster()
@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..database import SessionLocal
+from ..models import IdempotencyKey
+
+class IdempotencyKeyMismatch(Exception):
+    """Raised when a key is reused for a request with a different body"""
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+def hash_request(payload: bytes):
+    return hashlib.sha256(payload).hexdigest()
+
+class IdempotencyStore:
+    """Persists Idempotency-Key -> response so retried requests are replayed.
+
+    The key row is inserted at the start of the request's own transaction and
+    the response is written to it just before commit, so the key and the work
+    it guards commit or roll back together. A concurrent duplicate blocks on
+    the key's primary key until the first transaction finishes, then fails
+    with an IntegrityError and replays the committed response instead.
+    """
+
+    def __init__(self):
+        self._task = None
+
+    async def lookup(self, db: AsyncSession, key: str, request_hash: str):
+        """Return the stored response body for key, or None if it is unused or expired"""
+        record = await db.scalar(select(IdempotencyKey).where(IdempotencyKey.key == key))
+        if record is None:
+            return None
+        if record.expires_at.replace(tzinfo=record.expires_at.tzinfo or timezone.utc) <= utcnow():
+            await db.delete(record)
+            await db.flush()
+            return None
+        if record.request_hash != request_hash:
+            raise IdempotencyKeyMismatch("Idempotency-Key was already used with a different request")
+        return record.response_body
+
+    async def reserve(self, db: AsyncSession, key: str, request_hash: str):
+        """Claim key inside the caller's transaction"""
+        await db.execute(insert(IdempotencyKey).values(
+            key=key,
+            request_hash=request_hash,
+            expires_at=utcnow() + timedelta(seconds=settings.idempotency_key_ttl)
+        ))
+
+    async def complete(self, db: AsyncSession, key: str, response_body: str):
+        """Store the response to replay for key; committed with the caller's transaction"""
+        await db.execute(
+            update(IdempotencyKey).where(IdempotencyKey.key == key).values(response_body=response_body)
+        )
+
+    async def purge_expired(self):
+        """Delete every expired key"""
+        async with SessionLocal() as db:
+            result = await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= utcnow()))
+            await db.commit()
+            return result.rowcount
+
+    async def _run_cleanup(self):
+        while True:
+            try:
+                purged = await self.purge_expired()
+                if purged:
+                    print(f"🧹 Purged {purged} expired idempotency keys")
+            except Exception as e:
+                print(f"❌ Idempotency key cleanup error: {e}")
+            await asyncio.sleep(settings.idempotency_cleanup_interval)
+
+    def start(self):
+        """Start periodic cleanup of expired keys"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_cleanup())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+idempotency_store = IdempotencyStore()
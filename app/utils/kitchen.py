@@ -0,0 +1,268 @@
+import heapq
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
+from ..config import settings
+from ..database import SessionLocal
+from ..models import MenuItem, Order, OrderItem
+from .events import broker
+
+KITCHEN_TOPIC = "kitchen"
+OPEN_STATUSES = ("pending", "preparing")
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+def as_utc(value: datetime):
+    # SQLite hands back naive timestamps; they are stored in UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def prep_minutes(prep_times):
+    """Station minutes for an order; its dishes are cooked side by side"""
+    return max(
+        (prep_time or settings.kitchen_default_prep_time for prep_time in prep_times),
+        default=settings.kitchen_default_prep_time
+    )
+
+class KitchenTicket:
+    """An open order as the kitchen sees it"""
+
+    def __init__(self, order_id: int, created_at: datetime, prep_minutes: int, items,
+                 priority: int = 0, status: str = "pending", started_at: datetime = None):
+        self.order_id = order_id
+        self.created_at = created_at
+        self.prep_minutes = prep_minutes
+        self.items = items
+        self.priority = priority
+        self.status = status
+        self.started_at = started_at
+
+    def sort_key(self):
+        # Higher priority first, then oldest first
+        return (-self.priority, self.created_at, self.order_id)
+
+    def to_message(self):
+        return {
+            "orderId": self.order_id,
+            "createdAt": self.created_at.isoformat(),
+            "prepMinutes": self.prep_minutes,
+            "items": self.items,
+            "priority": self.priority,
+            "status": self.status,
+            "startedAt": self.started_at.isoformat() if self.started_at else None
+        }
+
+    @classmethod
+    def from_message(cls, message: dict):
+        started_at = message.get("startedAt")
+        return cls(
+            message["orderId"],
+            datetime.fromisoformat(message["createdAt"]),
+            message["prepMinutes"],
+            [tuple(item) for item in message["items"]],
+            message["priority"],
+            message["status"],
+            datetime.fromisoformat(started_at) if started_at else None
+        )
+
+def ticket_for_order(order_id: int, priced, priority: int = 0):
+    """Ticket for a newly placed order from its priced lines"""
+    return KitchenTicket(
+        order_id,
+        utcnow(),
+        prep_minutes(line.prep_time for line in priced.lines),
+        [(line.item_name, line.quantity) for line in priced.lines],
+        priority
+    )
+
+class KitchenQueue:
+    """Priority queue of open orders and the station schedule behind ETAs.
+
+    Pending tickets sit in a binary heap ordered by priority and age. A status
+    or priority change marks the ticket's heap entry stale rather than
+    searching for it, so every update is O(log n); stale entries are dropped
+    as they surface. Changes travel over the broker's kitchen topic so every
+    worker keeps the same queue.
+    """
+
+    def __init__(self):
+        self.tickets = {}
+        self._heap = []
+        self._entries = {}
+        self._listener = None
+
+    def _push(self, ticket: KitchenTicket):
+        entry = [ticket.sort_key(), ticket.order_id, True]
+        self._entries[ticket.order_id] = entry
+        heapq.heappush(self._heap, entry)
+
+    def _discard(self, order_id: int):
+        entry = self._entries.pop(order_id, None)
+        if entry is not None:
+            entry[-1] = False
+            # Compact once stale entries dominate the heap
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                self._heap = [entry for entry in self._heap if entry[-1]]
+                heapq.heapify(self._heap)
+
+    def add(self, ticket: KitchenTicket):
+        self._discard(ticket.order_id)
+        self.tickets[ticket.order_id] = ticket
+        if ticket.status == "pending":
+            self._push(ticket)
+
+    def set_status(self, order_id: int, status: str):
+        ticket = self.tickets.get(order_id)
+        if ticket is None:
+            return
+        self._discard(order_id)
+        if status not in OPEN_STATUSES:
+            del self.tickets[order_id]
+            return
+        if status == "preparing":
+            if ticket.status != "preparing":
+                ticket.started_at = utcnow()
+        else:
+            ticket.started_at = None
+            self._push(ticket)
+        ticket.status = status
+
+    def set_priority(self, order_id: int, priority: int):
+        ticket = self.tickets.get(order_id)
+        if ticket is None:
+            return
+        ticket.priority = priority
+        if ticket.status == "pending":
+            self._discard(order_id)
+            self._push(ticket)
+
+    def peek(self, limit: int):
+        """The next `limit` pending tickets in cooking order, left in the queue"""
+        popped = []
+        while self._heap and len(popped) < limit:
+            entry = heapq.heappop(self._heap)
+            if entry[-1]:
+                popped.append(entry)
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+        return [self.tickets[entry[1]] for entry in popped]
+
+    @property
+    def free_stations(self):
+        preparing = sum(1 for ticket in self.tickets.values() if ticket.status == "preparing")
+        return max(0, settings.kitchen_stations - preparing)
+
+    def schedule(self, extra=()):
+        """(ticket, estimated ready time) for every open ticket, in cooking order.
+
+        Tickets being prepared hold their station until started_at plus their
+        prep time; pending tickets, and any `extra` tickets not queued yet, then
+        take whichever station frees up first.
+        """
+        now = utcnow()
+        stations = [now] * max(1, settings.kitchen_stations)
+        scheduled = []
+
+        preparing = sorted(
+            (ticket for ticket in self.tickets.values() if ticket.status == "preparing"),
+            key=lambda ticket: ticket.started_at
+        )
+        for ticket in preparing:
+            free_at = heapq.heappop(stations)
+            ready_at = max(free_at, ticket.started_at + timedelta(minutes=ticket.prep_minutes))
+            heapq.heappush(stations, ready_at)
+            scheduled.append((ticket, ready_at))
+
+        pending = [self.tickets[entry[1]] for entry in self._heap if entry[-1]]
+        for ticket in sorted([*pending, *extra], key=KitchenTicket.sort_key):
+            ready_at = heapq.heappop(stations) + timedelta(minutes=ticket.prep_minutes)
+            heapq.heappush(stations, ready_at)
+            scheduled.append((ticket, ready_at))
+
+        return scheduled
+
+    def estimate_minutes(self, tickets):
+        """Minutes until delivery for each new ticket if it were queued now"""
+        now = utcnow()
+        order_ids = {ticket.order_id for ticket in tickets}
+        return {
+            ticket.order_id: math.ceil((ready_at - now).total_seconds() / 60) + settings.kitchen_delivery_minutes
+            for ticket, ready_at in self.schedule(tickets)
+            if ticket.order_id in order_ids
+        }
+
+    def apply(self, message: dict):
+        """Apply a change published on the kitchen topic"""
+        kind = message["type"]
+        if kind == "placed":
+            for ticket in message["tickets"]:
+                self.add(KitchenTicket.from_message(ticket))
+        elif kind == "status":
+            self.set_status(message["orderId"], message["status"])
+        elif kind == "priority":
+            self.set_priority(message["orderId"], message["priority"])
+
+    async def _publish(self, message: dict):
+        # Apply here straight away; the broker echo to this worker is a no-op
+        self.apply(message)
+        await broker.publish(KITCHEN_TOPIC, message)
+
+    async def placed(self, tickets):
+        """Queue newly committed orders"""
+        await self._publish({"type": "placed", "tickets": [ticket.to_message() for ticket in tickets]})
+
+    async def status_changed(self, order_id: int, status: str):
+        await self._publish({"type": "status", "orderId": order_id, "status": status})
+
+    async def priority_changed(self, order_id: int, priority: int):
+        await self._publish({"type": "priority", "orderId": order_id, "priority": priority})
+
+    async def load(self):
+        """Rebuild the queue from the open orders in the database"""
+        async with SessionLocal() as db:
+            orders = (await db.execute(
+                select(Order.id, Order.created_at, Order.priority, Order.status)
+                .where(Order.status.in_(OPEN_STATUSES))
+            )).all()
+            lines = (await db.execute(
+                select(OrderItem.order_id, OrderItem.item_name, OrderItem.quantity, MenuItem.prep_time)
+                .join(Order, Order.id == OrderItem.order_id)
+                .outerjoin(MenuItem, MenuItem.id == OrderItem.menu_item_id)
+                .where(Order.status.in_(OPEN_STATUSES))
+            )).all()
+
+        lines_by_order = defaultdict(list)
+        for line in lines:
+            lines_by_order[line.order_id].append(line)
+
+        self.tickets = {}
+        self._heap = []
+        self._entries = {}
+        now = utcnow()
+        for order in orders:
+            order_lines = lines_by_order[order.id]
+            self.add(KitchenTicket(
+                order.id,
+                as_utc(order.created_at),
+                prep_minutes(line.prep_time for line in order_lines),
+                [(line.item_name, line.quantity) for line in order_lines],
+                order.priority or 0,
+                order.status,
+                # When cooking started isn't stored, so assume a full prep time remains
+                now if order.status == "preparing" else None
+            ))
+        return len(self.tickets)
+
+    async def start(self):
+        """Load open orders and follow kitchen changes from every worker"""
+        loaded = await self.load()
+        self._listener = broker.listen(KITCHEN_TOPIC, self.apply)
+        print(f"🍳 Kitchen queue loaded with {loaded} open orders")
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+
+kitchen = KitchenQueue()
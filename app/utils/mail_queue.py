@@ -0,0 +1,147 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal
+from ..models import OutboundEmail
+from .email_service import EmailService
+from .metrics import email_send_duration
+
+# How long a claimed batch stays reserved before another worker may retry it
+CLAIM_LEASE = timedelta(minutes=5)
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+class MailQueueWorker:
+    """Background task that delivers queued OutboundEmail rows.
+
+    Due rows are claimed in batches with a single UPDATE ... RETURNING so
+    several uvicorn workers can share the queue, then sent concurrently over
+    a pool of persistent SMTP connections. Failed sends are retried with
+    exponential backoff until settings.email_max_attempts is reached.
+    """
+
+    def __init__(self, email_service: EmailService):
+        self.email_service = email_service
+        self.pool = None
+        self._task = None
+        self._wakeup = None
+
+    def start(self):
+        """Start the worker task on the running event loop"""
+        if self._task is None:
+            self.pool = self.email_service.create_pool()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the worker task and close pooled SMTP connections"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await self.pool.close()
+
+    def notify(self):
+        """Wake the worker so newly committed emails go out immediately"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                processed = await self.process_batch()
+            except Exception as e:
+                print(f"❌ Mail queue error: {e}")
+                processed = 0
+
+            if processed < settings.email_batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.email_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def claim_batch(self, db):
+        """Reserve the next batch of due emails for this worker"""
+        now = utcnow()
+        due = (
+            OutboundEmail.status.in_(("pending", "sending")),
+            OutboundEmail.next_attempt_at <= now
+        )
+        candidates = select(OutboundEmail.id).where(*due).order_by(OutboundEmail.id).limit(settings.email_batch_size)
+        result = await db.execute(
+            update(OutboundEmail)
+            .where(OutboundEmail.id.in_(candidates), *due)
+            .values(
+                status="sending",
+                attempts=OutboundEmail.attempts + 1,
+                next_attempt_at=now + CLAIM_LEASE
+            )
+            .returning(
+                OutboundEmail.id,
+                OutboundEmail.to_email,
+                OutboundEmail.subject,
+                OutboundEmail.html_content,
+                OutboundEmail.attempts
+            )
+            .execution_options(synchronize_session=False)
+        )
+        batch = result.all()
+        await db.commit()
+        return batch
+
+    async def _deliver(self, row):
+        message = self.email_service.build_message(row.to_email, row.subject, row.html_content)
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            await self.pool.send(self.email_service.from_email, row.to_email, message)
+            outcome = "sent"
+        finally:
+            email_send_duration.observe(time.perf_counter() - start, outcome=outcome)
+
+    async def process_batch(self):
+        """Send one claimed batch and record the outcome of every message"""
+        async with SessionLocal() as db:
+            batch = await self.claim_batch(db)
+            if not batch:
+                return 0
+
+            results = await asyncio.gather(*(self._deliver(row) for row in batch), return_exceptions=True)
+
+            now = utcnow()
+            updates = []
+            for row, error in zip(batch, results):
+                if error is None:
+                    updates.append({"id": row.id, "status": "sent", "sent_at": now, "last_error": None})
+                    print(f"Email sent successfully to {row.to_email}")
+                elif row.attempts >= settings.email_max_attempts:
+                    updates.append({"id": row.id, "status": "failed", "last_error": str(error)})
+                    print(f"Failed to send email to {row.to_email}: {error}")
+                else:
+                    backoff = settings.email_retry_backoff * 2 ** (row.attempts - 1)
+                    updates.append({
+                        "id": row.id,
+                        "status": "pending",
+                        "last_error": str(error),
+                        "next_attempt_at": now + timedelta(seconds=backoff)
+                    })
+
+            await db.execute(update(OutboundEmail), updates)
+            await db.commit()
+            return len(batch)
+
+mail_queue = MailQueueWorker(EmailService())
+
+@event.listens_for(Session, "after_commit")
+def _notify_mail_queue(session):
+    """Wake the worker once a transaction that queued email has committed"""
+    if session.info.pop("mail_queued", False):
+        mail_queue.notify()
@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import time
+from itertools import groupby
+from typing import List
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import read_session
+from ..models import MenuItem
+from ..schemas import MenuItem as MenuItemSchema
+from .menu_search import MenuIndex
+
+menu_adapter = TypeAdapter(List[MenuItemSchema])
+categories_adapter = TypeAdapter(List[str])
+
+class CachedPayload:
+    """Pre-serialized JSON body and its strong ETag"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    def matches(self, if_none_match):
+        """Whether an If-None-Match header value already names this payload"""
+        if not if_none_match:
+            return False
+        # If-None-Match uses weak comparison, and proxies that compress send W/"..." back
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or self.etag in tags
+
+class MenuSnapshot:
+    """Serialized view of every available menu item, by category and in full, plus its search index"""
+
+    def __init__(self, items, version: int):
+        self.version = version
+        self.items = items
+        self.loaded_at = time.monotonic()
+        self.full = CachedPayload(menu_adapter.dump_json(items))
+        self.categories = {
+            category: CachedPayload(menu_adapter.dump_json(list(category_items)))
+            for category, category_items in groupby(items, key=lambda item: item.category)
+        }
+        self.category_list = CachedPayload(categories_adapter.dump_json(sorted(self.categories)))
+        self.index = MenuIndex(items)
+
+class MenuCache:
+    """Versioned in-memory menu snapshot.
+
+    The snapshot is built once from the database and reused until a
+    transaction that writes MenuItem rows commits, which bumps the version.
+    Other workers pick up changes after settings.menu_cache_ttl seconds.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._snapshot = None
+        self._lock = asyncio.Lock()
+        self._primary_until = 0.0
+
+    def invalidate(self):
+        """Drop the current snapshot so the next request rebuilds it"""
+        self.version += 1
+        self._snapshot = None
+        # Replicas may not have this worker's menu change yet
+        self._primary_until = time.monotonic() + settings.read_your_writes_seconds
+
+    def _is_fresh(self, snapshot):
+        return (
+            snapshot is not None
+            and snapshot.version == self.version
+            and time.monotonic() - snapshot.loaded_at < settings.menu_cache_ttl
+        )
+
+    async def _load(self):
+        async with read_session(use_replica=time.monotonic() >= self._primary_until) as db:
+            result = await db.execute(
+                select(MenuItem).where(MenuItem.is_available == True).order_by(MenuItem.category, MenuItem.name)
+            )
+            return [MenuItemSchema.model_validate(item) for item in result.scalars().all()]
+
+    async def get(self):
+        """Return the current snapshot, loading it from the database if needed"""
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+
+        async with self._lock:
+            if self._is_fresh(self._snapshot):
+                return self._snapshot
+
+            version = self.version
+            snapshot = MenuSnapshot(await self._load(), version)
+            # Only keep the snapshot if no write committed while it was loading
+            if version == self.version:
+                self._snapshot = snapshot
+            return snapshot
+
+def cached_response(request: Request, payload: CachedPayload):
+    """Serve a cached payload, answering 304 when the client already has it"""
+    headers = {
+        "ETag": payload.etag,
+        "Cache-Control": f"public, max-age={settings.menu_cache_max_age}"
+    }
+    if payload.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
+
+menu_cache = MenuCache()
+
+@event.listens_for(Session, "after_flush")
+def _track_menu_writes(session, flush_context):
+    """Remember that this transaction changed the menu"""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, MenuItem):
+            session.info["menu_changed"] = True
+            return
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_menu_statements(orm_execute_state):
+    """Catch bulk INSERT/UPDATE/DELETE statements against menu_items"""
+    if orm_execute_state.is_select:
+        return
+    if any(mapper.class_ is MenuItem for mapper in orm_execute_state.all_mappers):
+        orm_execute_state.session.info["menu_changed"] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_menu_cache(session):
+    if session.info.pop("menu_changed", False):
+        menu_cache.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_menu_writes(session):
+    session.info.pop("menu_changed", None)
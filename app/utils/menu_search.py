@@ -0,0 +1,116 @@
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from decimal import Decimal
+from typing import Optional
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Score for how a query term matched an indexed term, times the field's weight
+EXACT, PREFIX, FUZZY = 3, 2, 1
+FIELD_WEIGHTS = {"name": 3, "category": 2, "description": 1}
+
+# Shortest query term that may match by prefix or with a typo
+MIN_PREFIX_LENGTH = 2
+MIN_FUZZY_LENGTH = 3
+
+def tokenize(text: Optional[str]):
+    """Lowercase ASCII word tokens with accents folded ("Crème" -> "creme")"""
+    if not text:
+        return []
+    folded = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return TOKEN_PATTERN.findall(folded.lower())
+
+def deletes(term: str):
+    """Every variant of term with one character removed"""
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+class MenuIndex:
+    """Inverted index over menu item names, descriptions and categories.
+
+    Built once per menu snapshot. Prefix matches come from a sorted
+    vocabulary with bisect; typos (one insertion, deletion, substitution or
+    transposition) come from a precomputed map of single-character deletes,
+    so a search never scans the items themselves.
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self.postings = defaultdict(dict)  # term -> {item position: field weight}
+        for position, item in enumerate(items):
+            for field, weight in FIELD_WEIGHTS.items():
+                for term in tokenize(getattr(item, field)):
+                    postings = self.postings[term]
+                    postings[position] = max(postings.get(position, 0), weight)
+
+        self.vocabulary = sorted(self.postings)
+        self.delete_map = defaultdict(set)
+        for term in self.vocabulary:
+            if len(term) >= MIN_FUZZY_LENGTH:
+                for variant in deletes(term):
+                    self.delete_map[variant].add(term)
+
+    def _prefixed(self, prefix: str):
+        start = bisect_left(self.vocabulary, prefix)
+        for term in self.vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            yield term
+
+    def _fuzzy(self, term: str):
+        matches = set(self.delete_map.get(term, ()))
+        for variant in deletes(term):
+            if variant in self.postings:
+                matches.add(variant)
+            matches.update(self.delete_map.get(variant, ()))
+        matches.discard(term)
+        return matches
+
+    def _match_term(self, term: str):
+        """Best score per item position for one query term"""
+        matched = {}
+
+        def collect(terms, quality):
+            for candidate in terms:
+                for position, weight in self.postings[candidate].items():
+                    matched[position] = max(matched.get(position, 0), quality * weight)
+
+        if term in self.postings:
+            collect([term], EXACT)
+        if len(term) >= MIN_PREFIX_LENGTH:
+            collect((candidate for candidate in self._prefixed(term) if candidate != term), PREFIX)
+        if len(term) >= MIN_FUZZY_LENGTH:
+            collect(self._fuzzy(term), FUZZY)
+        return matched
+
+    def search(self, query: Optional[str] = None, category: Optional[str] = None,
+               min_price: Optional[Decimal] = None, max_price: Optional[Decimal] = None, limit: int = 20):
+        """Items matching every query term and the filters, best match first"""
+        terms = tokenize(query)
+        if terms:
+            scores = None
+            for term in terms:
+                matched = self._match_term(term)
+                if scores is None:
+                    scores = matched
+                else:
+                    scores = {position: scores[position] + score for position, score in matched.items() if position in scores}
+                if not scores:
+                    return []
+        else:
+            scores = {position: 0 for position in range(len(self.items))}
+
+        results = []
+        for position, score in scores.items():
+            item = self.items[position]
+            if category is not None and item.category != category:
+                continue
+            if min_price is not None and item.price < min_price:
+                continue
+            if max_price is not None and item.price > max_price:
+                continue
+            results.append((-score, item.name, position))
+
+        results.sort()
+        return [self.items[position] for _, _, position in results[:limit]]
@@ -0,0 +1,237 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow SMTP sends
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric:
+    """Base class for metrics rendered in the Prometheus text format"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._values.get(key)
+        if series is None:
+            # Per-bucket counts (last slot is +Inf), then sum and count
+            series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status")
+))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled"
+))
+db_queries = registry.register(Counter(
+    "db_queries_total", "Database statements executed"
+))
+db_queries_per_request = registry.register(Histogram(
+    "db_queries_per_request", "Database statements executed per HTTP request", ("route",), COUNT_BUCKETS
+))
+db_time_per_request = registry.register(Histogram(
+    "db_time_per_request_seconds", "Time spent in database statements per HTTP request", ("route",)
+))
+db_pool_checkout_wait = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time a session waited to obtain a pooled connection"
+))
+email_send_duration = registry.register(Histogram(
+    "email_send_duration_seconds", "Time to deliver one email over SMTP", ("outcome",)
+))
+rate_limited_requests = registry.register(Counter(
+    "rate_limited_requests_total", "Requests rejected with a 429", ("route", "key")
+))
+compressed_responses = registry.register(Counter(
+    "http_compressed_responses_total", "Responses compressed, by encoding and compressed cache use", ("encoding", "cache")
+))
+
+class RequestStats:
+    """Database work attributed to the request being handled"""
+
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+current_request = ContextVar("current_request", default=None)
+
+def route_label(scope):
+    """Label requests by route template so path parameters don't explode cardinality.
+
+    The template is rebuilt from the request path by putting each matched
+    path parameter back in braces, e.g. /api/orders/42 -> /api/orders/{order_id},
+    which keeps router prefixes and mount paths in the label.
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+
+    segments = scope["path"].split("/")
+    for name, value in scope.get("path_params", {}).items():
+        parts = str(value).split("/")
+        for i in range(len(segments) - len(parts), -1, -1):
+            if segments[i:i + len(parts)] == parts:
+                segments[i:i + len(parts)] = ["{" + name + "}"]
+                break
+    return "/".join(segments)
+
+class MetricsMiddleware:
+    """Record latency, in-flight count and DB usage for every HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_flight.dec()
+            current_request.reset(token)
+
+            route = route_label(scope)
+            method = scope["method"]
+            http_requests.inc(method=method, route=route, status=status)
+            http_request_duration.observe(elapsed, method=method, route=route)
+            db_queries_per_request.observe(stats.queries, route=route)
+            db_time_per_request.observe(stats.db_time, route=route)
+
+def instrument_engine(engine):
+    """Attach statement counting and timing hooks to an engine"""
+
+    # The start time lives on the statement's execution context, so a statement
+    # that raises (and never reaches after_cursor_execute) leaves nothing behind
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_metrics_query_start", None)
+        elapsed = time.perf_counter() - start if start is not None else 0.0
+        db_queries.inc()
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+
+@event.listens_for(Session, "do_orm_execute")
+def _start_checkout_timer(orm_execute_state):
+    """Note when a session first needs a connection"""
+    session = orm_execute_state.session
+    if not session.in_transaction() and "checkout_start" not in session.info:
+        session.info["checkout_start"] = time.perf_counter()
+
+@event.listens_for(Session, "after_begin")
+def _stop_checkout_timer(session, transaction, connection):
+    """Record how long it took to get a connection from the pool"""
+    start = session.info.pop("checkout_start", None)
+    if start is not None:
+        db_pool_checkout_wait.observe(time.perf_counter() - start)
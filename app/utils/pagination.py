@@ -0,0 +1,69 @@
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import String, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+def encode_cursor(created_at: datetime, row_id: int):
+    """Opaque cursor pointing just past the given (created_at, id) position"""
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def comparable(db: AsyncSession, value: datetime):
+    """Bind a timestamp so it compares correctly against stored values.
+
+    SQLite keeps timestamps as text, and server_default=func.now() rows have
+    no fractional seconds, so the value is compared in that same format.
+    """
+    if db.bind.dialect.name != "sqlite":
+        return value
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    fmt = "%Y-%m-%d %H:%M:%S.%f" if value.microsecond else "%Y-%m-%d %H:%M:%S"
+    return literal(value.strftime(fmt), String)
+
+def date_range(db: AsyncSession, column, created_after: Optional[datetime], created_before: Optional[datetime]):
+    """WHERE conditions restricting a timestamp column to a date range"""
+    conditions = []
+    if created_after is not None:
+        conditions.append(column >= comparable(db, created_after))
+    if created_before is not None:
+        conditions.append(column < comparable(db, created_before))
+    return conditions
+
+def schema_columns(model, schema):
+    """Columns of model's table that schema exposes, to select plain rows instead of ORM objects"""
+    return [column for column in model.__table__.columns if column.key in schema.model_fields]
+
+async def paginate(db: AsyncSession, stmt, created_col, id_col, cursor: Optional[str], limit: int):
+    """Fetch one newest-first page of stmt using keyset pagination.
+
+    Rows are ordered by (created_col, id_col) descending and the cursor
+    resumes strictly after the last row of the previous page, so every page
+    is an index range scan regardless of how deep the client has paged.
+    Items are returned as plain dicts, one per row of stmt's columns.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(created_col, id_col) < tuple_(comparable(db, created_at), row_id))
+
+    stmt = stmt.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+    rows = (await db.execute(stmt)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
+
+    return {"items": [row._asdict() for row in rows], "next_cursor": next_cursor}
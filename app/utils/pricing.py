@@ -0,0 +1,92 @@
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Iterable, List
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..models import MenuItem
+from ..schemas import OrderItemCreate
+
+CENT = Decimal("0.01")
+
+def to_cents(amount: Decimal):
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+class PricingError(ValueError):
+    """Raised when an order cannot be priced against the current menu"""
+
+class PricedLine:
+    def __init__(self, menu_item: MenuItem, quantity: int):
+        self.menu_item_id = menu_item.id
+        self.item_name = menu_item.name
+        self.quantity = quantity
+        self.prep_time = menu_item.prep_time
+        self.unit_price = menu_item.price
+        self.line_total = menu_item.price * quantity
+
+class PricedOrder:
+    def __init__(self, lines: List[PricedLine]):
+        self.lines = lines
+        self.subtotal = to_cents(sum((line.line_total for line in lines), Decimal("0")))
+        self.tax = to_cents(self.subtotal * settings.tax_rate)
+        self.total = self.subtotal + self.tax
+
+class MenuLookup:
+    """Menu items resolved for a set of order lines, indexed by id and name"""
+
+    def __init__(self, menu_items: Iterable[MenuItem]):
+        self.by_id = {}
+        self.by_name = {}
+        for item in menu_items:
+            self.by_id[item.id] = item
+            # Prefer an available item when several share a name
+            if item.is_available or item.name not in self.by_name:
+                self.by_name[item.name] = item
+
+    def resolve(self, line: OrderItemCreate):
+        if line.menu_item_id is not None:
+            return self.by_id.get(line.menu_item_id)
+        return self.by_name.get(line.item_name)
+
+async def load_menu_items(db: AsyncSession, lines: Iterable[OrderItemCreate]):
+    """Fetch every menu item referenced by the given lines in a single query"""
+    ids = {line.menu_item_id for line in lines if line.menu_item_id is not None}
+    names = {line.item_name for line in lines if line.menu_item_id is None}
+
+    conditions = []
+    if ids:
+        conditions.append(MenuItem.id.in_(ids))
+    if names:
+        conditions.append(MenuItem.name.in_(names))
+    if not conditions:
+        return MenuLookup([])
+
+    result = await db.execute(select(MenuItem).where(or_(*conditions)))
+    return MenuLookup(result.scalars().all())
+
+def price_items(lines: List[OrderItemCreate], lookup: MenuLookup):
+    """Price order lines from resolved menu items, ignoring client-sent prices"""
+    if not lines:
+        raise PricingError("Order must contain at least one item")
+
+    priced = []
+    for line in lines:
+        menu_item = lookup.resolve(line)
+        label = line.item_name or f"#{line.menu_item_id}"
+        if menu_item is None:
+            raise PricingError(f"Unknown menu item: {label}")
+        if not menu_item.is_available:
+            raise PricingError(f"Menu item is not available: {menu_item.name}")
+        priced.append(PricedLine(menu_item, line.quantity))
+
+    return PricedOrder(priced)
+
+def check_client_total(priced: PricedOrder, client_total):
+    """Reject orders whose client-side total no longer matches menu prices"""
+    if client_total is not None and abs(priced.total - Decimal(client_total)) >= CENT:
+        raise PricingError(
+            f"Order total {to_cents(Decimal(client_total))} does not match current menu prices ({priced.total})"
+        )
+
+async def price_order(db: AsyncSession, lines: List[OrderItemCreate]):
+    """Resolve and price an order's lines with one round-trip to the database"""
+    return price_items(lines, await load_menu_items(db, lines))
@@ -0,0 +1,181 @@
+import math
+import time
+from collections import OrderedDict
+from fastapi import HTTPException
+from ..config import settings
+from .metrics import rate_limited_requests
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+def parse_rate(spec: str):
+    """Parse a limit like "10/minute" into (requests, period in seconds)"""
+    try:
+        count, period = spec.split("/")
+        count, seconds = int(count), PERIODS[period.strip().rstrip("s")]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit {spec!r}; expected e.g. '10/minute'")
+    if count < 1:
+        raise ValueError(f"Invalid rate limit {spec!r}; the count must be positive")
+    return count, seconds
+
+class MemoryRateLimitStore:
+    """Token buckets held in this process.
+
+    Each key costs one small list, and the least recently used keys are
+    dropped beyond max_keys so a flood of spoofed addresses can't grow it
+    without bound. Limits are per worker; use RedisRateLimitStore to share
+    them between workers and nodes.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()  # key -> [tokens, updated_at]
+
+    async def hit(self, key: str, rate: float, burst: int):
+        """Take one token from key's bucket; returns 0 if allowed, else seconds until a token frees up"""
+        now = time.monotonic()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = [float(burst), now]
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / rate
+
+    async def close(self):
+        pass
+
+# Token bucket update run atomically inside Redis, timed by the Redis clock
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return tostring(retry_after)
+"""
+
+class RedisRateLimitStore:
+    """Token buckets shared by every worker and node through Redis"""
+
+    key_prefix = "homekitchen:ratelimit:"
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("The redis rate limit store requires redis (pip install redis)")
+        self.client = redis.from_url(url)
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def hit(self, key: str, rate: float, burst: int):
+        try:
+            return float(await self.script(keys=[self.key_prefix + key], args=[rate, burst]))
+        except Exception as e:
+            # Fail open: an unreachable Redis shouldn't take the public forms down
+            print(f"❌ Rate limit store error: {e}")
+            return 0.0
+
+    async def close(self):
+        await self.client.aclose()
+
+def create_rate_limit_store():
+    """Build the store selected by settings.rate_limit_store_url"""
+    url = settings.rate_limit_store_url
+    if not url or url.startswith("memory://"):
+        return MemoryRateLimitStore(settings.rate_limit_max_keys)
+    if url.startswith(("redis://", "rediss://")):
+        return RedisRateLimitStore(url)
+    raise ValueError(f"Unsupported rate limit store URL: {url}")
+
+class RateLimiter:
+    """Applies the limits configured in settings to keys in a store"""
+
+    def __init__(self, store):
+        self.store = store
+        self.route_limits = {route: parse_rate(spec) for route, spec in settings.rate_limits.items()}
+        self.email_limit = parse_rate(settings.rate_limit_per_email)
+
+    async def check(self, key: str, limit):
+        """Seconds the caller must wait before key may be used again, or 0"""
+        count, period = limit
+        return await self.store.hit(key, count / period, count)
+
+    async def enforce_email(self, route: str, email: str):
+        """Raise a 429 once an email address has been used too often on route"""
+        if not settings.rate_limit_enabled:
+            return
+        retry_after = await self.check(f"email:{route}:{email.strip().lower()}", self.email_limit)
+        if retry_after:
+            rate_limited_requests.inc(route=route, key="email")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests for this email address, please try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+rate_limiter = RateLimiter(create_rate_limit_store())
+
+class RateLimitMiddleware:
+    """Token-bucket limit per client IP on the POST routes listed in settings.rate_limits.
+
+    Runs before the request body is read, so rejected requests cost one
+    bucket update and no parsing, database or email work.
+    """
+
+    def __init__(self, app, limiter: RateLimiter = rate_limiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not settings.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        route = scope["path"].rstrip("/") or "/"
+        limit = self.limiter.route_limits.get(route)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        retry_after = await self.limiter.check(f"ip:{route}:{client_ip}", limit)
+        if retry_after:
+            rate_limited_requests.inc(route=route, key="ip")
+            await self._reject(send, retry_after)
+            return
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _reject(send, retry_after: float):
+        body = b'{"detail":"Too many requests, please try again later"}'
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(retry_after)).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,20 @@
+from decimal import Decimal
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+
+def encode_default(value):
+    # Decimals are sent as strings, as Pydantic does, so prices keep their exact cents
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any):
+    """Encode content to JSON bytes with orjson; datetimes become ISO 8601, UTC as 'Z'"""
+    return orjson.dumps(content, default=encode_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
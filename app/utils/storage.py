@@ -0,0 +1,104 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from ..config import settings
+
+# File extension stored with each content type, so served files keep their type
+EXTENSIONS = {
+    "application/pdf": ".pdf",
+    "application/msword": ".doc",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
+}
+
+def content_key(prefix: str, sha256: str, content_type: str):
+    """Sharded content-addressed key, e.g. resumes/ab/cd/abcd...ef.pdf"""
+    return f"{prefix}/{sha256[:2]}/{sha256[2:4]}/{sha256}{EXTENSIONS.get(content_type, '')}"
+
+class StorageBackend(ABC):
+    """Content-addressed blob store.
+
+    put() takes a finished temporary file and its SHA-256, stores it under a
+    key derived from the hash and consumes the temporary file. Identical
+    content always maps to the same key, so duplicates are stored once.
+    """
+
+    @abstractmethod
+    async def put(self, source: Path, sha256: str, content_type: str, prefix: str = "resumes"):
+        """Store source under its content key and return (location, created)"""
+
+class LocalStorage(StorageBackend):
+    """Stores blobs in a sharded directory tree under root"""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def _put(self, source: Path, key: str):
+        destination = self.root / key
+        if destination.exists():
+            source.unlink(missing_ok=True)
+            return destination, False
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        # Atomic on one filesystem; a concurrent identical upload just overwrites equal bytes
+        os.replace(source, destination)
+        return destination, True
+
+    async def put(self, source: Path, sha256: str, content_type: str, prefix: str = "resumes"):
+        destination, created = await asyncio.to_thread(self._put, source, content_key(prefix, sha256, content_type))
+        return str(destination), created
+
+class S3Storage(StorageBackend):
+    """Stores blobs in an S3 bucket; endpoint_url can point at a local S3-compatible server"""
+
+    def __init__(self, bucket: str, endpoint_url=None, access_key=None, secret_key=None):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("The s3 storage backend requires boto3 (pip install boto3)")
+
+        self.bucket = bucket
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key
+        )
+
+    def _exists(self, key: str):
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def _put(self, source: Path, key: str, content_type: str):
+        try:
+            if self._exists(key):
+                return False
+            self.client.upload_file(str(source), self.bucket, key, ExtraArgs={"ContentType": content_type})
+            return True
+        finally:
+            source.unlink(missing_ok=True)
+
+    async def put(self, source: Path, sha256: str, content_type: str, prefix: str = "resumes"):
+        key = content_key(prefix, sha256, content_type)
+        created = await asyncio.to_thread(self._put, source, key, content_type)
+        return f"s3://{self.bucket}/{key}", created
+
+def create_storage():
+    """Build the storage backend selected by settings.storage_backend"""
+    if settings.storage_backend == "s3":
+        return S3Storage(
+            settings.s3_bucket,
+            endpoint_url=settings.s3_endpoint_url,
+            access_key=settings.s3_access_key,
+            secret_key=settings.s3_secret_key
+        )
+    if settings.storage_backend == "local":
+        return LocalStorage(Path(settings.upload_dir))
+    raise ValueError(f"Unknown storage backend: {settings.storage_backend}")
+
+storage = create_storage()
@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import os
+import re
+from pathlib import Path
+from fastapi import HTTPException, UploadFile
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse
+from ..config import settings
+
+# Bytes read from an upload at a time; bounds memory per concurrent upload
+CHUNK_SIZE = 64 * 1024
+
+# Magic bytes of accepted resume formats and the content type each implies
+RESUME_SIGNATURES = [
+    (b"%PDF-", "application/pdf"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/msword"),
+    (b"PK\x03\x04", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+]
+
+# Paths of content-addressed uploads, e.g. resumes/ab/cd/<sha256>.pdf; their bytes never change
+CONTENT_ADDRESSED_PATH = re.compile(r"^[\w-]+/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.\w+)?$")
+
+class UploadError(ValueError):
+    """Raised when an uploaded file is rejected"""
+
+def sniff_resume_type(head: bytes):
+    """Identify a resume from its leading bytes rather than the client's content_type"""
+    for signature, content_type in RESUME_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    raise UploadError("Only PDF, DOC, and DOCX files are allowed")
+
+def size_limit_message(max_size: int):
+    return f"File size must be less than {max_size / (1024 * 1024):g}MB"
+
+class ReceivedUpload:
+    """A fully received upload waiting in a temporary file"""
+
+    def __init__(self, path: Path, sha256: str, size: int, content_type: str):
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+        self.content_type = content_type
+
+async def receive_upload(upload: UploadFile, tmp_dir: Path, max_size: int):
+    """Stream an uploaded resume to a temporary file in CHUNK_SIZE pieces.
+
+    The first chunk is sniffed for a supported file type, the content is
+    hashed as it streams, and the copy is abandoned as soon as more than
+    max_size bytes have been read. Blocking file I/O runs in worker threads
+    so the event loop stays free.
+    """
+    await asyncio.to_thread(tmp_dir.mkdir, parents=True, exist_ok=True)
+
+    partial_path = tmp_dir / f"{os.urandom(16).hex()}.part"
+    digest = hashlib.sha256()
+    content_type = None
+
+    buffer = await asyncio.to_thread(open, partial_path, "wb")
+    try:
+        size = 0
+        while chunk := await upload.read(CHUNK_SIZE):
+            if size == 0:
+                content_type = sniff_resume_type(chunk)
+            size += len(chunk)
+            if size > max_size:
+                raise UploadError(size_limit_message(max_size))
+            digest.update(chunk)
+            await asyncio.to_thread(buffer.write, chunk)
+
+        if size == 0:
+            raise UploadError("Uploaded file is empty")
+    except BaseException:
+        await asyncio.to_thread(buffer.close)
+        await asyncio.to_thread(partial_path.unlink, missing_ok=True)
+        raise
+
+    await asyncio.to_thread(buffer.close)
+    return ReceivedUpload(partial_path, digest.hexdigest(), size, content_type)
+
+class RequestSizeLimitMiddleware:
+    """Reject multipart request bodies larger than max_body_size with a 413.
+
+    Requests announcing a larger Content-Length are refused before any of the
+    body is read; chunked bodies are cut off as soon as the limit is crossed,
+    before the multipart parser spools the rest to disk.
+    """
+
+    def __init__(self, app, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+            await self._reject(send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    raise HTTPException(status_code=413, detail="Request body too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @staticmethod
+    def _is_multipart(scope):
+        for name, value in scope["headers"]:
+            if name == b"content-type":
+                return value.startswith(b"multipart/form-data")
+        return False
+
+    @staticmethod
+    async def _reject(send):
+        body = b'{"detail":"Request body too large"}'
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+class UploadFiles(StaticFiles):
+    """StaticFiles for uploads with Cache-Control headers.
+
+    StaticFiles already answers If-None-Match/If-Modified-Since with a 304
+    and serves byte ranges. Content-addressed files are marked immutable so
+    browsers never revalidate them; anything else is revalidated on each use.
+    Resumes are personal, so shared caches are told not to keep them.
+    """
+
+    def cache_control(self, scope):
+        if CONTENT_ADDRESSED_PATH.match(self.get_path(scope).replace(os.sep, "/")):
+            return f"private, max-age={settings.upload_cache_max_age}, immutable"
+        return "private, no-cache"
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            headers={"Cache-Control": self.cache_control(scope)}
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
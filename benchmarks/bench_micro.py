@@ -0,0 +1,178 @@
+"""pytest-benchmark micro-benchmarks for serialization and ORM hot paths.
+
+The test_listing_page_* pairs compare the per-response serialization cost of
+each admin listing through Pydantic response models against the orjson
+row-tuple path the routers use.
+
+    pytest benchmarks/bench_micro.py --benchmark-autosave
+    pytest benchmarks/bench_micro.py --benchmark-compare
+
+Autosaved runs land in .benchmarks/ as JSON, keyed by commit, so they can be
+compared across commits with --benchmark-compare.
+"""
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import List
+
+import pytest
+
+# Settings are read at import time, so point the app at a scratch database first
+_tmp = tempfile.mkdtemp(prefix="homekitchen-micro-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/micro.db"
+os.environ["UPLOAD_DIR"] = f"{_tmp}/uploads"
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app.cli import migrate
+from app.database import SessionLocal, engine
+from app.init_data import init_menu_data
+from app.models import CareerApplication, ContactMessage, MenuItem, NewsletterSubscriber, Order
+from app.schemas import (
+    CareerApplication as CareerApplicationSchema,
+    ContactMessage as ContactMessageSchema,
+    MenuItem as MenuItemSchema,
+    NewsletterSubscription,
+    OrderItemCreate,
+    OrderSummary,
+    Page,
+)
+from app.utils.pagination import paginate, schema_columns
+from app.utils.pricing import price_order
+from app.utils.responses import ORJSONResponse
+
+NOW = datetime.now(timezone.utc)
+
+MENU = [
+    MenuItemSchema(
+        id=n,
+        name=f"Dish {n}",
+        description="Tender chicken in rich tomato and butter gravy",
+        price=Decimal("18.99"),
+        category=f"Category {n % 5}",
+        image_url="🍗",
+        is_available=True,
+        created_at=NOW,
+    )
+    for n in range(100)
+]
+
+ORDERS = [
+    OrderSummary(
+        id=n,
+        customer_name="Bench Customer",
+        customer_email="bench@example.com",
+        customer_phone="555-0100",
+        customer_address="1 Benchmark Way",
+        total_amount=Decimal("42.50"),
+        payment_method="cash",
+        status="pending",
+        created_at=NOW,
+    )
+    for n in range(50)
+]
+
+@pytest.fixture(scope="module")
+def loop():
+    loop = asyncio.new_event_loop()
+
+    migrate()
+
+    async def setup():
+        await init_menu_data()
+        async with SessionLocal() as db:
+            db.add_all(
+                Order(
+                    customer_name="Bench Customer",
+                    customer_email="bench@example.com",
+                    customer_phone="555-0100",
+                    customer_address="1 Benchmark Way",
+                    total_amount=Decimal("42.50"),
+                )
+                for _ in range(500)
+            )
+            db.add_all(
+                ContactMessage(name="Bench Customer", email="bench@example.com", subject="Catering", message="Do you cater?")
+                for _ in range(100)
+            )
+            db.add_all(NewsletterSubscriber(email=f"subscriber{n}@example.com") for n in range(100))
+            db.add_all(
+                CareerApplication(name="Bench Applicant", email="bench@example.com", phone="555-0100", position="Line Cook", status="pending")
+                for _ in range(100)
+            )
+            await db.commit()
+
+    loop.run_until_complete(setup())
+    yield loop
+    loop.run_until_complete(engine.dispose())
+    loop.close()
+
+def test_menu_serialization(benchmark):
+    adapter = TypeAdapter(List[MenuItemSchema])
+    benchmark(adapter.dump_json, MENU)
+
+def test_order_page_serialization(benchmark):
+    adapter = TypeAdapter(List[OrderSummary])
+    benchmark(adapter.dump_json, ORDERS)
+
+def test_menu_query(benchmark, loop):
+    async def query():
+        async with SessionLocal() as db:
+            result = await db.execute(
+                select(MenuItem).where(MenuItem.is_available == True).order_by(MenuItem.category, MenuItem.name)
+            )
+            return result.scalars().all()
+
+    benchmark(lambda: loop.run_until_complete(query()))
+
+def test_order_pricing(benchmark, loop):
+    lines = [OrderItemCreate(item_name=name, quantity=2) for name in ("Biryani", "Naan", "Samosas", "Jeera Rice")]
+
+    async def price():
+        async with SessionLocal() as db:
+            return await price_order(db, lines)
+
+    benchmark(lambda: loop.run_until_complete(price()))
+
+def test_orders_page(benchmark, loop):
+    async def page():
+        async with SessionLocal() as db:
+            return await paginate(db, select(*schema_columns(Order, OrderSummary)), Order.created_at, Order.id, None, 50)
+
+    benchmark(lambda: loop.run_until_complete(page()))
+
+# Admin listings: (model, response schema, created column)
+LISTINGS = {
+    "orders": (Order, OrderSummary, Order.created_at),
+    "applications": (CareerApplication, CareerApplicationSchema, CareerApplication.created_at),
+    "messages": (ContactMessage, ContactMessageSchema, ContactMessage.created_at),
+    "subscribers": (NewsletterSubscriber, NewsletterSubscription, NewsletterSubscriber.subscribed_at),
+}
+
+def fetch(loop, stmt):
+    async def run():
+        async with SessionLocal() as db:
+            return (await db.execute(stmt)).all()
+    return loop.run_until_complete(run())
+
+@pytest.mark.parametrize("listing", sorted(LISTINGS))
+def test_listing_page_pydantic(benchmark, loop, listing):
+    """Per-response cost of a 50-item page serialized from ORM objects through the response model"""
+    model, schema, created_col = LISTINGS[listing]
+    objects = [row[0] for row in fetch(loop, select(model).order_by(created_col.desc()).limit(50))]
+    adapter = TypeAdapter(Page[schema])
+    benchmark(lambda: adapter.dump_json(adapter.validate_python({"items": objects, "next_cursor": None})))
+
+@pytest.mark.parametrize("listing", sorted(LISTINGS))
+def test_listing_page_orjson(benchmark, loop, listing):
+    """Per-response cost of the same page serialized from row tuples with orjson, as the routers do"""
+    model, schema, created_col = LISTINGS[listing]
+    rows = fetch(loop, select(*schema_columns(model, schema)).order_by(created_col.desc()).limit(50))
+    benchmark(lambda: ORJSONResponse({"items": [row._asdict() for row in rows], "next_cursor": None}).body)
+
+def test_menu_orjson(benchmark, loop):
+    rows = fetch(loop, select(*schema_columns(MenuItem, MenuItemSchema)).where(MenuItem.is_available == True))
+    benchmark(lambda: ORJSONResponse([row._asdict() for row in rows]).body)
@@ -0,0 +1,169 @@
+"""Concurrent load test for a running Home' Kitchen API server.
+
+Run it against the server before and after a change and compare the results:
+
+    python -m benchmarks.load_test --url http://localhost:8000 --save before.json
+    python -m benchmarks.load_test --url http://localhost:8000 --compare before.json
+
+`python -m benchmarks.run` wraps this with a freshly seeded server and runs
+every mix in MIXES.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import time
+
+import httpx
+
+_sequence = itertools.count()
+
+def customer():
+    n = next(_sequence)
+    return {
+        "name": f"Load Test {n}",
+        "email": f"loadtest{n}@example.com",
+        "phone": "555-0100",
+        "address": "1 Benchmark Way"
+    }
+
+def browse_menu():
+    return {"method": "GET", "url": "/api/menu"}
+
+def browse_category():
+    category = random.choice(["Starters & Snacks", "Main Dishes", "Breads", "Sides"])
+    return {"method": "GET", "url": f"/api/menu/{category}"}
+
+def browse_categories():
+    return {"method": "GET", "url": "/api/menu/categories"}
+
+def checkout():
+    items = [
+        {"item_name": name, "quantity": random.randint(1, 3)}
+        for name in random.sample(["Biryani", "Butter Chicken", "Naan", "Samosas", "Jeera Rice"], 3)
+    ]
+    return {"method": "POST", "url": "/api/orders", "json": {"customerInfo": customer(), "items": items}}
+
+def contact():
+    info = customer()
+    return {"method": "POST", "url": "/api/contact", "json": {
+        "name": info["name"],
+        "email": info["email"],
+        "subject": "Catering",
+        "message": "Do you cater for parties of 40?"
+    }}
+
+# A small but valid PDF-signed payload; identical bytes also exercise resume dedup
+RESUME = b"%PDF-1.4\n" + b"0" * 32 * 1024
+
+def careers():
+    info = customer()
+    return {
+        "method": "POST",
+        "url": "/api/careers",
+        "data": {"name": info["name"], "email": info["email"], "phone": info["phone"], "position": "Line Cook"},
+        "files": {"resume": ("resume.pdf", RESUME, "application/pdf")}
+    }
+
+def admin_listing():
+    path = random.choice(["/api/orders", "/api/careers/applications", "/api/contact/messages", "/api/newsletter/subscribers"])
+    return {"method": "GET", "url": path, "params": {"limit": 50}}
+
+# Weighted request mixes: (weight, request factory)
+MIXES = {
+    "browse": [(6, browse_menu), (3, browse_category), (1, browse_categories)],
+    "checkout": [(1, checkout)],
+    "submissions": [(3, contact), (1, careers)],
+    "admin": [(1, admin_listing)],
+    "mixed": [
+        (6, browse_menu),
+        (2, browse_category),
+        (2, checkout),
+        (1, contact),
+        (1, careers),
+        (1, admin_listing),
+    ],
+}
+
+def percentile(samples, pct):
+    """Return the pct-th percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def worker(client, mix, deadline, latencies, errors):
+    """Issue requests from the weighted mix until the deadline"""
+    weights = [weight for weight, _ in mix]
+    factories = [factory for _, factory in mix]
+    while time.perf_counter() < deadline:
+        request = random.choices(factories, weights=weights)[0]()
+        start = time.perf_counter()
+        try:
+            response = await client.request(**request)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - start)
+
+async def run(url, concurrency, duration, mix="mixed"):
+    """Drive the server with `concurrency` clients for `duration` seconds"""
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            worker(client, MIXES[mix], deadline, latencies, errors) for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "mix": mix,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+def compare(baseline, results, keys=("requests_per_sec", "p50_ms", "p95_ms", "p99_ms")):
+    """Print the change of each key between two result dicts"""
+    for key in keys:
+        if key not in baseline or key not in results:
+            continue
+        before, after = baseline[key], results[key]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{key:>18}: {before:>10} -> {after:>10} ({change:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Compare against results saved by an earlier run")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.url, args.concurrency, args.duration, args.mix))
+    print(json.dumps(results, indent=2))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+if __name__ == "__main__":
+    main()
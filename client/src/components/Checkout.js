@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import { motion } from 'framer-motion';
 import { useNavigate } from 'react-router-dom';
 import { useCart } from '../context/CartContext';
@@ -18,6 +18,8 @@ const Checkout = () => {
     paymentMethod: 'cash'
   });
   const [isSubmitting, setIsSubmitting] = useState(false);
+  // One key per checkout attempt, reused on retries so the server never places the order twice
+  const idempotencyKey = useRef(null);
 
   const handleInputChange = (e) => {
     const { name, value } = e.target;
@@ -37,6 +39,10 @@ const Checkout = () => {
 
     setIsSubmitting(true);
 
+    if (!idempotencyKey.current) {
+      idempotencyKey.current = window.crypto.randomUUID();
+    }
+
     try {
       // Call the Python FastAPI backend
       const orderData = {
@@ -56,6 +62,7 @@ const Checkout = () => {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'Idempotency-Key': idempotencyKey.current,
         },
         body: JSON.stringify(orderData),
       });
@@ -65,10 +72,13 @@ const Checkout = () => {
         throw new Error(errorData.detail || 'Failed to place order');
       }
 
-      await response.json();
+      const order = await response.json();
       
       // Success
-      toast.success('Order placed successfully!');
+      idempotencyKey.current = null;
+      toast.success(order.estimatedMinutes
+        ? `Order placed! Estimated delivery in about ${order.estimatedMinutes} minutes.`
+        : 'Order placed successfully!');
       clearCart();
       navigate('/');
     } catch (error) {
@@ -0,0 +1,103 @@
+"""Initial schema: the tables create_all() built before the switch to migrations
+
+A database created by that older version matches this revision exactly;
+mark it with `alembic stamp 0001` and migrate to head from there.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 08:55:10.603014
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('career_applications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=False),
+    sa.Column('position', sa.String(length=100), nullable=False),
+    sa.Column('experience', sa.String(length=50), nullable=True),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('resume_path', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_career_applications_id', 'career_applications', ['id'])
+
+    op.create_table('contact_messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('subject', sa.String(length=200), nullable=True),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_contact_messages_id', 'contact_messages', ['id'])
+
+    op.create_table('menu_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('image_url', sa.String(length=255), nullable=True),
+    sa.Column('video_url', sa.String(length=255), nullable=True),
+    sa.Column('is_available', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_menu_items_id', 'menu_items', ['id'])
+
+    op.create_table('newsletter_subscribers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('subscribed_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_index('ix_newsletter_subscribers_id', 'newsletter_subscribers', ['id'])
+
+    op.create_table('orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('customer_name', sa.String(length=100), nullable=False),
+    sa.Column('customer_email', sa.String(length=100), nullable=False),
+    sa.Column('customer_phone', sa.String(length=20), nullable=False),
+    sa.Column('customer_address', sa.Text(), nullable=False),
+    sa.Column('total_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('payment_method', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_orders_id', 'orders', ['id'])
+
+    op.create_table('order_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('item_name', sa.String(length=100), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_order_items_id', 'order_items', ['id'])
+
+def downgrade():
+    # Dropping a table drops its indexes too
+    for table in (
+        "order_items",
+        "orders",
+        "newsletter_subscribers",
+        "menu_items",
+        "contact_messages",
+        "career_applications",
+    ):
+        op.drop_table(table)
@@ -0,0 +1,94 @@
+"""Schema added since the initial release
+
+Server-side pricing (order_items.menu_item_id), kitchen scheduling
+(menu_items.prep_time, orders.priority), content-addressed resumes
+(career_applications.resume_sha256), the outbound mail queue, idempotency
+keys and the composite indexes behind keyset-paginated admin listings.
+Existing order lines are linked to the menu item of the same name, and
+existing menu items and orders get the default prep time and priority.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 08:56:02.412877
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Existing rows take the server default, so neither column is ever NULL
+    op.add_column('menu_items', sa.Column('prep_time', sa.Integer(), server_default=sa.text('15'), nullable=False))
+    op.add_column('orders', sa.Column('priority', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    op.add_column('career_applications', sa.Column('resume_sha256', sa.String(length=64), nullable=True))
+    with op.batch_alter_table('order_items') as batch_op:
+        batch_op.add_column(sa.Column('menu_item_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_order_items_menu_item_id', 'menu_items', ['menu_item_id'], ['id'])
+
+    op.execute(
+        "UPDATE order_items SET menu_item_id = "
+        "(SELECT MIN(menu_items.id) FROM menu_items WHERE menu_items.name = order_items.item_name)"
+    )
+
+    op.create_table('outbound_emails',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('to_email', sa.String(length=100), nullable=False),
+    sa.Column('subject', sa.String(length=200), nullable=False),
+    sa.Column('html_content', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbound_emails_id', 'outbound_emails', ['id'])
+    op.create_index('ix_outbound_emails_status_next_attempt', 'outbound_emails', ['status', 'next_attempt_at'])
+
+    op.create_table('idempotency_keys',
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('request_hash', sa.String(length=64), nullable=False),
+    sa.Column('response_body', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_idempotency_keys_expires_at', 'idempotency_keys', ['expires_at'])
+
+    op.create_index('ix_order_items_menu_item_id', 'order_items', ['menu_item_id'])
+    op.create_index('ix_career_applications_created_id', 'career_applications', ['created_at', 'id'])
+    op.create_index('ix_career_applications_resume_sha256', 'career_applications', ['resume_sha256'])
+    op.create_index('ix_career_applications_status_created_id', 'career_applications', ['status', 'created_at', 'id'])
+    op.create_index('ix_contact_messages_created_id', 'contact_messages', ['created_at', 'id'])
+    op.create_index('ix_newsletter_subscribers_subscribed_id', 'newsletter_subscribers', ['subscribed_at', 'id'])
+    op.create_index('ix_orders_created_id', 'orders', ['created_at', 'id'])
+    op.create_index('ix_orders_status_created_id', 'orders', ['status', 'created_at', 'id'])
+
+def downgrade():
+    for index, table in (
+        ('ix_orders_status_created_id', 'orders'),
+        ('ix_orders_created_id', 'orders'),
+        ('ix_newsletter_subscribers_subscribed_id', 'newsletter_subscribers'),
+        ('ix_contact_messages_created_id', 'contact_messages'),
+        ('ix_career_applications_status_created_id', 'career_applications'),
+        ('ix_career_applications_resume_sha256', 'career_applications'),
+        ('ix_career_applications_created_id', 'career_applications'),
+        ('ix_order_items_menu_item_id', 'order_items'),
+    ):
+        op.drop_index(index, table_name=table)
+    op.drop_table('idempotency_keys')
+    op.drop_table('outbound_emails')
+
+    with op.batch_alter_table('order_items') as batch_op:
+        batch_op.drop_constraint('fk_order_items_menu_item_id', type_='foreignkey')
+        batch_op.drop_column('menu_item_id')
+    with op.batch_alter_table('career_applications') as batch_op:
+        batch_op.drop_column('resume_sha256')
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_column('priority')
+    with op.batch_alter_table('menu_items') as batch_op:
+        batch_op.drop_column('prep_time')
@@ -0,0 +1,51 @@
+"""Newsletter campaigns and their per-recipient deliveries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:03:01.150218
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('newsletter_campaigns',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('subject', sa.String(length=200), nullable=False),
+    sa.Column('template', sa.Text(), nullable=False),
+    sa.Column('html_content', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('last_subscriber_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_newsletter_campaigns_id', 'newsletter_campaigns', ['id'])
+
+    op.create_table('campaign_deliveries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('campaign_id', sa.Integer(), nullable=False),
+    sa.Column('subscriber_id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['campaign_id'], ['newsletter_campaigns.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('campaign_id', 'subscriber_id', name='uq_campaign_deliveries_campaign_subscriber')
+    )
+    op.create_index('ix_campaign_deliveries_id', 'campaign_deliveries', ['id'])
+    op.create_index('ix_campaign_deliveries_campaign_status', 'campaign_deliveries', ['campaign_id', 'status'])
+    op.create_index('ix_campaign_deliveries_status_next_attempt', 'campaign_deliveries', ['status', 'next_attempt_at'])
+
+def downgrade():
+    # Dropping a table drops its indexes too
+    op.drop_table('campaign_deliveries')
+    op.drop_table('newsletter_campaigns')
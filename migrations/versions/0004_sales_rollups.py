@@ -0,0 +1,42 @@
+"""Sales rollup tables behind the analytics endpoints
+
+Existing orders are not copied in here; run `python -m app.cli
+backfill-analytics` once after upgrading a database that already has orders.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 09:06:26.326317
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('item_sales_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('item_name', sa.String(length=100), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'item_name')
+    )
+    op.create_table('order_status_counts',
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('status')
+    )
+    op.create_table('sales_hourly',
+    sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('items_sold', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('bucket')
+    )
+
+def downgrade():
+    op.drop_table('sales_hourly')
+    op.drop_table('order_status_counts')
+    op.drop_table('item_sales_daily')
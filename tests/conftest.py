@@ -0,0 +1,95 @@
+import os
+import socket
+import tempfile
+
+# Settings and engines are created when app is imported, so point them at a
+# throwaway database and keep the background email workers off first
+TEST_DIR = tempfile.mkdtemp(prefix="homekitchen-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DIR}/test.db"
+os.environ["UPLOAD_DIR"] = os.path.join(TEST_DIR, "uploads")
+os.environ["EMAIL_USER"] = ""
+os.environ["EMAIL_PASS"] = ""
+os.environ["FORECAST_PRELOAD"] = "false"
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+os.environ["RATE_LIMIT_ENABLED"] = "false"  # tests that need it turn it on
+
+import pytest
+from aiosmtpd.controller import Controller
+from app import cli
+from app.database import engine
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """Migrate and seed the test database once per run"""
+    cli.migrate()
+    cli.seed()
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+async def db_engine():
+    """The app's engine, disposed after the test so no connection outlives its event loop"""
+    yield engine
+    await engine.dispose()
+
+class RecordingHandler:
+    """aiosmtpd handler that keeps delivered messages and refuses recipients starting with "reject" """
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("reject"):
+            return "550 Mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((envelope.rcpt_tos[0], envelope.content.decode("utf8", errors="replace")))
+        return "250 Message accepted for delivery"
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@pytest.fixture
+def smtp_server():
+    """A local SMTP stand-in on a free port; yields (handler, port)"""
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    try:
+        yield handler, controller.port
+    finally:
+        controller.stop()
+
+@pytest.fixture
+def smtp_settings(monkeypatch):
+    """Plain, unauthenticated SMTP as spoken by the stand-in"""
+    from app.config import settings
+    monkeypatch.setattr(settings, "smtp_use_tls", False)
+    monkeypatch.setattr(settings, "smtp_require_auth", False)
+    return settings
+
+@pytest.fixture(scope="module")
+def client():
+    """TestClient running the app's lifespan"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def place_order(client):
+    """Place an order for two Samosas through the API and return its id"""
+    def place(quantity: int = 2):
+        response = client.post("/api/orders", json={
+            "customerInfo": {"name": "Asha", "email": "asha@example.com", "phone": "5551234567", "address": "1 Main St"},
+            "items": [{"menu_item_id": 1, "quantity": quantity}]
+        })
+        assert response.status_code == 200, response.text
+        return response.json()["orderId"]
+    return place
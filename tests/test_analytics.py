@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlalchemy import func, select
+from app.database import SessionLocal
+from app.models import Order, OrderStatusCount
+
+pytestmark = pytest.mark.anyio
+
+async def status_counts():
+    """(counts kept in the rollup, counts from the orders table)"""
+    async with SessionLocal() as db:
+        rollup = dict((await db.execute(
+            select(OrderStatusCount.status, OrderStatusCount.orders).where(OrderStatusCount.orders != 0)
+        )).all())
+        actual = dict((await db.execute(select(Order.status, func.count()).group_by(Order.status))).all())
+    return rollup, actual
+
+def test_placed_orders_are_rolled_up(client, place_order):
+    before = client.get("/api/analytics/summary").json()
+    place_order(quantity=3)
+
+    after = client.get("/api/analytics/summary").json()
+    assert after["orders"] == before["orders"] + 1
+    assert after["items_sold"] == before["items_sold"] + 3
+
+async def test_concurrent_status_updates_keep_the_funnel_consistent(client, place_order, db_engine):
+    order_ids = [place_order() for _ in range(5)]
+
+    def update(order_id, status):
+        return client.put(f"/api/orders/{order_id}/status", params={"status": status}).status_code
+
+    # Several admins moving the same orders at once
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        codes = list(pool.map(
+            lambda args: update(*args),
+            [(order_id, status) for order_id in order_ids for status in ("preparing", "ready", "cancelled", "delivered")]
+        ))
+
+    assert set(codes) == {200}
+    rollup, actual = await status_counts()
+    assert rollup == actual
@@ -0,0 +1,99 @@
+import time
+import pytest
+from sqlalchemy import delete, select
+from app.database import SessionLocal
+from app.models import CampaignDelivery, NewsletterCampaign, NewsletterSubscriber
+from app.utils.campaigns import CampaignSender, THROTTLE_KEY, render_campaign
+from app.utils.email_service import EmailService
+from app.utils.rate_limit import rate_limiter
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def sender(db_engine, smtp_server, smtp_settings):
+    """A campaign sender delivering to the SMTP stand-in, with no campaigns or subscribers yet"""
+    _, port = smtp_server
+    email_service = EmailService()
+    email_service.smtp_host, email_service.smtp_port = "127.0.0.1", port
+    sender = CampaignSender(email_service)
+    sender.pool = email_service.create_pool()
+    rate_limiter.store.buckets.pop(THROTTLE_KEY, None)
+
+    async with SessionLocal() as db:
+        for model in (CampaignDelivery, NewsletterCampaign, NewsletterSubscriber):
+            await db.execute(delete(model))
+        await db.commit()
+    yield sender
+    await sender.pool.close()
+
+async def start_campaign(sender, *recipients):
+    async with SessionLocal() as db:
+        db.add_all(NewsletterSubscriber(email=email) for email in recipients)
+        campaign = NewsletterCampaign(
+            subject="This week",
+            template="<p>Hi {{ email }}</p>",
+            html_content=render_campaign(sender.email_service, "This week", "<p>Hi {{ email }}</p>"),
+            status="sending"
+        )
+        db.add(campaign)
+        await db.commit()
+        return campaign.id
+
+async def send_until_done(sender, campaign_id: int, max_rounds: int = 20):
+    for _ in range(max_rounds):
+        await sender.process()
+        async with SessionLocal() as db:
+            if await db.scalar(select(NewsletterCampaign.status).where(NewsletterCampaign.id == campaign_id)) == "sent":
+                return
+    raise AssertionError("campaign did not finish sending")
+
+async def deliveries(campaign_id: int):
+    async with SessionLocal() as db:
+        rows = (await db.scalars(select(CampaignDelivery).where(CampaignDelivery.campaign_id == campaign_id))).all()
+        return {row.email: row for row in rows}
+
+async def test_sends_are_throttled_to_the_configured_rate(sender, smtp_server, smtp_settings, monkeypatch):
+    handler, _ = smtp_server
+    monkeypatch.setattr(smtp_settings, "campaign_send_rate", 20.0)
+    recipients = [f"reader{number}@example.com" for number in range(30)]
+    campaign_id = await start_campaign(sender, *recipients)
+
+    start = time.monotonic()
+    await send_until_done(sender, campaign_id)
+    elapsed = time.monotonic() - start
+
+    # A burst of 20 goes out at once; the other 10 wait for tokens at 20 per second
+    assert elapsed >= 0.45
+    assert sorted(to_email for to_email, _ in handler.messages) == sorted(recipients)
+    assert {row.status for row in (await deliveries(campaign_id)).values()} == {"sent"}
+
+async def test_each_recipient_gets_a_personalized_message(sender, smtp_server):
+    handler, _ = smtp_server
+    campaign_id = await start_campaign(sender, "a@example.com", "b@example.com")
+
+    await send_until_done(sender, campaign_id)
+
+    messages = dict(handler.messages)
+    assert "Subject: This week" in messages["a@example.com"]
+    assert "To: b@example.com" in messages["b@example.com"]
+
+async def test_failing_recipient_is_retried_then_failed_without_holding_up_others(sender, smtp_server, smtp_settings, monkeypatch):
+    handler, _ = smtp_server
+    monkeypatch.setattr(smtp_settings, "email_max_attempts", 2)
+    monkeypatch.setattr(smtp_settings, "email_retry_backoff", 0)
+    campaign_id = await start_campaign(sender, "ok@example.com", "reject@example.com", "also-ok@example.com")
+
+    await sender.process()
+    first_round = await deliveries(campaign_id)
+    assert first_round["ok@example.com"].status == "sent"
+    assert first_round["reject@example.com"].status == "pending"
+    assert first_round["reject@example.com"].attempts == 1
+
+    await send_until_done(sender, campaign_id)
+
+    rows = await deliveries(campaign_id)
+    failed = rows["reject@example.com"]
+    assert failed.status == "failed" and failed.attempts == 2
+    assert "Mailbox unavailable" in failed.last_error
+    assert rows["also-ok@example.com"].status == "sent"
+    assert sorted(to_email for to_email, _ in handler.messages) == ["also-ok@example.com", "ok@example.com"]
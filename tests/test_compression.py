@@ -0,0 +1,87 @@
+import hashlib
+from pathlib import Path
+from app.config import settings
+from app.utils.compression import ENCODINGS, choose_encoding
+from app.utils.metrics import compressed_responses
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+def test_compressed_200_and_its_304_carry_the_same_etag(client):
+    compressed = client.get("/api/menu", headers=GZIP)
+    assert compressed.headers["content-encoding"] == "gzip"
+
+    not_modified = client.get("/api/menu", headers={**GZIP, "If-None-Match": compressed.headers["etag"]})
+    plain = client.get("/api/menu", headers={"Accept-Encoding": "identity"})
+
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == compressed.headers["etag"] == plain.headers["etag"]
+    assert not compressed.headers["etag"].startswith("W/")
+
+def test_choose_encoding_honours_quality_values():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("deflate") is None
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding("*") == ENCODINGS[0]
+    assert choose_encoding("*, gzip;q=0") == ("br" if "br" in ENCODINGS else None)
+
+def test_client_that_refuses_gzip_gets_the_plain_body(client):
+    response = client.get("/api/menu", headers={"Accept-Encoding": "gzip;q=0"})
+
+    assert "content-encoding" not in response.headers
+    assert int(response.headers["content-length"]) == len(response.content)
+
+def test_bodies_under_the_minimum_size_are_sent_as_is(client, monkeypatch):
+    small = client.get("/api/menu/categories", headers=GZIP)
+    assert len(small.content) < settings.compression_min_size
+    assert "content-encoding" not in small.headers
+
+    monkeypatch.setattr(settings, "compression_min_size", 1024 * 1024)
+    assert "content-encoding" not in client.get("/api/menu", headers=GZIP).headers
+
+def test_compressed_menu_is_reused_from_the_cache(client):
+    client.get("/api/menu", headers=GZIP)
+    hits = compressed_responses._values.get(("gzip", "hit"), 0)
+
+    response = client.get("/api/menu", headers=GZIP)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert compressed_responses._values[("gzip", "hit")] == hits + 1
+
+def test_streamed_export_is_compressed_chunk_by_chunk(client, place_order):
+    place_order()
+
+    response = client.get("/api/exports/orders", headers=GZIP)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text.startswith("order_id,created_at,status,")
+
+def write_upload(relative_path: str, content: bytes):
+    path = Path(settings.upload_dir) / relative_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return f"/uploads/{relative_path}"
+
+def test_content_addressed_upload_is_cached_as_immutable(client):
+    content = b"%PDF-1.4 " + b"resume " * 400
+    sha256 = hashlib.sha256(content).hexdigest()
+    url = write_upload(f"resumes/{sha256[:2]}/{sha256[2:4]}/{sha256}.pdf", content)
+
+    response = client.get(url, headers=GZIP)
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == f"private, max-age={settings.upload_cache_max_age}, immutable"
+    # PDFs are compressed already
+    assert "content-encoding" not in response.headers
+    assert response.content == content
+
+    revalidated = client.get(url, headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["cache-control"] == response.headers["cache-control"]
+
+def test_other_uploads_are_revalidated(client):
+    url = write_upload("resumes/legacy-resume.pdf", b"%PDF-1.4 legacy")
+
+    assert client.get(url).headers["cache-control"] == "private, no-cache"
@@ -0,0 +1,106 @@
+import sqlite3
+import pytest
+from sqlalchemy import select
+from app import database
+from app.config import settings
+from app.database import READ_YOUR_WRITES_COOKIE, ReplicaSet, SessionLocal, create_engine_for, read_session
+from app.models import ContactMessage
+from conftest import TEST_DIR
+
+def copy_primary(name: str):
+    """A second SQLite database holding a copy of the primary, standing in for a replica"""
+    path = f"{TEST_DIR}/{name}.db"
+    primary, replica = sqlite3.connect(f"{TEST_DIR}/test.db"), sqlite3.connect(path)
+    with replica:
+        primary.backup(replica)
+    primary.close()
+    replica.close()
+    return path
+
+def replica_only_message(path: str, name: str):
+    with sqlite3.connect(path) as replica:
+        replica.execute(
+            "INSERT INTO contact_messages (name, email, message) VALUES (?, 'replica@example.com', 'only on the replica')",
+            (name,)
+        )
+
+def use_replica(monkeypatch):
+    """Swap the configured (empty) replica set for one healthy copy of the primary"""
+    path = copy_primary("replica")
+    replica_set = ReplicaSet([create_engine_for(f"sqlite:///{path}")])
+    monkeypatch.setattr(database, "replicas", replica_set)
+    return path, replica_set
+
+@pytest.fixture
+async def replica(monkeypatch):
+    path, replica_set = use_replica(monkeypatch)
+    yield path, replica_set
+    await replica_set.stop()
+
+@pytest.fixture
+def client_replica(client, monkeypatch):
+    """A replica for requests made through the TestClient, which runs its own event loop"""
+    path, replica_set = use_replica(monkeypatch)
+    yield path, replica_set
+    client.portal.call(replica_set.stop)
+
+async def names(session):
+    async with session as db:
+        return set((await db.scalars(select(ContactMessage.name))).all())
+
+@pytest.mark.anyio
+async def test_reads_go_to_the_replica_and_writes_to_the_primary(replica, db_engine):
+    path, _ = replica
+    replica_only_message(path, "From the replica")
+
+    assert "From the replica" in await names(read_session())
+    assert "From the replica" not in await names(read_session(use_replica=False))
+    assert "From the replica" not in await names(SessionLocal())
+
+    # A write through a read session still lands on the primary
+    async with read_session() as db:
+        db.add(ContactMessage(name="Written via read session", email="a@example.com", message="Hello"))
+        await db.commit()
+    assert "Written via read session" in await names(SessionLocal())
+
+@pytest.mark.anyio
+async def test_failed_health_check_takes_a_replica_out_of_rotation(monkeypatch, db_engine):
+    good_path = copy_primary("good-replica")
+    replica_only_message(good_path, "From the good replica")
+    good = create_engine_for(f"sqlite:///{good_path}")
+    broken = create_engine_for(f"sqlite:///{TEST_DIR}/missing/replica.db")
+    replica_set = ReplicaSet([broken, good])
+    monkeypatch.setattr(database, "replicas", replica_set)
+    try:
+        assert {replica_set.pick() for _ in range(4)} == {broken, good}
+
+        await replica_set.check()
+        assert replica_set.healthy == [good]
+        assert {replica_set.pick() for _ in range(4)} == {good}
+        assert "From the good replica" in await names(read_session())
+
+        # With no healthy replica left, reads fall back to the primary
+        replica_set.engines = [broken]
+        await replica_set.check()
+        assert replica_set.pick() is None
+        assert "From the good replica" not in await names(read_session())
+    finally:
+        await replica_set.stop()
+
+def test_client_reads_its_own_order_from_the_primary_after_placing_it(client, place_order, client_replica):
+    client.cookies.clear()
+    order_id = place_order()
+
+    # The order was written to the primary after the replica was copied
+    assert client.cookies.get(READ_YOUR_WRITES_COOKIE)
+    assert client.get(f"/api/orders/{order_id}").status_code == 200
+
+    client.cookies.clear()
+    assert client.get(f"/api/orders/{order_id}").status_code == 404
+
+def test_read_your_writes_window_is_configurable(client, place_order, client_replica, monkeypatch):
+    monkeypatch.setattr(settings, "read_your_writes_seconds", 0)
+    client.cookies.clear()
+    order_id = place_order()
+
+    assert client.get(f"/api/orders/{order_id}").status_code == 404
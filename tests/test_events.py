@@ -0,0 +1,86 @@
+import json
+import pytest
+from starlette.websockets import WebSocketDisconnect
+from app.routers.orders import stream_order_status
+from app.utils.events import InMemoryBroker, broker, order_topic, status_event
+
+def test_publish_fans_out_to_every_subscriber_of_the_topic():
+    memory_broker = InMemoryBroker()
+    first, second = memory_broker.subscribe("order:1"), memory_broker.subscribe("order:1")
+    other = memory_broker.subscribe("order:2")
+    seen = []
+    memory_broker.listen("order:1", seen.append)
+
+    memory_broker.deliver("order:1", {"status": "ready"})
+
+    assert first.queue.get_nowait() == {"status": "ready"}
+    assert second.queue.get_nowait() == {"status": "ready"}
+    assert other.queue.empty()
+    assert seen == [{"status": "ready"}]
+
+def test_closing_the_last_subscription_drops_the_topic():
+    memory_broker = InMemoryBroker()
+    first, second = memory_broker.subscribe("order:1"), memory_broker.subscribe("order:1")
+
+    first.close()
+    memory_broker.deliver("order:1", {"status": "ready"})
+    assert second.queue.qsize() == 1
+
+    second.close()
+    assert memory_broker.topics == {}
+
+def test_slow_subscriber_loses_the_oldest_message(monkeypatch):
+    from app.config import settings
+    monkeypatch.setattr(settings, "event_subscriber_queue_size", 2)
+    memory_broker = InMemoryBroker()
+    subscription = memory_broker.subscribe("order:1")
+
+    for status in ("preparing", "ready", "delivered"):
+        memory_broker.deliver("order:1", {"status": status})
+
+    assert [subscription.queue.get_nowait()["status"] for _ in range(2)] == ["ready", "delivered"]
+
+def sse_data(event: str):
+    """The JSON payload of one Server-Sent Event"""
+    assert event.startswith("event: status\ndata: ") and event.endswith("\n\n")
+    return json.loads(event.split("data: ", 1)[1])
+
+@pytest.mark.anyio
+async def test_sse_stream_sends_current_status_then_changes(client, place_order):
+    order_id = place_order()
+    response = await stream_order_status(order_id)
+    events = response.body_iterator
+
+    assert sse_data(await events.__anext__())["status"] == "pending"
+    await broker.publish(order_topic(order_id), status_event(order_id, "preparing"))
+    event = sse_data(await events.__anext__())
+    assert event["orderId"] == order_id and event["status"] == "preparing"
+
+    # Closing the stream, as a client disconnect does, unsubscribes
+    await events.aclose()
+    assert order_topic(order_id) not in broker.topics
+
+def test_sse_for_unknown_order_is_404(client):
+    response = client.get("/api/orders/999999/events")
+
+    assert response.status_code == 404
+    assert order_topic(999999) not in broker.topics
+
+def test_websocket_pushes_status_changes(client, place_order):
+    order_id = place_order()
+
+    with client.websocket_connect(f"/api/orders/{order_id}/ws") as websocket:
+        assert websocket.receive_json()["status"] == "pending"
+        assert client.put(f"/api/orders/{order_id}/status", params={"status": "preparing"}).status_code == 200
+        event = websocket.receive_json()
+        assert event["orderId"] == order_id and event["status"] == "preparing"
+
+    assert order_topic(order_id) not in broker.topics
+
+def test_websocket_for_unknown_order_is_closed_with_4404(client):
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect("/api/orders/999999/ws") as websocket:
+            websocket.receive_json()
+
+    assert closed.value.code == 4404
+    assert order_topic(999999) not in broker.topics
@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+import sqlite3
+import pytest
+from app.config import settings
+from conftest import TEST_DIR
+
+@pytest.fixture(scope="module")
+def two_line_order(client):
+    response = client.post("/api/orders", json={
+        "customerInfo": {"name": "Ravi, Jr.", "email": "ravi@example.com", "phone": "5557654321", "address": "2 \"Oak\" Ave"},
+        "items": [{"menu_item_id": 1, "quantity": 2}, {"menu_item_id": 2, "quantity": 1}]
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["orderId"]
+
+def test_orders_csv_has_a_header_and_one_row_per_line(client, two_line_order, monkeypatch):
+    # Small partitions so the export is streamed in several chunks
+    monkeypatch.setattr(settings, "export_chunk_size", 2)
+
+    response = client.get("/api/exports/orders")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="orders.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    lines = [row for row in rows if row["order_id"] == str(two_line_order)]
+    assert [(row["menu_item_id"], row["quantity"]) for row in lines] == [("1", "2"), ("2", "1")]
+    # Commas and quotes in values survive the round trip
+    assert lines[0]["customer_name"] == "Ravi, Jr."
+    assert lines[0]["customer_address"] == '2 "Oak" Ave'
+    assert lines[0]["total_amount"] == lines[1]["total_amount"]
+    order_ids = [int(row["order_id"]) for row in rows]
+    assert order_ids == sorted(order_ids)
+
+def test_orders_ndjson_is_one_object_per_line(client, two_line_order):
+    response = client.get("/api/exports/orders", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    lines = [record for record in records if record["order_id"] == two_line_order]
+    assert [record["quantity"] for record in lines] == [2, 1]
+    assert isinstance(lines[0]["price"], str)  # Decimals keep their exact value
+    assert lines[0]["created_at"]
+
+def test_export_honours_the_date_range(client):
+    with sqlite3.connect(f"{TEST_DIR}/test.db") as db:
+        message_id = db.execute(
+            "INSERT INTO contact_messages (name, email, message, created_at) "
+            "VALUES ('Archived', 'old@example.com', 'From 2019', '2019-06-01 12:00:00') RETURNING id"
+        ).fetchone()[0]
+    try:
+        response = client.get("/api/exports/messages", params={"format": "ndjson", "created_before": "2019-12-31T00:00:00"})
+    finally:
+        with sqlite3.connect(f"{TEST_DIR}/test.db") as db:
+            db.execute("DELETE FROM contact_messages WHERE id = ?", (message_id,))
+
+    assert [record["id"] for record in map(json.loads, response.text.splitlines())] == [message_id]
+
+def test_empty_csv_export_still_has_a_header(client):
+    response = client.get("/api/exports/subscribers", params={"created_before": "2000-01-01T00:00:00"})
+
+    assert response.text.strip() == "id,email,subscribed_at"
+
+def test_unknown_dataset_is_404(client):
+    assert client.get("/api/exports/passwords").status_code == 404
@@ -0,0 +1,58 @@
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import func, select
+from app.database import SessionLocal
+from app.models import Order, OrderItem
+from app.utils.forecast import DemandForecaster
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytestmark = pytest.mark.anyio
+
+async def add_line(line_id: int, quantity: int):
+    """Store an order with one Samosas line under an explicit line id"""
+    async with SessionLocal() as db:
+        order = Order(
+            customer_name="Asha", customer_email="asha@example.com", customer_phone="5551234567",
+            customer_address="1 Main St", total_amount=9.71, status="delivered"
+        )
+        db.add(order)
+        await db.flush()
+        db.add(OrderItem(id=line_id, order_id=order.id, menu_item_id=1, item_name="Samosas", quantity=quantity, price=8.99))
+        await db.commit()
+
+async def max_line_id():
+    async with SessionLocal() as db:
+        return await db.scalar(select(func.max(OrderItem.id))) or 0
+
+async def test_refresh_picks_up_lines_committed_out_of_id_order(db_engine):
+    forecaster = DemandForecaster()
+    base = await max_line_id()
+    async with SessionLocal() as db:
+        await forecaster.refresh(db)
+    counted = forecaster.daily.sum() if forecaster.daily is not None else 0
+
+    # Id base + 10 commits first; base + 5 was handed out earlier but commits later
+    await add_line(base + 10, 3)
+    async with SessionLocal() as db:
+        assert await forecaster.refresh(db)
+    assert forecaster.daily.sum() == counted + 3
+
+    await add_line(base + 5, 2)
+    async with SessionLocal() as db:
+        assert await forecaster.refresh(db)
+        assert not await forecaster.refresh(db)
+    assert forecaster.daily.sum() == counted + 5
+    assert forecaster.last_line_id == base + 10
+
+async def test_forecast_is_recomputed_after_a_late_line(db_engine):
+    forecaster = DemandForecaster()
+    base = await max_line_id()
+    await add_line(base + 10, 1)
+    tomorrow = date.today() + timedelta(days=1)
+
+    first = await forecaster.forecast(tomorrow)
+    assert await forecaster.forecast(tomorrow) is first
+
+    await add_line(base + 5, 1)
+    assert await forecaster.forecast(tomorrow) is not first
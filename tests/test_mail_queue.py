@@ -0,0 +1,102 @@
+from datetime import timedelta
+import pytest
+from sqlalchemy import delete, select
+from app.database import SessionLocal
+from app.models import OutboundEmail
+from app.utils.analytics import as_utc
+from app.utils.email_service import EmailService
+from app.utils.mail_queue import MailQueueWorker, utcnow
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def worker(db_engine, smtp_server, smtp_settings):
+    """A mail queue worker delivering to the SMTP stand-in, over an empty queue"""
+    _, port = smtp_server
+    email_service = EmailService()
+    email_service.smtp_host, email_service.smtp_port = "127.0.0.1", port
+    worker = MailQueueWorker(email_service)
+    worker.pool = email_service.create_pool()
+
+    async with SessionLocal() as db:
+        await db.execute(delete(OutboundEmail))
+        await db.commit()
+    yield worker
+    await worker.pool.close()
+
+async def enqueue(*recipients):
+    async with SessionLocal() as db:
+        for to_email in recipients:
+            assert EmailService().queue_email(db, to_email, "Hello", f"<p>Hi {to_email}</p>")
+        await db.commit()
+
+async def outbox():
+    async with SessionLocal() as db:
+        rows = (await db.scalars(select(OutboundEmail).order_by(OutboundEmail.id))).all()
+        return {row.to_email: row for row in rows}
+
+async def test_enqueued_email_is_held_until_commit(worker, smtp_server):
+    handler, _ = smtp_server
+    async with SessionLocal() as db:
+        EmailService().queue_email(db, "rolled-back@example.com", "Hello", "<p>Hi</p>")
+        await db.rollback()
+
+    assert await worker.process_batch() == 0
+    assert handler.messages == []
+
+async def test_batch_is_delivered_over_smtp(worker, smtp_server):
+    handler, _ = smtp_server
+    await enqueue("a@example.com", "b@example.com")
+
+    assert await worker.process_batch() == 2
+
+    assert sorted(to_email for to_email, _ in handler.messages) == ["a@example.com", "b@example.com"]
+    message = dict(handler.messages)["a@example.com"]
+    assert "Subject: Hello" in message and "To: a@example.com" in message
+    rows = await outbox()
+    assert {row.status for row in rows.values()} == {"sent"}
+    assert all(row.attempts == 1 and row.sent_at for row in rows.values())
+    assert await worker.process_batch() == 0
+
+async def test_failed_send_is_retried_with_backoff(worker, smtp_settings, monkeypatch):
+    monkeypatch.setattr(smtp_settings, "email_retry_backoff", 30)
+    await enqueue("reject-me@example.com", "ok@example.com")
+
+    before = utcnow()
+    assert await worker.process_batch() == 2
+
+    rows = await outbox()
+    assert rows["ok@example.com"].status == "sent"
+    failed = rows["reject-me@example.com"]
+    assert failed.status == "pending"
+    assert failed.attempts == 1
+    assert "Mailbox unavailable" in failed.last_error
+    assert as_utc(failed.next_attempt_at) >= before + timedelta(seconds=30)
+
+    # Not due again until the backoff has passed
+    assert await worker.process_batch() == 0
+
+async def test_backoff_doubles_then_email_is_dead_lettered(worker, smtp_server, smtp_settings, monkeypatch):
+    handler, _ = smtp_server
+    monkeypatch.setattr(smtp_settings, "email_retry_backoff", 10)
+    monkeypatch.setattr(smtp_settings, "email_max_attempts", 3)
+    await enqueue("reject-forever@example.com")
+
+    delays = []
+    for attempt in range(3):
+        start = utcnow()
+        assert await worker.process_batch() == 1
+        row = (await outbox())["reject-forever@example.com"]
+        assert row.attempts == attempt + 1
+        if row.status == "pending":
+            delays.append(round((as_utc(row.next_attempt_at) - start).total_seconds()))
+            async with SessionLocal() as db:
+                row.next_attempt_at = utcnow()
+                await db.merge(row)
+                await db.commit()
+
+    assert delays == [10, 20]
+    assert row.status == "failed"
+    assert "Mailbox unavailable" in row.last_error
+    assert await worker.process_batch() == 0
+    assert handler.messages == []
@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import select, update
+from app.database import SessionLocal
+from app.models import MenuItem
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def samosas(db_engine):
+    """The Samosas menu item, with its description put back after the test"""
+    async with SessionLocal() as db:
+        item = await db.scalar(select(MenuItem).where(MenuItem.name == "Samosas"))
+    yield item
+    async with SessionLocal() as db:
+        await db.execute(update(MenuItem).where(MenuItem.id == item.id).values(description=item.description))
+        await db.commit()
+
+def menu_item(client, name: str):
+    return next(item for item in client.get("/api/menu").json() if item["name"] == name)
+
+async def test_unchanged_menu_is_a_304_with_no_body(client):
+    first = client.get("/api/menu")
+    assert first.status_code == 200
+    assert "max-age" in first.headers["cache-control"]
+
+    again = client.get("/api/menu", headers={"If-None-Match": first.headers["etag"]})
+
+    assert again.status_code == 304
+    assert again.content == b""
+    assert client.get("/api/menu", headers={"If-None-Match": '"someone-elses"'}).status_code == 200
+
+async def test_category_payloads_have_their_own_etags(client):
+    categories = client.get("/api/menu/categories").json()
+    etags = {client.get(f"/api/menu/{category}").headers["etag"] for category in categories}
+
+    assert len(etags) == len(categories)
+    assert client.get("/api/menu/No such category").status_code == 404
+
+async def test_committed_menu_write_invalidates_the_snapshot(client, samosas):
+    etag = client.get("/api/menu").headers["etag"]
+
+    async with SessionLocal() as db:
+        item = await db.get(MenuItem, samosas.id)
+        item.description = "Now with mint chutney"
+        await db.commit()
+
+    response = client.get("/api/menu", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert menu_item(client, "Samosas")["description"] == "Now with mint chutney"
+
+async def test_bulk_update_invalidates_but_rollback_does_not(client, samosas):
+    etag = client.get("/api/menu").headers["etag"]
+
+    async with SessionLocal() as db:
+        await db.execute(update(MenuItem).where(MenuItem.id == samosas.id).values(description="Rolled back"))
+        await db.rollback()
+    assert client.get("/api/menu", headers={"If-None-Match": etag}).status_code == 304
+
+    async with SessionLocal() as db:
+        await db.execute(update(MenuItem).where(MenuItem.id == samosas.id).values(description="Bulk updated"))
+        await db.commit()
+    assert menu_item(client, "Samosas")["description"] == "Bulk updated"
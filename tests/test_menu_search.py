@@ -0,0 +1,69 @@
+from decimal import Decimal
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import select, update
+from app.database import SessionLocal
+from app.models import MenuItem
+from app.utils.menu_search import MenuIndex, tokenize
+
+def item(name, description="", category="Mains", price="10.00"):
+    return SimpleNamespace(name=name, description=description, category=category, price=Decimal(price))
+
+INDEX = MenuIndex([
+    item("Garlic Naan", "Leavened bread brushed with garlic butter", "Breads", "3.99"),
+    item("Naan", "Plain leavened bread", "Breads", "2.99"),
+    item("Butter Chicken", "Chicken in a creamy tomato sauce", price="15.99"),
+    item("Dal Makhani", "Black lentils finished with butter and cream", price="11.99"),
+    item("Crème Brûlée", "Vanilla custard", "Desserts", "6.99"),
+])
+
+def names(results):
+    return [result.name for result in results]
+
+def test_name_matches_rank_above_description_matches():
+    assert names(INDEX.search("butter")) == ["Butter Chicken", "Dal Makhani", "Garlic Naan"]
+
+def test_exact_term_ranks_above_prefix_and_ties_sort_by_name():
+    assert names(INDEX.search("naan")) == ["Garlic Naan", "Naan"]
+    assert names(INDEX.search("chick")) == ["Butter Chicken"]
+
+def test_one_typo_still_matches():
+    assert names(INDEX.search("chiken")) == ["Butter Chicken"]
+    assert names(INDEX.search("buter chicken")) == ["Butter Chicken"]
+    assert INDEX.search("chkcen") == []
+
+def test_every_term_must_match():
+    assert names(INDEX.search("garlic bread")) == ["Garlic Naan"]
+    assert INDEX.search("garlic custard") == []
+
+def test_accents_are_folded():
+    assert tokenize("Crème Brûlée") == ["creme", "brulee"]
+    assert names(INDEX.search("creme"))[0] == "Crème Brûlée"
+
+def test_filters_apply_with_or_without_a_query():
+    assert names(INDEX.search(category="Breads")) == ["Garlic Naan", "Naan"]
+    assert names(INDEX.search("bread", max_price=Decimal("3.00"))) == ["Naan"]
+    assert names(INDEX.search(min_price=Decimal("12"))) == ["Butter Chicken"]
+    assert len(INDEX.search(limit=2)) == 2
+
+def test_search_endpoint_validates_the_price_range(client):
+    response = client.get("/api/menu/search", params={"min_price": 10, "max_price": 5})
+
+    assert response.status_code == 400
+
+@pytest.mark.anyio
+async def test_search_sees_menu_edits(client, db_engine):
+    async with SessionLocal() as db:
+        jeera_rice = await db.scalar(select(MenuItem).where(MenuItem.name == "Jeera Rice"))
+    assert client.get("/api/menu/search", params={"q": "saffron"}).json() == []
+
+    async with SessionLocal() as db:
+        await db.execute(update(MenuItem).where(MenuItem.id == jeera_rice.id).values(description="Cumin and saffron rice"))
+        await db.commit()
+    try:
+        results = client.get("/api/menu/search", params={"q": "safron"}).json()
+        assert [result["name"] for result in results] == ["Jeera Rice"]
+    finally:
+        async with SessionLocal() as db:
+            await db.execute(update(MenuItem).where(MenuItem.id == jeera_rice.id).values(description=jeera_rice.description))
+            await db.commit()
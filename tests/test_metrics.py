@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app.utils.metrics import RequestStats, current_request, db_queries
+
+pytestmark = pytest.mark.anyio
+
+async def test_failed_statements_leave_no_timing_state(db_engine):
+    stats = RequestStats()
+    token = current_request.set(stats)
+    try:
+        async with db_engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    await conn.execute(text("SELECT * FROM no_such_table"))
+            before = db_queries._values.get((), 0)
+            await conn.execute(text("SELECT 1"))
+
+            assert "query_start" not in conn.info
+            assert db_queries._values[()] == before + 1
+    finally:
+        current_request.reset(token)
+
+    assert stats.queries == 1
+    assert 0 < stats.db_time < 1
+
+def metric_value(metrics: str, sample: str):
+    for line in metrics.splitlines():
+        if line.startswith(sample + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+def test_requests_record_their_queries(client):
+    sample = 'db_queries_per_request_sum{route="/api/orders/{order_id}"}'
+    before = metric_value(client.get("/metrics").text, sample)
+
+    assert client.get("/api/orders/999999").status_code == 404
+
+    # The order and its items are loaded together, so a miss is one query
+    assert metric_value(client.get("/metrics").text, sample) == before + 1
@@ -0,0 +1,52 @@
+import sqlite3
+import anyio
+import pytest
+from alembic import command
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.cli import alembic_config
+from app.database import create_engine_for
+from app.models import MenuItem
+from app.routers.orders import ORDER_DETAIL
+from app.schemas import MenuItem as MenuItemSchema, Order as OrderSchema
+from conftest import TEST_DIR
+
+def upgrade(url: str, revision: str):
+    config = alembic_config()
+    config.attributes["database_url"] = url
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, revision)
+
+@pytest.fixture
+def baseline_database():
+    """A database at the initial schema holding a menu item and an order, as the first release left them"""
+    path = f"{TEST_DIR}/baseline.db"
+    url = f"sqlite:///{path}"
+    upgrade(url, "0001")
+    with sqlite3.connect(path) as db:
+        db.execute(
+            "INSERT INTO menu_items (name, price, category, is_available) VALUES ('Samosa', 4.99, 'Appetizers', 1)"
+        )
+        db.execute(
+            "INSERT INTO orders (customer_name, customer_email, customer_phone, customer_address, total_amount, status, payment_method) "
+            "VALUES ('Asha', 'asha@example.com', '5551234567', '1 Main St', 9.98, 'pending', 'cash')"
+        )
+        db.execute("INSERT INTO order_items (order_id, item_name, quantity, price) VALUES (1, 'Samosa', 2, 4.99)")
+    return url
+
+@pytest.mark.anyio
+async def test_upgraded_baseline_rows_read_back_through_the_schemas(baseline_database):
+    # Alembic runs its own event loop, so upgrade from a worker thread
+    await anyio.to_thread.run_sync(upgrade, baseline_database, "head")
+
+    engine = create_engine_for(baseline_database)
+    try:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            menu_item = MenuItemSchema.model_validate(await db.scalar(select(MenuItem)))
+            order = OrderSchema.model_validate(await db.scalar(ORDER_DETAIL, {"order_id": 1}))
+    finally:
+        await engine.dispose()
+
+    assert menu_item.prep_time == 15
+    assert order.priority == 0
+    assert order.items[0].menu_item_id == menu_item.id
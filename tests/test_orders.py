@@ -0,0 +1,151 @@
+from concurrent.futures import ThreadPoolExecutor
+import sqlite3
+import pytest
+from sqlalchemy import event
+from app.config import settings
+from app.database import engine
+from conftest import TEST_DIR
+
+CUSTOMER = {"name": "Asha", "email": "asha@example.com", "phone": "5551234567", "address": "1 Main St"}
+
+def order_body(**customer):
+    return {"customerInfo": {**CUSTOMER, **customer}, "items": [{"menu_item_id": 1, "quantity": 1}]}
+
+@pytest.mark.parametrize("customer_info", [
+    {**CUSTOMER, "email": "not-an-email"},
+    {key: value for key, value in CUSTOMER.items() if key != "email"},
+    {key: value for key, value in CUSTOMER.items() if key != "address"},
+])
+def test_invalid_customer_info_is_rejected_when_the_order_is_placed(client, customer_info):
+    response = client.post("/api/orders", json={"customerInfo": customer_info, "items": [{"menu_item_id": 1, "quantity": 1}]})
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][:2] == ["body", "customerInfo"]
+
+def test_invalid_customer_info_fails_only_that_order_in_a_batch(client):
+    response = client.post("/api/orders/batch", json={"orders": [order_body(), order_body(email="not-an-email")]})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["success"] and not results[1]["success"]
+    assert "customerInfo.email" in results[1]["error"]
+    assert client.get(f"/api/orders/{results[0]['orderId']}").status_code == 200
+
+@pytest.fixture
+def unreadable_order():
+    """An order stored with an email the response schema rejects, as written before customer info was validated"""
+    with sqlite3.connect(f"{TEST_DIR}/test.db") as db:
+        order_id = db.execute(
+            "INSERT INTO orders (customer_name, customer_email, customer_phone, customer_address, total_amount, status) "
+            "VALUES ('Asha', 'not-an-email', '5551234567', '1 Main St', 4.99, 'pending') RETURNING id"
+        ).fetchone()[0]
+    yield order_id
+    with sqlite3.connect(f"{TEST_DIR}/test.db") as db:
+        db.execute("DELETE FROM orders WHERE id = ?", (order_id,))
+
+def test_unreadable_stored_order_is_a_server_error_not_a_bad_ids_list(client, unreadable_order):
+    response = client.get("/api/orders", params={"ids": str(unreadable_order)})
+
+    assert response.status_code == 500
+    assert response.json()["detail"].startswith("Error fetching orders")
+
+@pytest.fixture
+def order_queries():
+    """SELECTs against the orders and order_items tables, recorded while the fixture is active"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and ("FROM orders" in statement or "FROM order_items" in statement):
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+def test_order_detail_includes_items(client, place_order):
+    order_id = place_order(quantity=3)
+
+    response = client.get(f"/api/orders/{order_id}")
+
+    assert response.status_code == 200
+    order = response.json()
+    assert order["id"] == order_id
+    assert order["customer_email"] == "asha@example.com"
+    assert order["priority"] == 0
+    assert [(item["menu_item_id"], item["quantity"]) for item in order["items"]] == [(1, 3)]
+
+def test_unknown_order_is_404(client):
+    assert client.get("/api/orders/999999").status_code == 404
+
+def test_bulk_fetch_keeps_the_requested_order_and_drops_repeats_and_unknown_ids(client, place_order):
+    first, second, third = place_order(1), place_order(2), place_order(3)
+
+    response = client.get("/api/orders", params={"ids": f"{third},{first},999999,{third},{second}"})
+
+    assert response.status_code == 200
+    orders = response.json()
+    assert [order["id"] for order in orders] == [third, first, second]
+    assert [order["items"][0]["quantity"] for order in orders] == [3, 1, 2]
+
+def test_bulk_fetch_loads_any_number_of_orders_in_two_queries(client, place_order, order_queries):
+    order_ids = [place_order() for _ in range(5)]
+    order_queries.clear()
+
+    response = client.get("/api/orders", params={"ids": ",".join(map(str, order_ids))})
+
+    assert len(response.json()) == 5
+    assert len(order_queries) == 2
+
+@pytest.mark.parametrize("ids, message", [
+    ("1,two", "comma-separated list"),
+    (",", "at least one order"),
+    ("1,2,3,4", "At most 3 orders"),
+])
+def test_bad_ids_list_is_400(client, monkeypatch, ids, message):
+    monkeypatch.setattr(settings, "admin_page_max_size", 3)
+
+    response = client.get("/api/orders", params={"ids": ids})
+
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
+
+def order_count():
+    with sqlite3.connect(f"{TEST_DIR}/test.db") as db:
+        return db.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+
+def test_retry_with_the_same_key_replays_the_first_response(client):
+    headers = {"Idempotency-Key": "replay-test"}
+    first = client.post("/api/orders", json=order_body(), headers=headers)
+    count = order_count()
+
+    retry = client.post("/api/orders", json=order_body(), headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert order_count() == count
+
+def test_same_key_with_a_different_body_is_422(client):
+    headers = {"Idempotency-Key": "mismatch-test"}
+    assert client.post("/api/orders", json=order_body(), headers=headers).status_code == 200
+    count = order_count()
+
+    response = client.post("/api/orders", json=order_body(name="Someone else"), headers=headers)
+
+    assert response.status_code == 422
+    assert "different request" in response.json()["detail"]
+    assert order_count() == count
+
+def test_concurrent_submissions_with_the_same_key_create_one_order(client):
+    headers = {"Idempotency-Key": "concurrent-test"}
+    count = order_count()
+
+    # A double-clicked checkout button
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        responses = list(pool.map(lambda _: client.post("/api/orders", json=order_body(), headers=headers), range(4)))
+
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.json()["orderId"] for response in responses}) == 1
+    assert sum("Idempotent-Replayed" not in response.headers for response in responses) == 1
+    assert order_count() == count + 1
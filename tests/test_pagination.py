@@ -0,0 +1,63 @@
+import sqlite3
+from datetime import datetime, timezone
+import pytest
+from app.utils.pagination import decode_cursor, encode_cursor
+from conftest import TEST_DIR
+
+# Old enough that no message written by another test falls inside the range
+RANGE = {"created_after": "2020-01-01T00:00:00", "created_before": "2020-01-02T00:00:00"}
+
+@pytest.fixture(scope="module")
+def old_messages():
+    """Ids of twelve contact messages from 2020, several sharing a timestamp"""
+    with sqlite3.connect(f"{TEST_DIR}/test.db") as db:
+        ids = [
+            db.execute(
+                "INSERT INTO contact_messages (name, email, message, created_at) VALUES (?, 'old@example.com', 'Hello', ?) RETURNING id",
+                (f"Sender {number}", f"2020-01-01 {10 + number // 4:02d}:00:00")
+            ).fetchone()[0]
+            for number in range(12)
+        ]
+    yield ids
+    with sqlite3.connect(f"{TEST_DIR}/test.db") as db:
+        db.execute(f"DELETE FROM contact_messages WHERE id IN ({','.join('?' * len(ids))})", ids)
+
+def walk(client, limit: int):
+    pages, cursor = [], None
+    while True:
+        params = {**RANGE, "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/contact/messages", params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        pages.append([item["id"] for item in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+def test_cursor_round_trips():
+    created_at = datetime(2020, 1, 1, 10, 30, 15, 250000, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+def test_pages_cover_every_row_once_newest_first(client, old_messages):
+    pages = walk(client, limit=5)
+
+    assert [len(page) for page in pages] == [5, 5, 2]
+    # Rows sharing a timestamp are ordered by id, so ties never repeat or drop across a page boundary
+    newest_first = [
+        message_id
+        for hour in reversed(range(3))
+        for message_id in reversed(old_messages[hour * 4:hour * 4 + 4])
+    ]
+    assert [message_id for page in pages for message_id in page] == newest_first
+
+def test_exact_final_page_has_no_next_cursor(client, old_messages):
+    assert [len(page) for page in walk(client, limit=4)] == [4, 4, 4]
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "bm90IGpzb24", encode_cursor(datetime(2020, 1, 1), 1)[:-3]])
+def test_invalid_cursor_is_400(client, cursor):
+    response = client.get("/api/contact/messages", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,30 @@
+from app.config import settings
+from app.utils.rate_limit import parse_rate, rate_limiter
+
+ORIGIN = "http://localhost:3000"
+
+def test_parse_rate():
+    assert parse_rate("10/minute") == (10, 60)
+    assert parse_rate("3/hours") == (3, 3600)
+
+def test_rejected_request_carries_cors_and_retry_after(client, monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    rate_limiter.store.buckets.clear()
+    allowed, _ = parse_rate(settings.rate_limits["/api/contact"])
+
+    responses = [
+        client.post(
+            "/api/contact",
+            json={"name": "Asha", "email": f"asha{attempt}@example.com", "message": "Hello"},
+            headers={"Origin": ORIGIN}
+        )
+        for attempt in range(allowed + 1)
+    ]
+
+    assert [response.status_code for response in responses[:allowed]] == [200] * allowed
+    rejected = responses[-1]
+    assert rejected.status_code == 429
+    assert rejected.json() == {"detail": "Too many requests, please try again later"}
+    assert int(rejected.headers["retry-after"]) > 0
+    assert rejected.headers["access-control-allow-origin"] == ORIGIN
+    assert "retry-after" in rejected.headers["access-control-expose-headers"].lower()
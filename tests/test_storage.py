@@ -0,0 +1,29 @@
+import hashlib
+import pytest
+from app.utils.storage import LocalStorage, StorageBackend
+
+pytestmark = pytest.mark.anyio
+
+def write_upload(path, content: bytes):
+    path.write_bytes(content)
+    return path, hashlib.sha256(content).hexdigest()
+
+def test_backend_without_put_cannot_be_created():
+    class Incomplete(StorageBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+async def test_local_storage_keeps_one_copy_per_content(tmp_path):
+    storage = LocalStorage(tmp_path / "uploads")
+    first, sha256 = write_upload(tmp_path / "first.part", b"%PDF-1.4 resume")
+    second, _ = write_upload(tmp_path / "second.part", b"%PDF-1.4 resume")
+
+    location, created = await storage.put(first, sha256, "application/pdf")
+    again, created_again = await storage.put(second, sha256, "application/pdf")
+
+    assert created and not created_again
+    assert location == again
+    assert location.endswith(f"resumes/{sha256[:2]}/{sha256[2:4]}/{sha256}.pdf")
+    assert not first.exists() and not second.exists()
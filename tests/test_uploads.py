@@ -0,0 +1,45 @@
+from app.config import settings
+
+ORIGIN = "http://localhost:3000"
+
+def application_form():
+    return {"name": "Asha", "email": "asha@example.com", "phone": "5551234567", "position": "Chef"}
+
+def oversized_resume():
+    return b"%PDF-1.4 " + b"x" * (settings.max_file_size + settings.max_form_overhead)
+
+def test_oversized_upload_is_rejected_with_cors_headers(client):
+    response = client.post(
+        "/api/careers",
+        data=application_form(),
+        files={"resume": ("resume.pdf", oversized_resume(), "application/pdf")},
+        headers={"Origin": ORIGIN}
+    )
+
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Request body too large"}
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+
+def test_oversized_chunked_upload_is_rejected_with_cors_headers(client):
+    boundary = "resume-boundary"
+    head = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="resume"; filename="resume.pdf"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode()
+
+    def body():
+        yield head
+        resume = oversized_resume()
+        for start in range(0, len(resume), 64 * 1024):
+            yield resume[start:start + 64 * 1024]
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post(
+        "/api/careers",
+        content=body(),
+        headers={"Origin": ORIGIN, "Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] == ORIGIN